@@ -9,6 +9,16 @@ CONCURRENT_DEPLOY_LIMIT_INPUT = "Concurrent Deploy Limit"
 HEALTH_CHECK_SANDBOX_INPUT = "Health Check First Sandbox"
 GLOBAL_INPUTS_INPUT = "Sandbox Global Inputs"
 
+# CONCURRENT DEPLOY LIMIT VALUE THAT ENABLES AIMD CONTROLLER
+ADAPTIVE_DEPLOY_LIMIT_VALUE = "adaptive"
+
+# SHARED EXECUTOR THREADS, FLOWS GROW IT TO THE REQUESTED CONCURRENT DEPLOY LIMIT UP TO THE CEILING
+EXECUTOR_MAX_WORKERS = 30
+EXECUTOR_MAX_WORKERS_CEILING = 100
+
+# MAX WAIT FOR PARENT EXTENSION TO SHOW IN REMAINING TIME BEFORE SYNCING CHILDREN
+EXTENSION_APPLIED_TIMEOUT_SECONDS = 30
+
 # SANDBOX CONTROLLER SERVICE
 SANDBOX_CONTROLLER_MODEL = "Sandbox Controller"
 
@@ -24,3 +34,7 @@ END_SANDBOX_COMMAND = "end_sandbox"
 EXTEND_SANDBOX_COMMAND = "extend_sandbox"
 SYNC_REMAINING_TIME_COMMAND = "sync_remaining_time"
 START_SANDBOX_DURATION_PARAM = "duration_minutes"
+
+# PER CHILD TIMEOUTS OF ASYNC ENGINE FAN-OUTS, DRIVER POLLS CHILD TEARDOWN UP TO 45 MINUTES
+SYNC_REMAINING_TIME_TIMEOUT_SECONDS = 300
+END_SANDBOX_TIMEOUT_SECONDS = 3000
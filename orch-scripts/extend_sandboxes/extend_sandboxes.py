@@ -1,35 +1,10 @@
-import time
-
 import SB_GLOBALS as sb_globals
 from cloudshell.api.cloudshell_api import CloudShellAPISession
 from cloudshell.workflow.orchestration.sandbox import Sandbox
-from helper_code.execute_async_helper import execute_commands_async
 from helper_code.SandboxReporter import SandboxReporter
-
-
-def _sync_sandboxes_wrapper(api, res_id, reporter, targeted_components_list):
-    """
-    function to be passed to threading implementation
-    :param CloudShellAPISession api:
-    :param str res_id:
-    :param str service_name:
-    :return:
-    """
-    # SYNC REMAINING TIME
-    _, sync_sandbox_exceptions = execute_commands_async(
-        api=api,
-        res_id=res_id,
-        target_components_list=targeted_components_list,
-        target_type="Service",
-        command_name=sb_globals.SYNC_REMAINING_TIME_COMMAND,
-    )
-    if sync_sandbox_exceptions:
-        failed_sandboxes = [result[0] for result in sync_sandbox_exceptions]
-        err_msg = "Failed Sandbox Extensions: {}".format(failed_sandboxes)
-        reporter.err_out(err_msg)
-        return failed_sandboxes
-    reporter.sb_warn_print("Parent Sandbox time synced up with child sandboxes.")
-    return None
+from helper_code.service_registry import ServiceRegistry
+from helper_code.time_sync import sync_sandboxes_remaining_time
+from helper_code.wait_until import WaitTimeoutError, wait_until
 
 
 # ========== Primary Function ==========
@@ -48,27 +23,29 @@ def extend_sandboxes_flow(sandbox, components=None):
     duration_minutes = int(duration_minutes_input)
 
     reporter.warn_out("Extending Parent Launcher Sandbox {} minutes".format(duration_minutes))
+    remaining_minutes_before = api.GetReservationRemainingTime(res_id).RemainingTimeInMinutes
     extend_parent_res = api.ExtendReservation(reservationId=res_id, minutesToAdd=duration_minutes)
-    time.sleep(10)
-
-    # GET CURRENT SERVICES ON CANVAS
-    all_services = api.GetReservationDetails(res_id).ReservationDescription.Services
-    curr_services = [s for s in all_services if s.ServiceName == sb_globals.SANDBOX_CONTROLLER_MODEL]
 
-    def _is_sb_id(s):
-        attrs = s.Attributes
-        sb_id_val = [attr for attr in attrs if attr.Name == sb_globals.SANDBOX_ID_ATTR][0].Value
-        if sb_id_val:
-            return True
-        else:
-            return False
+    # children sync to parent remaining time, so wait until the extension shows on parent
+    try:
+        wait_until(
+            lambda: api.GetReservationRemainingTime(res_id).RemainingTimeInMinutes
+            >= remaining_minutes_before + duration_minutes - 1,
+            timeout_seconds=sb_globals.EXTENSION_APPLIED_TIMEOUT_SECONDS,
+            description="parent sandbox extension",
+        )
+    except WaitTimeoutError as e:
+        reporter.warn_out(str(e), log_only=True)
 
-    services_with_populated_sb_id = [s.Alias for s in curr_services if _is_sb_id(s)]
-    sorted_service_names = sorted(services_with_populated_sb_id)
+    # GET CURRENT SERVICES ON CANVAS
+    service_registry = ServiceRegistry(api, res_id, sb_globals.SANDBOX_CONTROLLER_MODEL).refresh()
+    sorted_service_names = service_registry.get_launched_aliases()
 
     # ASYNC flow
     reporter.warn_out("Starting extension syncing with children sandboxes...")
-    failed_extensions = _sync_sandboxes_wrapper(api, res_id, reporter, sorted_service_names)
+    failed_extensions = sync_sandboxes_remaining_time(
+        api, res_id, reporter, service_registry, sorted_service_names, sb_globals.SYNC_REMAINING_TIME_TIMEOUT_SECONDS
+    )
     if failed_extensions:
         exc_msg = "Extensions failed for: {}".format(failed_extensions)
         reporter.err_out(exc_msg)
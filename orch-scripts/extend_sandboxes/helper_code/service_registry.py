@@ -0,0 +1,146 @@
+"""
+Registry of the launcher's controller services.
+One GetReservationDetails read is reduced to a small slotted record per controller service, indexed by alias and by
+child sandbox id, so flows look services up in constant time instead of filtering services and scanning attribute
+lists again. Refresh updates records in place and only re-indexes services whose sandbox id changed.
+One registry is shared by a flow run, launch threads may refresh it concurrently.
+"""
+import threading
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+
+
+class ControllerService(object):
+    __slots__ = ("alias", "sandbox_id", "owner", "permitted_users", "blueprint_name")
+
+    def __init__(self, alias, sandbox_id="", owner="", permitted_users="", blueprint_name=""):
+        """
+        :param str alias: controller service alias
+        :param str sandbox_id: child sandbox id, empty if not launched
+        :param str owner:
+        :param str permitted_users: comma separated
+        :param str blueprint_name:
+        """
+        self.alias = alias
+        self.sandbox_id = sandbox_id
+        self.owner = owner
+        self.permitted_users = permitted_users
+        self.blueprint_name = blueprint_name
+
+
+class ServiceRegistry(object):
+    def __init__(self, api, res_id, controller_model):
+        """
+        :param CloudShellAPISession api:
+        :param str res_id: launcher sandbox id
+        :param str controller_model: service model name, also the attribute name prefix
+        """
+        self._api = api
+        self._res_id = res_id
+        self._controller_model = controller_model
+        self._field_by_attr_name = {
+            "{}.Sandbox Id".format(controller_model): "sandbox_id",
+            "{}.Sandbox Owner".format(controller_model): "owner",
+            "{}.Permitted Users".format(controller_model): "permitted_users",
+            "{}.Blueprint Name".format(controller_model): "blueprint_name",
+        }
+        self._services_by_alias = {}
+        self._services_by_sandbox_id = {}
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        """
+        read controller services again, existing records are updated in place
+        :return: self, for 'ServiceRegistry(...).refresh()'
+        :rtype: ServiceRegistry
+        """
+        all_services = self._api.GetReservationDetails(self._res_id).ReservationDescription.Services
+        with self._lock:
+            current_aliases = set()
+            for service in all_services:
+                if service.ServiceName != self._controller_model:
+                    continue
+                current_aliases.add(service.Alias)
+                field_values = {}
+                for attr in service.Attributes:
+                    field_name = self._field_by_attr_name.get(attr.Name)
+                    if field_name:
+                        field_values[field_name] = attr.Value
+                controller_service = self._services_by_alias.get(service.Alias)
+                if controller_service is None:
+                    controller_service = ControllerService(service.Alias)
+                    self._services_by_alias[service.Alias] = controller_service
+                sandbox_id = field_values.pop("sandbox_id", "")
+                for field_name, value in field_values.items():
+                    setattr(controller_service, field_name, value)
+                self.set_sandbox_id(service.Alias, sandbox_id)
+            for removed_alias in set(self._services_by_alias) - current_aliases:
+                self.set_sandbox_id(removed_alias, "")
+                del self._services_by_alias[removed_alias]
+        return self
+
+    def set_sandbox_id(self, alias, sandbox_id):
+        """
+        record sandbox id change made by this script without reading services again
+        :param str alias:
+        :param str sandbox_id: empty once child is cleared
+        :return:
+        """
+        with self._lock:
+            controller_service = self._services_by_alias[alias]
+            if controller_service.sandbox_id == sandbox_id:
+                return
+            if controller_service.sandbox_id:
+                self._services_by_sandbox_id.pop(controller_service.sandbox_id, None)
+            controller_service.sandbox_id = sandbox_id
+            if sandbox_id:
+                self._services_by_sandbox_id[sandbox_id] = controller_service
+
+    def get(self, alias):
+        """
+        :param str alias:
+        :return: None if not a controller service
+        :rtype: ControllerService
+        """
+        return self._services_by_alias.get(alias)
+
+    def get_by_sandbox_id(self, sandbox_id):
+        """
+        :param str sandbox_id: child sandbox id
+        :return: None if no controller service launched it
+        :rtype: ControllerService
+        """
+        return self._services_by_sandbox_id.get(sandbox_id)
+
+    def get_aliases(self):
+        """
+        :return: sorted
+        :rtype: list[str]
+        """
+        with self._lock:
+            return sorted(self._services_by_alias)
+
+    def get_launched_aliases(self):
+        """
+        controller services with a child sandbox id
+        :return: sorted
+        :rtype: list[str]
+        """
+        with self._lock:
+            return sorted(controller_service.alias for controller_service in self._services_by_sandbox_id.values())
+
+    def get_sandbox_ids(self, aliases=None):
+        """
+        :param list[str] aliases: None for all controller services
+        :return: alias to child sandbox id, empty string if not launched or not a controller service
+        :rtype: dict[str, str]
+        """
+        with self._lock:
+            aliases = aliases if aliases is not None else list(self._services_by_alias)
+            return {alias: self._services_by_alias[alias].sandbox_id if alias in self else "" for alias in aliases}
+
+    def __contains__(self, alias):
+        return alias in self._services_by_alias
+
+    def __len__(self):
+        return len(self._services_by_alias)
@@ -0,0 +1,17 @@
+from cloudshell.helpers.scripts.cloudshell_dev_helpers import attach_to_cloudshell_as
+from cloudshell.workflow.orchestration.sandbox import Sandbox
+from credentials import credentials
+from retry_failed_sandboxes import retry_failed_sandboxes_flow
+
+LIVE_SANDBOX_ID = ""
+
+attach_to_cloudshell_as(
+    user=credentials["user"],
+    password=credentials["password"],
+    domain=credentials["domain"],
+    reservation_id=LIVE_SANDBOX_ID,
+    server_address=credentials["server"],
+)
+
+sandbox = Sandbox()
+retry_failed_sandboxes_flow(sandbox=sandbox, components=None)
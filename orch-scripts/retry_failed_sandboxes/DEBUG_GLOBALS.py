@@ -0,0 +1,6 @@
+"""
+Boolean switches for development use.
+Turned to False automatically when running "update_script.py".
+If adding variable that you wish to be turned false, update list in update_script.py
+"""
+DEBUG_MODE = False
@@ -0,0 +1,33 @@
+# USER GLOBAL INPUTS
+CONCURRENT_DEPLOY_LIMIT_INPUT = "Concurrent Deploy Limit"
+LAUNCH_RETRY_COUNT_INPUT = "Launch Retry Count"
+
+# CONCURRENT DEPLOY LIMIT VALUE THAT ENABLES AIMD CONTROLLER
+ADAPTIVE_DEPLOY_LIMIT_VALUE = "adaptive"
+
+# SHARED EXECUTOR THREADS, FLOWS GROW IT TO THE REQUESTED CONCURRENT DEPLOY LIMIT UP TO THE CEILING
+EXECUTOR_MAX_WORKERS = 30
+EXECUTOR_MAX_WORKERS_CEILING = 100
+
+# RETRIES OF TRANSIENT LAUNCH FAILURES WHEN LAUNCH RETRY COUNT INPUT IS MISSING, MATCHES BLUEPRINT DEFAULT
+LAUNCH_RETRY_DEFAULT_COUNT = "2"
+
+# BACKOFF BETWEEN RETRIES OF TRANSIENT LAUNCH FAILURES, DOUBLED EACH ATTEMPT
+LAUNCH_RETRY_BASE_DELAY_SECONDS = 30
+LAUNCH_RETRY_MAX_DELAY_SECONDS = 300
+
+# SANDBOX CONTROLLER SERVICE
+SANDBOX_CONTROLLER_MODEL = "Sandbox Controller"
+
+# SANDBOX CONTROLLER ATTRIBUTE NAMES
+SANDBOX_ID_ATTR = "{}.Sandbox Id".format(SANDBOX_CONTROLLER_MODEL)
+
+# SANDBOX SHELL COMMAND NAMES
+START_SANDBOX_COMMAND = "start_sandbox"
+END_SANDBOX_COMMAND = "end_sandbox"
+SYNC_REMAINING_TIME_COMMAND = "sync_remaining_time"
+START_SANDBOX_DURATION_PARAM = "duration_minutes"
+
+# PER CHILD TIMEOUTS OF ASYNC ENGINE FAN-OUTS, DRIVER POLLS CHILD TEARDOWN UP TO 45 MINUTES
+SYNC_REMAINING_TIME_TIMEOUT_SECONDS = 300
+END_SANDBOX_TIMEOUT_SECONDS = 3000
@@ -0,0 +1,6 @@
+from cloudshell.workflow.orchestration.sandbox import Sandbox
+from retry_failed_sandboxes import retry_failed_sandboxes_flow
+
+sandbox = Sandbox()
+
+retry_failed_sandboxes_flow(sandbox=sandbox, components=None)
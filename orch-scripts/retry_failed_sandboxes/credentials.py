@@ -0,0 +1,10 @@
+"""
+Set your Cloudshell Credentials here
+"""
+
+credentials = {
+    "user": "admin",
+    "password": "admin",
+    "domain": "Global",
+    "server": "localhost",
+}
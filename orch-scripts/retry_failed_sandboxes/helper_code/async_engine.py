@@ -0,0 +1,242 @@
+"""
+Asyncio engine over the blocking CloudShell API.
+Each API call runs on the bounded executor and is awaited through an asyncio future, so a fan-out to thousands of
+components is thousands of lightweight tasks while thread count stays at the executor ceiling.
+Fan-outs get per-component timeouts and cancel their remaining tasks when the caller fails or is cancelled.
+NOTE: a timed out call stops being awaited but its worker thread finishes the blocking call in the background,
+its result is dropped if the event loop was closed meanwhile.
+"""
+import asyncio
+from time import time
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession, InputNameValue
+from helper_code.bounded_executor import BoundedExecutor, get_shared_executor
+from helper_code.execute_async_helper import CommandResult
+
+
+class CommandTimeoutError(Exception):
+    pass
+
+
+def _resolve_future(future, result=None, error=None, submission_limit=None):
+    if submission_limit is not None:
+        # worker thread is free again
+        submission_limit.release()
+    if future.done():
+        # awaiting task was cancelled or timed out
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _resolve_future_threadsafe(loop, future, result=None, error=None, submission_limit=None):
+    """
+    runs on the pool's result handler thread, which must never raise or the shared executor stops delivering results
+    :param asyncio.AbstractEventLoop loop:
+    :param asyncio.Future future:
+    :param result:
+    :param Exception error:
+    :param asyncio.Semaphore submission_limit: slot held since submit, released on the loop thread
+    :return:
+    """
+    try:
+        loop.call_soon_threadsafe(_resolve_future, future, result, error, submission_limit)
+    except RuntimeError:
+        # loop already closed, the call timed out or was cancelled and run_async returned
+        pass
+
+
+class AsyncCloudShellApi(object):
+    def __init__(self, api, executor=None):
+        """
+        :param CloudShellAPISession api:
+        :param BoundedExecutor executor: defaults to executor shared across the script run
+        """
+        self._api = api
+        self._executor = executor if executor else get_shared_executor()
+        # never submit more than the pool can take, so submit does not block the event loop
+        # a slot is held until the executor callback fires, a timed out call keeps it while its worker is busy
+        self._submission_limit = None
+
+    @property
+    def max_concurrency(self):
+        return self._executor.max_workers
+
+    async def run(self, func, *args):
+        """
+        run any blocking function on the bounded executor
+        :param func:
+        :param args:
+        :return: function return value
+        """
+        loop = asyncio.get_event_loop()
+        if self._submission_limit is None:
+            self._submission_limit = asyncio.Semaphore(self._executor.max_workers)
+        submission_limit = self._submission_limit
+        await submission_limit.acquire()
+        future = loop.create_future()
+        try:
+            self._executor.submit(
+                func,
+                args,
+                callback=lambda result: _resolve_future_threadsafe(loop, future, result, None, submission_limit),
+                error_callback=lambda error: _resolve_future_threadsafe(loop, future, None, error, submission_limit),
+            )
+        except BaseException:
+            submission_limit.release()
+            raise
+        return await future
+
+    async def call(self, method_name, **kwargs):
+        """
+        await CloudShellAPISession method by name, 'await async_api.call("EndReservation", reservationId=res_id)'
+        :param str method_name:
+        :param kwargs: api method keyword arguments
+        :return: api response
+        """
+        api_method = getattr(self._api, method_name)
+        return await self.run(lambda: api_method(**kwargs))
+
+
+async def execute_command_async(
+    async_api, res_id, target_name, target_type, command_name, command_inputs=None, timeout_seconds=None
+):
+    """
+    run command and capture output or exception along with elapsed time, never raises except on cancellation
+    :param AsyncCloudShellApi async_api:
+    :param str res_id:
+    :param str target_name:
+    :param str target_type: "Resource" or "Service"
+    :param str command_name:
+    :param list[InputNameValue] command_inputs:
+    :param float timeout_seconds: None to wait indefinitely
+    :return:
+    :rtype: CommandResult
+    """
+    start_time = time()
+    execute_command = async_api.call(
+        "ExecuteCommand",
+        reservationId=res_id,
+        targetName=target_name,
+        targetType=target_type,
+        commandName=command_name,
+        commandInputs=command_inputs if command_inputs else [],
+        printOutput=True,
+    )
+    try:
+        output = (await asyncio.wait_for(execute_command, timeout_seconds)).Output
+    except asyncio.TimeoutError:
+        error = CommandTimeoutError(
+            "'{}' {} timed out after {} seconds".format(target_name, command_name, int(timeout_seconds))
+        )
+        return CommandResult(target_name, None, error, time() - start_time, 1)
+    except Exception as e:
+        return CommandResult(target_name, None, e, time() - start_time, 1)
+    return CommandResult(target_name, output, None, time() - start_time, 1)
+
+
+async def execute_commands_as_completed_async(
+    async_api,
+    res_id,
+    target_components_list,
+    target_type,
+    command_name,
+    command_inputs=None,
+    max_concurrency=0,
+    timeout_seconds=None,
+    on_result=None,
+):
+    """
+    one task per component, at most max_concurrency commands in flight
+    remaining tasks are cancelled if this coroutine is cancelled or on_result raises
+    :param AsyncCloudShellApi async_api:
+    :param str res_id:
+    :param list[str] target_components_list:
+    :param str target_type:
+    :param str command_name:
+    :param list[InputNameValue] command_inputs:
+    :param int max_concurrency: 0 / None to use executor ceiling
+    :param float timeout_seconds: per component timeout
+    :param on_result: blocking callback receiving each CommandResult in completion order, run on executor
+    :return: results in completion order
+    :rtype: list[CommandResult]
+    """
+    concurrency_limit = asyncio.Semaphore(max_concurrency or async_api.max_concurrency)
+
+    async def _run_command(target_name):
+        async with concurrency_limit:
+            return await execute_command_async(
+                async_api, res_id, target_name, target_type, command_name, command_inputs, timeout_seconds
+            )
+
+    tasks = [asyncio.ensure_future(_run_command(target_name)) for target_name in target_components_list]
+    results = []
+    try:
+        for next_completed in asyncio.as_completed(tasks):
+            result = await next_completed
+            results.append(result)
+            if on_result:
+                await async_api.run(on_result, result)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    return results
+
+
+def run_async(coroutine):
+    """
+    run coroutine to completion on a fresh event loop, entry point from blocking orchestration flows
+    :param coroutine:
+    :return: coroutine return value
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def run_commands(
+    api,
+    res_id,
+    target_components_list,
+    target_type,
+    command_name,
+    command_inputs=None,
+    max_concurrency=0,
+    timeout_seconds=None,
+    on_result=None,
+    executor=None,
+):
+    """
+    blocking wrapper of execute_commands_as_completed_async
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param list[str] target_components_list:
+    :param str target_type:
+    :param str command_name:
+    :param list[InputNameValue] command_inputs:
+    :param int max_concurrency: 0 / None to use executor ceiling
+    :param float timeout_seconds: per component timeout
+    :param on_result: blocking callback receiving each CommandResult in completion order
+    :param BoundedExecutor executor: defaults to executor shared across the script run
+    :return: results in completion order
+    :rtype: list[CommandResult]
+    """
+    async_api = AsyncCloudShellApi(api, executor)
+    return run_async(
+        execute_commands_as_completed_async(
+            async_api,
+            res_id,
+            target_components_list,
+            target_type,
+            command_name,
+            command_inputs,
+            max_concurrency,
+            timeout_seconds,
+            on_result,
+        )
+    )
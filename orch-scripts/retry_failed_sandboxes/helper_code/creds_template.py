@@ -0,0 +1,10 @@
+"""
+Credentials template used for keeping passwords from being uploaded to server
+"""
+
+credentials = {
+    "user": "<cloudshell_user>",
+    "password": "<add_password>",
+    "domain": "<add_domain>",
+    "server": "<quali_server>",
+}
@@ -0,0 +1,68 @@
+"""
+Retry budget for child launches and single api calls. Only errors classified as transient
+by 'error_classification' are retried, with exponential backoff and random jitter between attempts.
+"""
+import random
+from time import sleep
+
+from helper_code.error_classification import is_transient_error
+
+
+class RetryPolicy(object):
+    def __init__(
+        self,
+        max_retries=2,
+        base_delay_seconds=30.0,
+        max_delay_seconds=300.0,
+        jitter_ratio=0.5,
+        is_retryable_func=is_transient_error,
+    ):
+        """
+        :param int max_retries: retries per component, on top of first attempt
+        :param float base_delay_seconds: delay before first retry, doubled for each following retry
+        :param float max_delay_seconds: cap on backoff delay before jitter
+        :param float jitter_ratio: delay randomized within +/- this fraction
+        :param is_retryable_func: classifier taking exception, returning bool
+        """
+        self.max_retries = max(0, max_retries)
+        self._base_delay_seconds = base_delay_seconds
+        self._max_delay_seconds = max_delay_seconds
+        self._jitter_ratio = jitter_ratio
+        self._is_retryable_func = is_retryable_func
+
+    def should_retry(self, error, attempt_number):
+        """
+        :param Exception error:
+        :param int attempt_number: attempts made so far, starting at 1
+        :return:
+        :rtype: bool
+        """
+        if attempt_number > self.max_retries:
+            return False
+        return self._is_retryable_func(error)
+
+    def get_delay_seconds(self, attempt_number):
+        """
+        :param int attempt_number: attempts made so far, starting at 1
+        :return:
+        :rtype: float
+        """
+        delay = min(self._max_delay_seconds, self._base_delay_seconds * (2 ** (attempt_number - 1)))
+        jitter = delay * self._jitter_ratio
+        return max(0.0, delay + random.uniform(-jitter, jitter))
+
+    def call(self, func, **kwargs):
+        """
+        run single idempotent call, repeating it while retry budget and error classification allow
+        :param func:
+        :return: func return value
+        """
+        attempt_number = 1
+        while True:
+            try:
+                return func(**kwargs)
+            except Exception as e:
+                if not self.should_retry(e, attempt_number):
+                    raise
+            sleep(self.get_delay_seconds(attempt_number))
+            attempt_number += 1
@@ -0,0 +1,56 @@
+"""
+Reset of controller services whose last launch failed, shared by setup re-runs and 'retry_failed_sandboxes'.
+Children are ended with EndReservation instead of the 'end_sandbox' command, so a reset does not wait on
+driver teardown polling (up to 45 minutes per child). Sandbox Id is only cleared once its child was ended,
+a service whose child could not be ended keeps its id and must not be relaunched.
+"""
+from cloudshell.api.cloudshell_api import AttributeNameValue, CloudShellAPISession
+from helper_code.SandboxReporter import SandboxReporter
+from helper_code.service_registry import ServiceRegistry
+
+# child sandbox statuses that need no end request
+ENDED_SANDBOX_STATUSES = ["completed", "ending"]
+
+
+def _end_child_sandbox(api, child_sandbox_id):
+    sandbox_status = api.GetReservationStatus(child_sandbox_id).ReservationSlimStatus.Status
+    if sandbox_status.lower() not in ENDED_SANDBOX_STATUSES:
+        api.EndReservation(reservationId=child_sandbox_id)
+
+
+def reset_failed_sandboxes(api, res_id, reporter, service_registry, service_names, sandbox_id_attr):
+    """
+    end child sandboxes left behind by failed launches and clear their sandbox id so they can be launched again
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param SandboxReporter reporter:
+    :param ServiceRegistry service_registry:
+    :param list[str] service_names:
+    :param str sandbox_id_attr: full name of controller Sandbox Id attribute
+    :return: services that could not be reset, their child may still be running
+    :rtype: list[str]
+    """
+    sandbox_ids = service_registry.get_sandbox_ids(service_names)
+    to_reset = sorted(name for name in service_names if sandbox_ids[name])
+    if not to_reset:
+        return []
+    reporter.warn_out("Ending {} failed sandboxes before relaunch...".format(len(to_reset)))
+    not_reset = []
+    for service_name in to_reset:
+        try:
+            _end_child_sandbox(api, sandbox_ids[service_name])
+            api.SetServiceAttributesValues(
+                reservationId=res_id,
+                serviceAlias=service_name,
+                attributeRequests=[AttributeNameValue(sandbox_id_attr, "")],
+            )
+        except Exception as e:
+            not_reset.append(service_name)
+            reporter.err_out(
+                "'{}' reset FAILED, child sandbox '{}' kept and not relaunched: {}".format(
+                    service_name, sandbox_ids[service_name], str(e)
+                )
+            )
+            continue
+        service_registry.set_sandbox_id(service_name, "")
+    return not_reset
@@ -0,0 +1,125 @@
+"""
+Remaining time sync of child sandboxes computed by the script instead of by each controller driver.
+Parent remaining time is read once, child remaining times are read concurrently on the async
+engine and only children with less time than the parent are extended.
+Replaces one 'sync_remaining_time' driver command per child, each reading parent remaining time again.
+"""
+import asyncio
+from time import time
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.async_engine import AsyncCloudShellApi, CommandTimeoutError, run_async
+from helper_code.bounded_executor import BoundedExecutor
+from helper_code.execute_async_helper import CommandResult
+from helper_code.SandboxReporter import SandboxReporter
+from helper_code.service_registry import ServiceRegistry
+
+
+async def _sync_child_async(async_api, service_name, child_sandbox_id, parent_remaining_minutes):
+    """
+    :param AsyncCloudShellApi async_api:
+    :param str service_name:
+    :param str child_sandbox_id:
+    :param int parent_remaining_minutes:
+    :return: minutes added to child, 0 if already in sync
+    :rtype: int
+    """
+    if not child_sandbox_id:
+        raise Exception("Can't sync time on '{}'. No sandbox id attr populated".format(service_name))
+    child_remaining = await async_api.call("GetReservationRemainingTime", reservationId=child_sandbox_id)
+    missing_minutes = int(parent_remaining_minutes - child_remaining.RemainingTimeInMinutes)
+    if missing_minutes <= 0:
+        return 0
+    await async_api.call("ExtendReservation", reservationId=child_sandbox_id, minutesToAdd=missing_minutes)
+    return missing_minutes
+
+
+async def _sync_children_async(async_api, child_sandbox_ids, parent_remaining_minutes, timeout_seconds, on_result):
+    async def _run_sync(service_name):
+        start_time = time()
+        try:
+            minutes_added = await asyncio.wait_for(
+                _sync_child_async(async_api, service_name, child_sandbox_ids[service_name], parent_remaining_minutes),
+                timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            error = CommandTimeoutError("'{}' time sync timed out after {} seconds".format(service_name, int(timeout_seconds)))
+            return CommandResult(service_name, None, error, time() - start_time, 1)
+        except Exception as e:
+            return CommandResult(service_name, None, e, time() - start_time, 1)
+        return CommandResult(service_name, minutes_added, None, time() - start_time, 1)
+
+    tasks = [asyncio.ensure_future(_run_sync(service_name)) for service_name in child_sandbox_ids]
+    results = []
+    try:
+        for next_completed in asyncio.as_completed(tasks):
+            result = await next_completed
+            results.append(result)
+            if on_result:
+                await async_api.run(on_result, result)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    return results
+
+
+def sync_children_remaining_time(api, res_id, child_sandbox_ids, timeout_seconds=None, on_result=None, executor=None):
+    """
+    extend each child sandbox that has less remaining time than the parent by the difference
+    :param CloudShellAPISession api:
+    :param str res_id: parent launcher sandbox id
+    :param dict[str, str] child_sandbox_ids: controller service alias to child sandbox id
+    :param float timeout_seconds: per child timeout
+    :param on_result: blocking callback receiving each CommandResult in completion order
+    :param BoundedExecutor executor: defaults to executor shared across the script run
+    :return: results in completion order, output is minutes added to child
+    :rtype: list[CommandResult]
+    """
+    if not child_sandbox_ids:
+        return []
+    parent_remaining_minutes = api.GetReservationRemainingTime(res_id).RemainingTimeInMinutes
+    async_api = AsyncCloudShellApi(api, executor)
+    return run_async(_sync_children_async(async_api, child_sandbox_ids, parent_remaining_minutes, timeout_seconds, on_result))
+
+
+def sync_sandboxes_remaining_time(api, res_id, reporter, service_registry, service_names, timeout_seconds=None):
+    """
+    extend child sandboxes that have less remaining time than parent sandbox and report the outcome
+    :param CloudShellAPISession api:
+    :param str res_id: parent launcher sandbox id
+    :param SandboxReporter reporter:
+    :param ServiceRegistry service_registry: refreshed by caller once children were launched
+    :param list[str] service_names: controller service names
+    :param float timeout_seconds: per child timeout
+    :return: failed service names, None if all synced
+    """
+    failed_sandboxes = []
+    extended_sandboxes = []
+
+    def _on_sync_result(result):
+        if result.error is not None:
+            failed_sandboxes.append(result.component_name)
+            reporter.err_out("'{}' time sync FAILED: {}".format(result.component_name, result.error), log_only=True)
+        elif result.output:
+            extended_sandboxes.append(result.component_name)
+            reporter.info_out("'{}' sandbox extended {} minutes".format(result.component_name, result.output), log_only=True)
+
+    sync_children_remaining_time(
+        api=api,
+        res_id=res_id,
+        child_sandbox_ids=service_registry.get_sandbox_ids(service_names),
+        timeout_seconds=timeout_seconds,
+        on_result=_on_sync_result,
+    )
+    if failed_sandboxes:
+        failed_sandboxes.sort()
+        err_msg = "Failed Sandbox Extensions: {}".format(failed_sandboxes)
+        reporter.err_out(err_msg)
+        return failed_sandboxes
+    reporter.sb_warn_print(
+        "Parent Sandbox time synced up with child sandboxes, {} of {} extended.".format(
+            len(extended_sandboxes), len(service_names)
+        )
+    )
+    return None
@@ -0,0 +1,129 @@
+import SB_GLOBALS as sb_globals
+from cloudshell.api.cloudshell_api import CloudShellAPISession, InputNameValue
+from cloudshell.workflow.orchestration.sandbox import Sandbox
+from helper_code.bounded_executor import size_shared_executor
+from helper_code.execute_async_helper import execute_commands_as_completed
+from helper_code.retry_policy import RetryPolicy
+from helper_code.run_journal import FAILED_STATUS, TIMED_OUT_STATUS, RunJournal
+from helper_code.sandbox_reset import reset_failed_sandboxes
+from helper_code.SandboxReporter import SandboxReporter
+from helper_code.service_registry import ServiceRegistry
+from helper_code.time_sync import sync_sandboxes_remaining_time
+
+
+# ========== Primary Function ==========
+def retry_failed_sandboxes_flow(sandbox, components=None):
+    """
+    relaunch only the services whose last launch failed or timed out, according to the setup run journal
+    Functions passed into orchestration flow MUST have (sandbox, components) signature
+    :param Sandbox sandbox:
+    :param components
+    :return:
+    """
+    api = sandbox.automation_api
+    res_id = sandbox.id
+    logger = sandbox.logger
+    reporter = SandboxReporter(api, res_id, logger)
+    global_inputs_dict = sandbox.global_inputs
+
+    # type conversion for deploy batch count
+    concurrent_deploy_limit = global_inputs_dict.get(sb_globals.CONCURRENT_DEPLOY_LIMIT_INPUT, 0)
+    if isinstance(concurrent_deploy_limit, str):
+        if concurrent_deploy_limit.isdigit():
+            concurrent_deploy_limit = int(concurrent_deploy_limit)
+        else:
+            # off / any / adaptive, relaunch batch is small so run up to executor ceiling
+            concurrent_deploy_limit = 0
+
+    launch_retry_input_val = global_inputs_dict.get(sb_globals.LAUNCH_RETRY_COUNT_INPUT, sb_globals.LAUNCH_RETRY_DEFAULT_COUNT)
+    launch_retry_count = int(launch_retry_input_val) if launch_retry_input_val.isdigit() else 0
+    launch_retry_policy = RetryPolicy(
+        max_retries=launch_retry_count,
+        base_delay_seconds=sb_globals.LAUNCH_RETRY_BASE_DELAY_SECONDS,
+        max_delay_seconds=sb_globals.LAUNCH_RETRY_MAX_DELAY_SECONDS,
+    )
+
+    run_journal = RunJournal(api, res_id, logger)
+    journal_entries = run_journal.load()
+    if not journal_entries:
+        exc_msg = "No launch journal found for this sandbox. Run setup first."
+        reporter.err_out(exc_msg)
+        raise Exception(exc_msg)
+
+    # GET CURRENT SERVICES ON CANVAS
+    service_registry = ServiceRegistry(api, res_id, sb_globals.SANDBOX_CONTROLLER_MODEL).refresh()
+    failed_service_names = RunJournal.get_services_with_status(
+        service_registry.get_aliases(), journal_entries, [FAILED_STATUS, TIMED_OUT_STATUS]
+    )
+    if not failed_service_names:
+        reporter.success_out("No failed sandboxes to retry")
+        return
+
+    reporter.warn_out("Retrying {} failed sandboxes: {}".format(len(failed_service_names), failed_service_names))
+    not_reset_service_names = reset_failed_sandboxes(
+        api, res_id, reporter, service_registry, failed_service_names, sb_globals.SANDBOX_ID_ATTR
+    )
+    # child of these may still run, relaunching would create a second one next to it
+    failed_service_names = [name for name in failed_service_names if name not in not_reset_service_names]
+
+    requested_concurrency = concurrent_deploy_limit if concurrent_deploy_limit else len(failed_service_names)
+    shared_executor = size_shared_executor(requested_concurrency)
+    if shared_executor.max_workers < requested_concurrency:
+        reporter.warn_out(
+            "{} concurrent relaunches requested, executor ceiling clamps it to {} sandboxes at once".format(
+                requested_concurrency, shared_executor.max_workers
+            )
+        )
+
+    remaining_minutes = api.GetReservationRemainingTime(res_id).RemainingTimeInMinutes
+    start_sandbox_inputs = [InputNameValue(sb_globals.START_SANDBOX_DURATION_PARAM, str(int(remaining_minutes)))]
+    failed_sandboxes = []
+    completed_count = 0
+    for result in execute_commands_as_completed(
+        api=api,
+        res_id=res_id,
+        target_components_list=failed_service_names,
+        target_type="Service",
+        command_name=sb_globals.START_SANDBOX_COMMAND,
+        command_inputs=start_sandbox_inputs,
+        max_thread_count=concurrent_deploy_limit,
+        retry_policy=launch_retry_policy,
+    ):
+        completed_count += 1
+        run_journal.record_result(result)
+        elapsed_minutes = result.elapsed_seconds / 60.0
+        if result.error is not None:
+            failed_sandboxes.append(result.component_name)
+            reporter.err_out(
+                "[{}/{}] '{}' FAILED again after {:.2f} minutes: {}".format(
+                    completed_count, len(failed_service_names), result.component_name, elapsed_minutes, result.error
+                )
+            )
+        else:
+            reporter.info_out(
+                "[{}/{}] '{}' deployed after {:.2f} minutes".format(
+                    completed_count, len(failed_service_names), result.component_name, elapsed_minutes
+                )
+            )
+
+    relaunched_service_names = [name for name in failed_service_names if name not in failed_sandboxes]
+    failed_extensions = sync_sandboxes_remaining_time(
+        api,
+        res_id,
+        reporter,
+        service_registry.refresh(),
+        relaunched_service_names,
+        sb_globals.SYNC_REMAINING_TIME_TIMEOUT_SECONDS,
+    )
+    failed_sandboxes.extend(not_reset_service_names)
+    if failed_sandboxes:
+        failed_sandboxes.sort()
+        err_msg = "Failed Sandboxes: {}".format(failed_sandboxes)
+        reporter.err_out(err_msg)
+        raise Exception(err_msg)
+    if failed_extensions:
+        exc_msg = "Extensions failed for: {}".format(failed_extensions)
+        reporter.err_out(exc_msg)
+        raise Exception(exc_msg)
+
+    reporter.success_out("ALL failed Sandboxes relaunched SUCCESSFULLY")
@@ -6,6 +6,70 @@ DEPLOY_CONCURRENTLY_BOOL_INPUT = "Deploy Sandboxes Concurrently"
 CONCURRENT_DEPLOY_LIMIT_INPUT = "Concurrent Deploy Limit"
 HEALTH_CHECK_SANDBOX_INPUT = "Health Check First Sandbox"
 GLOBAL_INPUTS_INPUT = "Sandbox Global Inputs"
+LAUNCH_RATE_PER_MINUTE_INPUT = "Launch Rate Per Minute"
+ABORT_AFTER_FAILURES_INPUT = "Abort After Failures"
+END_SANDBOXES_ON_ABORT_INPUT = "End Sandboxes On Abort"
+LAUNCH_RETRY_COUNT_INPUT = "Launch Retry Count"
+LAUNCH_MODE_INPUT = "Launch Mode"
+CENTRAL_STATUS_POLLING_INPUT = "Central Status Polling"
+LAUNCH_DEADLINE_MINUTES_INPUT = "Launch Deadline Minutes"
+
+# CONCURRENT DEPLOY LIMIT VALUE THAT ENABLES AIMD CONTROLLER
+ADAPTIVE_DEPLOY_LIMIT_VALUE = "adaptive"
+ADAPTIVE_DEPLOY_INITIAL_LIMIT = 2
+ADAPTIVE_DEPLOY_MAX_LIMIT = 20
+
+# SHARED EXECUTOR THREADS, FLOWS GROW IT TO THE REQUESTED CONCURRENT DEPLOY LIMIT UP TO THE CEILING
+EXECUTOR_MAX_WORKERS = 30
+EXECUTOR_MAX_WORKERS_CEILING = 100
+
+# HEALTH CHECK VALUE THAT ENABLES CANARY / WAVE ROLLOUT
+WAVE_ROLLOUT_VALUE = "waves"
+WAVE_CANARY_SIZE = 2
+WAVE_GROWTH_FACTOR = 2.0
+WAVE_MAX_FAILURE_RATIO = 0.2
+
+# HEALTH CHECK VALUE THAT LAUNCHES REMAINING SANDBOXES ONCE HEALTH CHECK PASSES EARLY MILESTONES
+SPECULATIVE_LAUNCH_VALUE = "speculative"
+SPECULATIVE_HEALTHY_SETUP_MINUTES = 5
+
+# COMPLETED LAUNCHES NEEDED BEFORE A PERCENTAGE ABORT THRESHOLD IS EVALUATED
+ABORT_MIN_RESULTS_FOR_RATIO = 5
+
+# RETRIES OF TRANSIENT LAUNCH FAILURES WHEN LAUNCH RETRY COUNT INPUT IS MISSING, MATCHES BLUEPRINT DEFAULT
+LAUNCH_RETRY_DEFAULT_COUNT = "2"
+
+# BACKOFF BETWEEN RETRIES OF TRANSIENT LAUNCH FAILURES, DOUBLED EACH ATTEMPT
+LAUNCH_RETRY_BASE_DELAY_SECONDS = 30
+LAUNCH_RETRY_MAX_DELAY_SECONDS = 300
+
+# LAUNCH MODE VALUE THAT CREATES CHILD RESERVATIONS FROM SETUP SCRIPT INSTEAD OF CONTROLLER DRIVER
+DIRECT_LAUNCH_MODE_VALUE = "direct"
+
+# SHARED CHILD STATUS POLLER, USED BY DIRECT LAUNCH AND CENTRAL STATUS POLLING
+CHILD_STATUS_POLLING_SECONDS = 10
+CHILD_STATUS_MAX_REQUESTS_PER_SECOND = 5
+CHILD_SETUP_MAX_POLLING_MINUTES = 45
+
+# API SESSIONS OF STATUS POLLER, CANCELLATION CHECKS, LAUNCH JOURNAL AND FLOW THREAD CALLS MADE WHILE LAUNCHES RUN
+# SEPARATE FROM LAUNCH SESSIONS, WHICH ARE HELD FOR A WHOLE 'start_sandbox' COMMAND
+CONTROL_API_SESSION_POOL_SIZE = 4
+CONTROL_API_CHECKOUT_TIMEOUT_SECONDS = 60
+
+# MAX WAIT FOR ADDED CONTROLLER SERVICES TO SHOW ON CANVAS
+SERVICES_VISIBLE_TIMEOUT_SECONDS = 60
+
+# CHILD SETUP POLLING CAP AS MULTIPLE OF BLUEPRINT ESTIMATED SETUP DURATION, CHILD_SETUP_MAX_POLLING_MINUTES IF UNKNOWN
+CHILD_SETUP_TIMEOUT_FACTOR = 2.0
+
+# HOW OFTEN LAUNCHES CHECK FOR A CANCEL REQUEST FROM LAUNCHER TEARDOWN
+LAUNCH_CANCEL_POLLING_SECONDS = 10
+
+# RANDOM DELAY AFTER EACH RATE LIMITED LAUNCH, AS FRACTION OF LAUNCH INTERVAL
+LAUNCH_RATE_JITTER_RATIO = 0.25
+
+# SERVER LISTINGS USED BY INPUT VALIDATION ARE CACHED ON DISK BETWEEN LAUNCHES FOR THIS LONG
+DIRECTORY_CACHE_TTL_SECONDS = 600
 
 # SANDBOX CONTROLLER SERVICE
 SANDBOX_CONTROLLER_MODEL = "Sandbox Controller"
@@ -15,6 +79,7 @@ TARGET_BLUEPRINT_ATTR = "{}.Blueprint Name".format(SANDBOX_CONTROLLER_MODEL)
 SANDBOX_OWNER_ATTR = "{}.Sandbox Owner".format(SANDBOX_CONTROLLER_MODEL)
 PERMITTED_USERS_ATTR = "{}.Permitted Users".format(SANDBOX_CONTROLLER_MODEL)
 GLOBAL_INPUTS_ATTR = "{}.Global Inputs".format(SANDBOX_CONTROLLER_MODEL)
+SANDBOX_ID_ATTR = "{}.Sandbox Id".format(SANDBOX_CONTROLLER_MODEL)
 
 # SANDBOX SHELL COMMAND NAMES
 START_SANDBOX_COMMAND = "start_sandbox"
@@ -22,3 +87,13 @@ END_SANDBOX_COMMAND = "end_sandbox"
 EXTEND_SANDBOX_COMMAND = "extend_sandbox"
 SYNC_REMAINING_TIME_COMMAND = "sync_remaining_time"
 START_SANDBOX_DURATION_PARAM = "duration_minutes"
+START_SANDBOX_POLL_PARAM = "poll_provisioning"
+START_SANDBOX_MAX_POLLING_PARAM = "max_polling_minutes"
+START_SANDBOX_END_TIME_PARAM = "end_time"
+
+# CHILDREN GET LAUNCHER END TIME, POST LAUNCH TIME SYNC ONLY IF LAUNCHER END MOVED MORE THAN THIS
+TIME_SYNC_TOLERANCE_MINUTES = 2
+
+# PER CHILD TIMEOUTS OF ASYNC ENGINE FAN-OUTS, DRIVER POLLS CHILD TEARDOWN UP TO 45 MINUTES
+SYNC_REMAINING_TIME_TIMEOUT_SECONDS = 300
+END_SANDBOX_TIMEOUT_SECONDS = 3000
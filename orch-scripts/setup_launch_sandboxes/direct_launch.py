@@ -0,0 +1,324 @@
+"""
+In process launch functions passed as 'command_func' to execute_async_helper.
+DirectLauncher - child reservations are created by the setup script itself, on the shared executor, instead of through
+                 'start_sandbox' on each controller service. Saves a driver activation per child.
+CentrallyPolledLauncher - 'start_sandbox' still runs on controller driver but returns once child is created,
+                          provisioning is then awaited on the shared SandboxStatusPoller.
+Controller services are still updated (Sandbox Id attribute, live status) so they remain the UI layer.
+"""
+import threading
+
+# names only used as docstring types are marked noqa: F401
+import SB_GLOBALS as sb_globals
+from cloudshell.api.cloudshell_api import AttributeNameValue, CloudShellAPISession, InputNameValue  # noqa: F401
+from helper_code.execute_async_helper import CancellationToken, _execute_command_wrapper  # noqa: F401
+from helper_code.error_classification import API_CALL_MAX_ATTEMPTS, API_CALL_RETRY_WAIT_MS, PermanentError
+from helper_code.launch_cancellation import end_child_sandbox
+from helper_code.parse_global_inputs import get_global_input_request_from_semicolon_sep_str
+from helper_code.retry_policy import RetryPolicy
+from helper_code.SandboxReporter import SandboxReporter  # noqa: F401
+from helper_code.status_poller import SandboxStatusPoller  # noqa: F401
+from helper_code.util_helpers import get_minutes_until, sandbox_name_truncater
+
+# child sandbox statuses that can no longer become ready
+ENDED_SANDBOX_STATUSES = ["completed", "ending"]
+
+# single idempotent api calls, same attempts and classification as controller driver
+_api_call_retry_policy = RetryPolicy(
+    max_retries=API_CALL_MAX_ATTEMPTS - 1, base_delay_seconds=API_CALL_RETRY_WAIT_MS / 1000.0, jitter_ratio=0
+)
+
+
+def _set_live_status(api, res_id, reporter, service_name, live_status_name, additional_info):
+    try:
+        api.SetServiceLiveStatus(
+            reservationId=res_id,
+            serviceAlias=service_name,
+            liveStatusName=live_status_name,
+            additionalInfo=additional_info,
+        )
+    except Exception as e:
+        reporter.warn_out("'{}' live status not updated. {}".format(service_name, str(e)), log_only=True)
+
+
+def _get_max_polling_minutes(command_inputs):
+    """
+    per child setup budget passed by launcher, default cap when not passed
+    :param list[InputNameValue] command_inputs:
+    :return:
+    :rtype: int
+    """
+    max_polling_input = [i.Value for i in command_inputs or [] if i.Name == sb_globals.START_SANDBOX_MAX_POLLING_PARAM]
+    if max_polling_input and max_polling_input[0]:
+        return int(max_polling_input[0])
+    return sb_globals.CHILD_SETUP_MAX_POLLING_MINUTES
+
+
+def _get_duration_minutes(command_inputs):
+    """
+    minutes until launcher end time when passed, so child ends with launcher however long it waited in queue
+    :param list[InputNameValue] command_inputs: duration_minutes input is fallback
+    :return:
+    :rtype: int
+    """
+    end_time_input = [i.Value for i in command_inputs or [] if i.Name == sb_globals.START_SANDBOX_END_TIME_PARAM]
+    if end_time_input and end_time_input[0]:
+        return get_minutes_until(end_time_input[0])
+    duration_input = [i.Value for i in command_inputs or [] if i.Name == sb_globals.START_SANDBOX_DURATION_PARAM]
+    return int(duration_input[0])
+
+
+def _end_if_cancelled(api, cancellation_token, service_name, child_sandbox_id):
+    """
+    end child as soon as its id is known if launches were cancelled meanwhile
+    :param CloudShellAPISession api:
+    :param CancellationToken cancellation_token:
+    :param str service_name:
+    :param str child_sandbox_id:
+    :return:
+    """
+    if not cancellation_token or not cancellation_token.is_cancelled():
+        return
+    end_child_sandbox(api, child_sandbox_id)
+    raise PermanentError("'{}' launch cancelled, child sandbox ended. {}".format(service_name, cancellation_token.reason))
+
+
+def _check_existing_child(api, service_name, child_sandbox_id):
+    """
+    child found on a retried start may have ended or failed provisioning after the earlier attempt failed
+    :param CloudShellAPISession api:
+    :param str service_name:
+    :param str child_sandbox_id:
+    :return:
+    :raises PermanentError: child ended or in provisioning Error
+    """
+    child_status = _api_call_retry_policy.call(api.GetReservationStatus, reservationId=child_sandbox_id).ReservationSlimStatus
+    if child_status.Status.lower() in ENDED_SANDBOX_STATUSES or child_status.ProvisioningStatus.lower() == "error":
+        raise PermanentError(
+            "'{}' existing sandbox status '{}', provisioning status '{}'".format(
+                service_name, child_status.Status, child_status.ProvisioningStatus
+            )
+        )
+
+
+def _wait_for_provisioning(api, res_id, reporter, status_poller, service_name, child_sandbox_id, max_polling_minutes):
+    """
+    wait on central poller and mirror result to controller live status, same messages as driver polling
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param SandboxReporter reporter:
+    :param SandboxStatusPoller status_poller:
+    :param str service_name:
+    :param str child_sandbox_id:
+    :param int max_polling_minutes:
+    :return:
+    :rtype: str
+    """
+    try:
+        provisioning_status, elapsed_minutes = status_poller.wait_for_setup(child_sandbox_id, max_polling_minutes)
+    except Exception as e:
+        exc_msg = "'{}' {}".format(service_name, str(e))
+        _set_live_status(api, res_id, reporter, service_name, "Error", exc_msg)
+        # poller timeout stays permanent, its message alone would read as a transient timeout
+        raise PermanentError(exc_msg) if isinstance(e, PermanentError) else Exception(exc_msg)
+    if provisioning_status.lower() == "error":
+        exc_msg = "'{}' provisioning status '{}' after {} minutes".format(service_name, provisioning_status, elapsed_minutes)
+        _set_live_status(api, res_id, reporter, service_name, "Error", exc_msg)
+        raise PermanentError(exc_msg)
+    success_msg = "'{}' status '{}' after {} minutes".format(service_name, provisioning_status, elapsed_minutes)
+    _set_live_status(api, res_id, reporter, service_name, "Online", success_msg)
+    return success_msg
+
+
+class CentrallyPolledLauncher(object):
+    def __init__(self, reporter, status_poller, cancellation_token=None):
+        """
+        :param SandboxReporter reporter:
+        :param SandboxStatusPoller status_poller:
+        :param CancellationToken cancellation_token: children returned after cancellation are ended instead of polled
+        """
+        self._reporter = reporter
+        self._status_poller = status_poller
+        self._cancellation_token = cancellation_token
+
+    def start_sandbox(self, api, res_id, target_name, target_type, command_name, command_inputs=None):
+        """
+        run 'start_sandbox' without driver side polling, then wait on central poller
+        signature matches 'command_func' of execute_async_helper
+        :param CloudShellAPISession api:
+        :param str res_id:
+        :param str target_name: controller service alias
+        :param str target_type:
+        :param str command_name:
+        :param list[InputNameValue] command_inputs:
+        :return:
+        :rtype: str
+        """
+        command_inputs = list(command_inputs or [])
+        command_inputs.append(InputNameValue(sb_globals.START_SANDBOX_POLL_PARAM, "False"))
+        child_sandbox_id = _execute_command_wrapper(api, res_id, target_name, target_type, command_name, command_inputs)
+        if not child_sandbox_id:
+            raise Exception("'{}' start_sandbox returned no sandbox id, update Sandbox Controller shell".format(target_name))
+        _end_if_cancelled(api, self._cancellation_token, target_name, child_sandbox_id)
+        return _wait_for_provisioning(
+            api,
+            res_id,
+            self._reporter,
+            self._status_poller,
+            target_name,
+            child_sandbox_id,
+            _get_max_polling_minutes(command_inputs),
+        )
+
+
+class DirectLauncher(object):
+    def __init__(self, api, res_id, reporter, launcher_owner, status_poller, cancellation_token=None):
+        """
+        :param CloudShellAPISession api:
+        :param str res_id: launcher sandbox id
+        :param SandboxReporter reporter:
+        :param str launcher_owner: becomes owner of child sandboxes, same as driver launch
+        :param SandboxStatusPoller status_poller: child provisioning is awaited on shared poller
+        :param CancellationToken cancellation_token: children created after cancellation are ended instead of polled
+        """
+        self._api = api
+        self._res_id = res_id
+        self._reporter = reporter
+        self._launcher_owner = launcher_owner
+        self._status_poller = status_poller
+        self._cancellation_token = cancellation_token
+        self._service_attributes = None
+        self._lock = threading.Lock()
+
+    def _get_service_attributes(self, service_name):
+        """
+        controller attributes keyed by short name, read once for all services
+        :param str service_name:
+        :return:
+        :rtype: dict[str, str]
+        """
+        with self._lock:
+            if self._service_attributes is None:
+                all_services = self._api.GetReservationDetails(self._res_id).ReservationDescription.Services
+                prefix = "{}.".format(sb_globals.SANDBOX_CONTROLLER_MODEL)
+                self._service_attributes = {
+                    service.Alias: {attr.Name.replace(prefix, "", 1): attr.Value for attr in service.Attributes}
+                    for service in all_services
+                    if service.ServiceName == sb_globals.SANDBOX_CONTROLLER_MODEL
+                }
+            return self._service_attributes.get(service_name, {})
+
+    def _fail(self, service_name, exc_msg, is_permanent=False):
+        _set_live_status(self._api, self._res_id, self._reporter, service_name, "Error", exc_msg)
+        raise PermanentError(exc_msg) if is_permanent else Exception(exc_msg)
+
+    def start_sandbox(self, api, res_id, target_name, target_type, command_name, command_inputs=None):
+        """
+        in process equivalent of controller 'start_sandbox' command
+        signature matches 'command_func' of execute_async_helper
+        :param CloudShellAPISession api:
+        :param str res_id:
+        :param str target_name: controller service alias
+        :param str target_type:
+        :param str command_name:
+        :param list[InputNameValue] command_inputs: expects duration_minutes input, end_time input preferred if passed
+        :return:
+        :rtype: str
+        """
+        service_name = target_name
+        attributes = self._get_service_attributes(service_name)
+        duration_input = [i.Value for i in command_inputs or [] if i.Name == sb_globals.START_SANDBOX_DURATION_PARAM]
+        if not duration_input or not duration_input[0]:
+            self._fail(service_name, "'{}' duration_minutes input not populated".format(service_name))
+        blueprint_name = attributes.get("Blueprint Name")
+        if not blueprint_name:
+            self._fail(service_name, "Please populate Blueprint Name attribute")
+        permitted_users_list = [s.strip() for s in attributes.get("Permitted Users", "").split(",") if s.strip()]
+        is_notify = attributes.get("Email Notifications", "True") == "True"
+
+        existing_sandbox_id = attributes.get("Sandbox Id")
+        if existing_sandbox_id:
+            # retry after a transient failure that came after the child was created, its state is unknown
+            try:
+                _check_existing_child(api, service_name, existing_sandbox_id)
+            except PermanentError as e:
+                self._fail(service_name, str(e), is_permanent=True)
+            except Exception as e:
+                self._fail(service_name, str(e))
+            _api_call_retry_policy.call(
+                api.AddPermittedUsersToReservation, reservationId=existing_sandbox_id, usernames=permitted_users_list
+            )
+            self._reporter.warn_out("'{}' sandbox already exists".format(service_name))
+            return _wait_for_provisioning(
+                api,
+                res_id,
+                self._reporter,
+                self._status_poller,
+                service_name,
+                existing_sandbox_id,
+                _get_max_polling_minutes(command_inputs),
+            )
+
+        try:
+            child_sandbox_id = api.CreateImmediateTopologyReservation(
+                reservationName=sandbox_name_truncater(service_name),
+                owner=self._launcher_owner,
+                durationInMinutes=_get_duration_minutes(command_inputs),
+                notifyOnStart=is_notify,
+                notifyOnEnd=is_notify,
+                notificationMinutesBeforeEnd=10,
+                topologyFullPath=blueprint_name,
+                globalInputs=get_global_input_request_from_semicolon_sep_str(attributes.get("Global Inputs")),
+                notifyOnSetupComplete=is_notify,
+            ).Reservation.Id
+        except Exception as e:
+            self._fail(service_name, "'{}' sandbox start failed. {}".format(service_name, str(e)))
+
+        try:
+            _api_call_retry_policy.call(
+                api.SetServiceAttributesValues,
+                reservationId=res_id,
+                serviceAlias=service_name,
+                attributeRequests=[AttributeNameValue(sb_globals.SANDBOX_ID_ATTR, child_sandbox_id)],
+            )
+        except Exception as e:
+            # untracked child would be orphaned by a relaunch, end it before failing
+            exc_msg = "'{}' failed to record Sandbox Id, child sandbox ended. {}".format(service_name, str(e))
+            try:
+                api.EndReservation(reservationId=child_sandbox_id)
+            except Exception as end_error:
+                # report orphan but fail with the attribute write error that caused it
+                self._reporter.err_out(
+                    "'{}' child sandbox '{}' NOT ended, end it manually. {}".format(
+                        service_name, child_sandbox_id, str(end_error)
+                    )
+                )
+                exc_msg = "'{}' failed to record Sandbox Id, child sandbox '{}' NOT ended. {}".format(
+                    service_name, child_sandbox_id, str(e)
+                )
+            self._fail(service_name, exc_msg)
+        with self._lock:
+            attributes["Sandbox Id"] = child_sandbox_id
+        _end_if_cancelled(api, self._cancellation_token, service_name, child_sandbox_id)
+
+        try:
+            _api_call_retry_policy.call(
+                api.AddPermittedUsersToReservation, reservationId=child_sandbox_id, usernames=permitted_users_list
+            )
+        except Exception as e:
+            self._fail(
+                service_name,
+                "Issue adding permitted users. Sandbox: '{}', Users: {}. {}".format(
+                    service_name, permitted_users_list, str(e)
+                ),
+            )
+
+        return _wait_for_provisioning(
+            api,
+            res_id,
+            self._reporter,
+            self._status_poller,
+            service_name,
+            child_sandbox_id,
+            _get_max_polling_minutes(command_inputs),
+        )
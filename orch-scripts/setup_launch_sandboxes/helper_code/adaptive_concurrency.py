@@ -0,0 +1,96 @@
+"""
+Additive increase / multiplicative decrease (AIMD) limit for concurrent child sandbox launches.
+Limit grows by one per window of healthy completions, and is cut on failures or latency spikes.
+"""
+import threading
+
+
+class AimdConcurrencyController(object):
+    def __init__(
+        self,
+        initial_limit=2,
+        min_limit=1,
+        max_limit=20,
+        additive_increase=1,
+        decrease_factor=0.5,
+        latency_spike_factor=2.0,
+        latency_smoothing=0.3,
+    ):
+        """
+        :param int initial_limit: concurrency before any results are observed
+        :param int min_limit:
+        :param int max_limit:
+        :param int additive_increase: added to limit after a full window of healthy results
+        :param float decrease_factor: limit multiplied by this on error or latency spike
+        :param float latency_spike_factor: result slower than baseline * factor counts as a spike
+        :param float latency_smoothing: weight of newest sample in exponential moving average baseline
+        """
+        self._min_limit = max(1, min_limit)
+        self._max_limit = max(self._min_limit, max_limit)
+        self._limit = min(max(initial_limit, self._min_limit), self._max_limit)
+        self._additive_increase = additive_increase
+        self._decrease_factor = decrease_factor
+        self._latency_spike_factor = latency_spike_factor
+        self._latency_smoothing = latency_smoothing
+        self._baseline_latency = None
+        self._healthy_streak = 0
+        # results still in flight when limit is cut were started under the old limit, don't punish twice
+        self._results_until_next_decrease = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self):
+        with self._lock:
+            return self._limit
+
+    @property
+    def baseline_latency_seconds(self):
+        with self._lock:
+            return self._baseline_latency
+
+    def _is_latency_spike(self, elapsed_seconds):
+        if self._baseline_latency is None:
+            return False
+        return elapsed_seconds > self._baseline_latency * self._latency_spike_factor
+
+    def _update_baseline(self, elapsed_seconds):
+        if self._baseline_latency is None:
+            self._baseline_latency = elapsed_seconds
+        else:
+            weight = self._latency_smoothing
+            self._baseline_latency = weight * elapsed_seconds + (1 - weight) * self._baseline_latency
+
+    def _decrease(self):
+        self._healthy_streak = 0
+        if self._results_until_next_decrease > 0:
+            return
+        self._limit = max(self._min_limit, int(self._limit * self._decrease_factor))
+        self._results_until_next_decrease = self._limit
+
+    def record_result(self, elapsed_seconds, is_error):
+        """
+        feed completed launch back into controller
+        :param float elapsed_seconds:
+        :param bool is_error:
+        :return: limit after adjustment
+        :rtype: int
+        """
+        with self._lock:
+            if self._results_until_next_decrease > 0:
+                self._results_until_next_decrease -= 1
+
+            if is_error:
+                self._decrease()
+                return self._limit
+
+            is_spike = self._is_latency_spike(elapsed_seconds)
+            self._update_baseline(elapsed_seconds)
+            if is_spike:
+                self._decrease()
+                return self._limit
+
+            self._healthy_streak += 1
+            if self._healthy_streak >= self._limit:
+                self._healthy_streak = 0
+                self._limit = min(self._max_limit, self._limit + self._additive_increase)
+            return self._limit
@@ -0,0 +1,183 @@
+"""
+Bounded pool of CloudShell API sessions for concurrent fan-outs.
+Each call made through PooledApi checks a session out of the pool, so worker threads never share one session's
+transport state. Sessions idle past a threshold are health checked before reuse, sessions that failed with a
+connection error are discarded, and checkout wait times are recorded to show whether the pool is a bottleneck.
+"""
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import time
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.error_classification import is_transient_error
+
+DEFAULT_POOL_SIZE = 30
+DEFAULT_IDLE_CHECK_SECONDS = 60
+
+
+class SessionPoolTimeoutError(Exception):
+    pass
+
+
+def get_sandbox_session_factory(sandbox):
+    """
+    new sessions log in with the orchestration run's connectivity and token
+    :param sandbox: orchestration Sandbox
+    :return: no argument callable returning CloudShellAPISession
+    """
+    connectivity = sandbox.connectivityContextDetails
+    domain = sandbox.reservationContextDetails.domain
+    return lambda: CloudShellAPISession(
+        host=connectivity.server_address,
+        token_id=connectivity.admin_auth_token,
+        domain=domain,
+        port=connectivity.cloudshell_api_port,
+    )
+
+
+def _check_session_health(session):
+    session.GetServerDateAndTime()
+
+
+class ApiSessionPool(object):
+    def __init__(
+        self,
+        session_factory,
+        max_size=DEFAULT_POOL_SIZE,
+        health_check_func=_check_session_health,
+        idle_check_seconds=DEFAULT_IDLE_CHECK_SECONDS,
+    ):
+        """
+        :param session_factory: no argument callable returning logged in CloudShellAPISession
+        :param int max_size: sessions checked out at once, further checkouts wait
+        :param health_check_func: callable receiving session, raises if session is unusable
+        :param float idle_check_seconds: sessions idle longer than this are health checked before reuse
+        """
+        self._session_factory = session_factory
+        self._max_size = max(1, max_size)
+        self._health_check_func = health_check_func
+        self._idle_check_seconds = idle_check_seconds
+        self._checkout_slots = threading.BoundedSemaphore(self._max_size)
+        self._idle_sessions = deque()
+        self._lock = threading.Lock()
+        self._created_count = 0
+        self._discarded_count = 0
+        self._checkout_count = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def _pop_idle_session(self):
+        """
+        most recently used idle session, health checked if idle too long
+        :return: None if no usable idle session
+        :rtype: CloudShellAPISession
+        """
+        while True:
+            with self._lock:
+                if not self._idle_sessions:
+                    return None
+                session, last_used_time = self._idle_sessions.pop()
+            if not self._health_check_func or time() - last_used_time < self._idle_check_seconds:
+                return session
+            try:
+                self._health_check_func(session)
+                return session
+            except Exception:
+                with self._lock:
+                    self._discarded_count += 1
+
+    def _acquire_session(self, timeout_seconds=None):
+        start_time = time()
+        if not self._checkout_slots.acquire(timeout=timeout_seconds):
+            raise SessionPoolTimeoutError(
+                "No API session free after {} seconds, pool size {}".format(timeout_seconds, self._max_size)
+            )
+        wait_seconds = time() - start_time
+        with self._lock:
+            self._checkout_count += 1
+            self._total_wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+        try:
+            session = self._pop_idle_session()
+            if session is None:
+                session = self._session_factory()
+                with self._lock:
+                    self._created_count += 1
+        except Exception:
+            self._checkout_slots.release()
+            raise
+        return session
+
+    def _release_session(self, session, is_healthy=True):
+        with self._lock:
+            if is_healthy:
+                self._idle_sessions.append((session, time()))
+            else:
+                self._discarded_count += 1
+        self._checkout_slots.release()
+
+    @contextmanager
+    def checkout(self, timeout_seconds=None):
+        """
+        'with pool.checkout() as api:' session is returned to pool on exit
+        discarded instead if a connection level error was raised while checked out
+        :param float timeout_seconds: None to wait for a free session indefinitely
+        :return:
+        :rtype: CloudShellAPISession
+        """
+        session = self._acquire_session(timeout_seconds)
+        is_healthy = True
+        try:
+            yield session
+        except Exception as e:
+            is_healthy = not is_transient_error(e)
+            raise
+        finally:
+            self._release_session(session, is_healthy)
+
+    def get_metrics(self):
+        """
+        :return: created, discarded, idle and checkout counts, average and max checkout wait
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "max_size": self._max_size,
+                "created": self._created_count,
+                "discarded": self._discarded_count,
+                "idle": len(self._idle_sessions),
+                "checkouts": self._checkout_count,
+                "avg_wait_ms": 1000.0 * self._total_wait_seconds / self._checkout_count if self._checkout_count else 0.0,
+                "max_wait_ms": 1000.0 * self._max_wait_seconds,
+            }
+
+    def close(self):
+        """
+        drop idle sessions, checked out sessions are dropped when returned
+        :return:
+        """
+        with self._lock:
+            self._idle_sessions.clear()
+
+
+class PooledApi(object):
+    def __init__(self, session_pool, checkout_timeout_seconds=None):
+        """
+        drop-in for CloudShellAPISession in fan-outs, each method call runs on a session checked out for that call
+        :param ApiSessionPool session_pool:
+        :param float checkout_timeout_seconds:
+        """
+        self._session_pool = session_pool
+        self._checkout_timeout_seconds = checkout_timeout_seconds
+
+    def __getattr__(self, name):
+        def _call_on_pooled_session(*args, **kwargs):
+            with self._session_pool.checkout(self._checkout_timeout_seconds) as session:
+                return getattr(session, name)(*args, **kwargs)
+
+        return _call_on_pooled_session
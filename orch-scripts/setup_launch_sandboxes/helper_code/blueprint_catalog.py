@@ -0,0 +1,116 @@
+"""
+Indexed blueprint catalog of the domain.
+Blueprint full paths and names are indexed from one GetTopologiesByCategory listing, cached on disk between
+launches, so a blueprint check is a dict lookup instead of a scan of the full listing on every launch.
+Details used by the launch (global inputs, estimated setup / teardown duration) are cached per blueprint.
+A name missing from a cached listing triggers one fresh listing, so newly added blueprints are still found.
+"""
+from collections import namedtuple
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.ttl_cache import TtlFileCache, get_server_cache_key
+
+BLUEPRINT_CATALOG_CACHE_NAME = "blueprint_catalog"
+BLUEPRINT_DETAILS_CACHE_NAME = "blueprint_details"
+
+BlueprintInfo = namedtuple(
+    "BlueprintInfo",
+    ["full_path", "name", "estimated_setup_duration", "estimated_teardown_duration", "global_inputs"],
+)
+
+
+class BlueprintCatalog(object):
+    def __init__(self, api, cache=None):
+        """
+        :param CloudShellAPISession api:
+        :param TtlFileCache cache: None to list blueprints on every launch
+        """
+        self._api = api
+        self._cache = cache
+        self._catalog_cache_key = get_server_cache_key(api, BLUEPRINT_CATALOG_CACHE_NAME)
+        self._paths_by_name = None
+        self._is_from_cache = False
+
+    def _load_blueprint_paths(self, is_refresh=False):
+        """
+        :param bool is_refresh: skip cache and list blueprints again
+        :return:
+        :rtype: list[str]
+        """
+        if self._cache and not is_refresh:
+            cached_paths = self._cache.get(self._catalog_cache_key)
+            if cached_paths is not None:
+                self._is_from_cache = True
+                return cached_paths
+        blueprint_paths = list(self._api.GetTopologiesByCategory().Topologies)
+        self._is_from_cache = False
+        if self._cache:
+            self._cache.set(self._catalog_cache_key, blueprint_paths)
+        return blueprint_paths
+
+    def _build_index(self, blueprint_paths):
+        """
+        full path and blueprint name both map to full paths, a name may exist in several folders
+        :param list[str] blueprint_paths:
+        :return:
+        """
+        self._paths_by_name = {}
+        for blueprint_path in blueprint_paths:
+            for key in {blueprint_path, blueprint_path.split("/")[-1]}:
+                self._paths_by_name.setdefault(key, []).append(blueprint_path)
+
+    def find_blueprint_paths(self, bp_name):
+        """
+        :param str bp_name: blueprint name or full path
+        :return: matching full paths, empty if not in domain
+        :rtype: list[str]
+        """
+        if self._paths_by_name is None:
+            self._build_index(self._load_blueprint_paths())
+        if bp_name not in self._paths_by_name and self._is_from_cache:
+            self._build_index(self._load_blueprint_paths(is_refresh=True))
+        return self._paths_by_name.get(bp_name, [])
+
+    def is_blueprint_in_domain(self, bp_name):
+        """
+        :param str bp_name: blueprint name or full path
+        :return:
+        :rtype: bool
+        """
+        return True if self.find_blueprint_paths(bp_name) else False
+
+    def get_blueprint_info(self, bp_name):
+        """
+        details of blueprint, read from server once per cache TTL
+        :param str bp_name: blueprint name or full path
+        :return:
+        :rtype: BlueprintInfo
+        """
+        blueprint_paths = self.find_blueprint_paths(bp_name)
+        if not blueprint_paths:
+            raise Exception("Blueprint '{}' not found in domain".format(bp_name))
+        full_path = blueprint_paths[0]
+        details_cache_key = "{}_{}".format(get_server_cache_key(self._api, BLUEPRINT_DETAILS_CACHE_NAME), full_path)
+        cached_info = self._cache.get(details_cache_key) if self._cache else None
+        if cached_info is not None:
+            return BlueprintInfo(**cached_info)
+        details = self._api.GetTopologyDetails(full_path)
+        blueprint_info = BlueprintInfo(
+            full_path=full_path,
+            name=details.Name,
+            estimated_setup_duration=getattr(details, "EstimatedSetupDuration", ""),
+            estimated_teardown_duration=getattr(details, "EstimatedTearDownDuration", ""),
+            global_inputs={global_input.ParamName: global_input.DefaultValue for global_input in details.GlobalInputs},
+        )
+        if self._cache:
+            self._cache.set(details_cache_key, blueprint_info._asdict())
+        return blueprint_info
+
+    def invalidate(self):
+        """
+        drop cached listing, e.g. after blueprints were added or renamed
+        :return:
+        """
+        self._paths_by_name = None
+        if self._cache:
+            self._cache.invalidate(self._catalog_cache_key)
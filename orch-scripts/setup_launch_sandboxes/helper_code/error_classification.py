@@ -0,0 +1,95 @@
+"""
+Transient vs permanent error classification for CloudShell API calls and child launches.
+Single classifier behind every retry of orchestration scripts and the Sandbox Controller driver,
+driver 'helper_code' holds an identical copy of this file, setup tests fail if the copies drift.
+Errors raised by our own code are classified by type, API and driver errors arrive as text and are matched by message.
+"""
+import socket
+
+# appended to poll timeout messages of driver and setup poller, keeps them permanent once wrapped as api error text
+POLLING_BUDGET_EXHAUSTED_MESSAGE = "polling budget exhausted"
+
+# matched against lower cased error message, permanent patterns win over transient ones
+TRANSIENT_ERROR_PATTERNS = [
+    "timed out",
+    "timeout",
+    "connection reset",
+    "connection refused",
+    "connection aborted",
+    "broken pipe",
+    "server busy",
+    "server is busy",
+    "too many requests",
+    "temporarily unavailable",
+    "service unavailable",
+    "bad gateway",
+    "gateway timeout",
+    "deadlock",
+    "try again",
+]
+PERMANENT_ERROR_PATTERNS = [
+    "not found",
+    "does not exist",
+    "invalid",
+    "not valid",
+    "not authorized",
+    "permission",
+    "please populate",
+    "not populated",
+    "key-pair",
+    # driver reports failed or ended child setup as text through 'ExecuteCommand'
+    "provisioning status",
+    POLLING_BUDGET_EXHAUSTED_MESSAGE,
+]
+
+# rejected or expired api session, fixed by logging in again
+AUTH_ERROR_PATTERNS = [
+    "authentication",
+    "unauthorized",
+    "not logged in",
+    "session expired",
+    "token expired",
+    "invalid token",
+    "login failed",
+]
+
+# retries of a single api call before giving up
+API_CALL_MAX_ATTEMPTS = 3
+API_CALL_RETRY_WAIT_MS = 5000
+
+
+class PermanentError(Exception):
+    """
+    outcome that repeating the call cannot change, e.g. child setup failed or its polling budget ran out
+    never retried, whatever the message says
+    """
+
+    pass
+
+
+def is_transient_error(error):
+    """
+    classify error as transient (worth retrying) or permanent (bad blueprint, bad inputs, failed provisioning)
+    :param Exception error:
+    :return:
+    :rtype: bool
+    """
+    if isinstance(error, PermanentError):
+        return False
+    if isinstance(error, (socket.timeout, ConnectionError)):
+        return True
+    message = str(error).lower()
+    if any(pattern in message for pattern in PERMANENT_ERROR_PATTERNS):
+        return False
+    return any(pattern in message for pattern in TRANSIENT_ERROR_PATTERNS)
+
+
+def is_auth_error(error):
+    """
+    api session was rejected, call may succeed after a new login
+    :param Exception error:
+    :return:
+    :rtype: bool
+    """
+    message = str(error).lower()
+    return any(pattern in message for pattern in AUTH_ERROR_PATTERNS)
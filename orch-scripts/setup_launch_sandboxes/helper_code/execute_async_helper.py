@@ -1,9 +1,70 @@
-from multiprocessing.pool import ThreadPool
+import heapq
+import threading
+from collections import deque, namedtuple
+from queue import Empty, Queue
+from time import sleep, time
 
 from cloudshell.api.cloudshell_api import CloudShellAPISession, InputNameValue
+from helper_code.bounded_executor import BoundedExecutor, get_shared_executor
 
+# error is the raised exception instance, output is None when command failed
+# attempt_count is 1 unless the command was retried
+CommandResult = namedtuple("CommandResult", ["component_name", "output", "error", "elapsed_seconds", "attempt_count"])
 
-# Define the function which will be executed within the ThreadPool
+# how often a waiting dispatch loop re-checks its cancellation token
+CANCELLATION_POLLING_SECONDS = 1
+
+
+class CommandSkippedError(Exception):
+    """
+    set as CommandResult error for components never started because the run was cancelled
+    """
+
+    pass
+
+
+class CancellationToken(object):
+    def __init__(self):
+        """
+        thread safe flag for cooperatively stopping a fan-out. first cancel reason wins
+        """
+        self._event = threading.Event()
+        self._reason = ""
+        self._lock = threading.Lock()
+
+    def cancel(self, reason=""):
+        """
+        :param str reason:
+        :return:
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._reason = reason
+                self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    @property
+    def reason(self):
+        return self._reason
+
+
+def resolve_command_inputs(command_inputs, target_name):
+    """
+    command inputs may be a callable evaluated per component right before it starts
+    the callable raises CommandSkippedError to keep the component from starting
+    :param command_inputs: list[InputNameValue], or callable taking target name and returning one
+    :param str target_name:
+    :return:
+    :rtype: list[InputNameValue]
+    """
+    if callable(command_inputs):
+        return command_inputs(target_name)
+    return command_inputs
+
+
+# Define the function which will be executed within the executor threads
 def _execute_command_wrapper(api, res_id, target_name, target_type, command_name, command_inputs=None):
     """
     function to be passed to threading implementation
@@ -27,6 +88,250 @@ def _execute_command_wrapper(api, res_id, target_name, target_type, command_name
     return res
 
 
+def _timed_execute_command_wrapper(
+    api, res_id, target_name, target_type, command_name, command_inputs=None, attempt_number=1, command_func=None
+):
+    """
+    run command and capture output or exception along with elapsed time, never raises
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param str target_name:
+    :param str target_type: "Resource" or "Service"
+    :param str command_name:
+    :param command_inputs: list[InputNameValue], or callable resolved at start, see resolve_command_inputs
+    :param int attempt_number:
+    :param command_func: replaces ExecuteCommand, same signature as '_execute_command_wrapper'
+    :return:
+    :rtype: CommandResult
+    """
+    command_func = command_func if command_func else _execute_command_wrapper
+    start_time = time()
+    try:
+        target_inputs = resolve_command_inputs(command_inputs, target_name)
+        output = command_func(api, res_id, target_name, target_type, command_name, target_inputs)
+    except Exception as e:
+        return CommandResult(target_name, None, e, time() - start_time, attempt_number)
+    return CommandResult(target_name, output, None, time() - start_time, attempt_number)
+
+
+def execute_command_with_retries(
+    api, res_id, target_name, target_type, command_name, command_inputs=None, retry_policy=None, command_func=None
+):
+    """
+    blocking single command execution, retrying errors accepted by retry policy
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param str target_name:
+    :param str target_type:
+    :param str command_name:
+    :param command_inputs: list[InputNameValue], or callable resolved before each attempt, see resolve_command_inputs
+    :param retry_policy: optional object exposing 'should_retry(error, attempt_number)' and
+                         'get_delay_seconds(attempt_number)'
+    :param command_func: replaces ExecuteCommand, same signature as '_execute_command_wrapper'
+    :return:
+    :rtype: CommandResult
+    """
+    attempt_number = 1
+    while True:
+        result = _timed_execute_command_wrapper(
+            api, res_id, target_name, target_type, command_name, command_inputs, attempt_number, command_func
+        )
+        if isinstance(result.error, CommandSkippedError):
+            return result
+        if result.error is None or not retry_policy or not retry_policy.should_retry(result.error, attempt_number):
+            return result
+        sleep(retry_policy.get_delay_seconds(attempt_number))
+        attempt_number += 1
+
+
+def submit_command(
+    api, res_id, target_name, target_type, command_name, command_inputs=None, callback=None, executor=None, command_func=None
+):
+    """
+    run single command in background, callback receives CommandResult when done
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param str target_name:
+    :param str target_type:
+    :param str command_name:
+    :param command_inputs: list[InputNameValue], or callable resolved at start, see resolve_command_inputs
+    :param callback: called with CommandResult on executor result thread, should not block
+    :param BoundedExecutor executor: defaults to executor shared across the script run
+    :param command_func: replaces ExecuteCommand, same signature as '_execute_command_wrapper'
+    :return:
+    """
+    executor = executor if executor else get_shared_executor()
+    execute_command_tuple_inputs = (
+        api,
+        res_id,
+        target_name,
+        target_type,
+        command_name,
+        command_inputs,
+        1,
+        command_func,
+    )
+    return executor.submit(_timed_execute_command_wrapper, execute_command_tuple_inputs, callback=callback)
+
+
+def _get_wait_timeout(dispatch_wait_seconds, retry_wait_seconds, poll_cancellation):
+    """
+    how long the dispatch loop may block on results, None waits until one arrives
+    0.0 means a retry is ready now and is kept, only an unbounded wait is capped to the cancellation polling interval
+    :param float dispatch_wait_seconds: rate limiter wait, None if not limited
+    :param float retry_wait_seconds: time until next scheduled retry may start, None if there is none
+    :param bool poll_cancellation:
+    :return:
+    :rtype: float
+    """
+    waits = [wait for wait in (dispatch_wait_seconds, retry_wait_seconds) if wait is not None]
+    if poll_cancellation:
+        waits.append(CANCELLATION_POLLING_SECONDS)
+    return min(waits) if waits else None
+
+
+def execute_commands_as_completed(
+    api,
+    res_id,
+    target_components_list,
+    target_type,
+    command_name,
+    command_inputs=None,
+    max_thread_count=0,
+    executor=None,
+    concurrency_controller=None,
+    rate_limiter=None,
+    cancellation_token=None,
+    retry_policy=None,
+    command_func=None,
+):
+    """
+    generator that yields a CommandResult for each component as soon as its command finishes
+    results are yielded in completion order, not in order of target_components_list
+    at most max_thread_count commands are in flight at once, capped by the executor's worker ceiling
+    closing the generator early stops components that have not been started yet
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param list[str] target_components_list:
+    :param str target_type:
+    :param str command_name:
+    :param command_inputs: list[InputNameValue], or callable resolved right before each start, see
+                           resolve_command_inputs. components it skips are yielded with a CommandSkippedError,
+                           any other error it raises is yielded as that component's failed result
+    :param int max_thread_count: 0 / None to use executor ceiling
+    :param BoundedExecutor executor: defaults to executor shared across the script run
+    :param concurrency_controller: optional object exposing 'limit' and 'record_result(elapsed_seconds, is_error)'.
+                                   when passed, its limit replaces max_thread_count and is re-read before each dispatch
+    :param rate_limiter: optional object exposing 'try_acquire()', returning 0 when a start is allowed,
+                         else seconds to wait. applied on top of the concurrency limit
+    :param CancellationToken cancellation_token: once cancelled, components not yet started are yielded
+                                                 with a CommandSkippedError and in flight commands are still collected
+    :param retry_policy: optional object exposing 'should_retry(error, attempt_number)' and
+                         'get_delay_seconds(attempt_number)'. failed commands it accepts are re-queued after the delay
+                         and only the final attempt is yielded
+    :param command_func: replaces ExecuteCommand, same signature as '_execute_command_wrapper'.
+                         used to run launches in process instead of through a shell command
+    :return:
+    :rtype: collections.Iterable[CommandResult]
+    """
+    executor = executor if executor else get_shared_executor()
+
+    def _get_concurrency_limit():
+        if concurrency_controller:
+            return max(1, min(concurrency_controller.limit, executor.max_workers))
+        if max_thread_count:
+            return min(max_thread_count, executor.max_workers)
+        return executor.max_workers
+
+    results_queue = Queue()
+    pending_targets = deque(target_components_list)
+    # heap of (ready_time, target_name, attempt_number, last_failed_result)
+    scheduled_retries = []
+    in_flight_count = 0
+
+    def _pop_ready_retry():
+        if scheduled_retries and scheduled_retries[0][0] <= time():
+            return heapq.heappop(scheduled_retries)
+        return None
+
+    while pending_targets or scheduled_retries or in_flight_count:
+        if cancellation_token and cancellation_token.is_cancelled():
+            while pending_targets:
+                skipped_target = pending_targets.popleft()
+                yield CommandResult(skipped_target, None, CommandSkippedError(cancellation_token.reason), 0.0, 0)
+            while scheduled_retries:
+                yield heapq.heappop(scheduled_retries)[3]
+            if not in_flight_count:
+                break
+
+        dispatch_wait_seconds = None
+        while in_flight_count < _get_concurrency_limit():
+            ready_retry = _pop_ready_retry()
+            if not ready_retry and not pending_targets:
+                break
+            if ready_retry:
+                _, target_name, attempt_number, _ = ready_retry
+            else:
+                target_name = pending_targets.popleft()
+                attempt_number = 1
+            try:
+                target_inputs = resolve_command_inputs(command_inputs, target_name)
+            except CommandSkippedError as e:
+                yield CommandResult(target_name, None, e, 0.0, attempt_number - 1)
+                continue
+            except Exception as e:
+                # inputs could not be built, component fails without starting and without retry
+                yield CommandResult(target_name, None, e, 0.0, attempt_number)
+                continue
+            if rate_limiter:
+                dispatch_wait_seconds = rate_limiter.try_acquire() or None
+                if dispatch_wait_seconds:
+                    if ready_retry:
+                        heapq.heappush(scheduled_retries, ready_retry)
+                    else:
+                        pending_targets.appendleft(target_name)
+                    break
+            execute_command_tuple_inputs = (
+                api,
+                res_id,
+                target_name,
+                target_type,
+                command_name,
+                target_inputs,
+                attempt_number,
+                command_func,
+            )
+            executor.submit(_timed_execute_command_wrapper, execute_command_tuple_inputs, callback=results_queue.put)
+            in_flight_count += 1
+
+        retry_wait_seconds = None
+        if scheduled_retries and in_flight_count < _get_concurrency_limit():
+            retry_wait_seconds = max(0.0, scheduled_retries[0][0] - time())
+        wait_timeout = _get_wait_timeout(dispatch_wait_seconds, retry_wait_seconds, cancellation_token is not None)
+        if not in_flight_count:
+            # nothing to collect, wait out rate limiter or retry backoff before next dispatch
+            if wait_timeout and (scheduled_retries or dispatch_wait_seconds):
+                sleep(wait_timeout)
+            continue
+        try:
+            result = results_queue.get(timeout=wait_timeout)
+        except Empty:
+            continue
+        in_flight_count -= 1
+        if concurrency_controller:
+            concurrency_controller.record_result(result.elapsed_seconds, result.error is not None)
+        if (
+            result.error is not None
+            and retry_policy
+            and not (cancellation_token and cancellation_token.is_cancelled())
+            and retry_policy.should_retry(result.error, result.attempt_count)
+        ):
+            retry_time = time() + retry_policy.get_delay_seconds(result.attempt_count)
+            heapq.heappush(scheduled_retries, (retry_time, result.component_name, result.attempt_count + 1, result))
+            continue
+        yield result
+
+
 def execute_commands_async(
     api,
     res_id,
@@ -35,6 +340,7 @@ def execute_commands_async(
     command_name,
     command_inputs=None,
     max_thread_count=0,
+    executor=None,
 ):
     """
     execute commands async and return tuple of result lists (success_list, exceptions_list)
@@ -45,37 +351,31 @@ def execute_commands_async(
     :param str target_type:
     :param str command_name:
     :param list[InputNameValue] command_inputs:
-    :param int max_thread_count:
+    :param int max_thread_count: 0 / None to use executor ceiling
+    :param BoundedExecutor executor: defaults to executor shared across the script run
     :return:
     """
-    max_thread_count = max_thread_count if max_thread_count else len(target_components_list)
-    thread_pool = ThreadPool(processes=max_thread_count)
-
-    async_results = []
-    for target_name in target_components_list:
-        execute_command_tuple_inputs = (
-            api,
-            res_id,
-            target_name,
-            target_type,
-            command_name,
-            command_inputs,
-        )
-        async_result = thread_pool.apply_async(_execute_command_wrapper, execute_command_tuple_inputs)
-        async_results.append((target_name, async_result))
-    thread_pool.close()
-    thread_pool.join()
-
-    # COLLECT FAILURES FROM ASYNC RESULTS
     success_responses = []
     exception_responses = []
-    for component_name, async_response in async_results:
-        try:
-            response_output = async_response.get()
-        except Exception as e:
-            exception_responses.append((component_name, str(e)))
+    for result in execute_commands_as_completed(
+        api=api,
+        res_id=res_id,
+        target_components_list=target_components_list,
+        target_type=target_type,
+        command_name=command_name,
+        command_inputs=command_inputs,
+        max_thread_count=max_thread_count,
+        executor=executor,
+    ):
+        if result.error is not None:
+            exception_responses.append((result.component_name, str(result.error)))
         else:
-            success_responses.append((component_name, response_output))
+            success_responses.append((result.component_name, result.output))
+
+    # keep response lists in order of targets passed in
+    target_order = {name: i for i, name in enumerate(target_components_list)}
+    success_responses.sort(key=lambda response: target_order[response[0]])
+    exception_responses.sort(key=lambda response: target_order[response[0]])
     return success_responses, exception_responses
 
 
@@ -0,0 +1,66 @@
+"""
+Decide when a fan-out has failed often enough that remaining launches should be abandoned.
+"""
+import threading
+
+
+class FailFastPolicy(object):
+    def __init__(self, max_failures=None, max_failure_ratio=None, min_results_for_ratio=5):
+        """
+        either threshold may be None to disable it
+        :param int max_failures: abort once failure count reaches this value
+        :param float max_failure_ratio: abort once failures / completed exceeds this ratio
+        :param int min_results_for_ratio: completed results needed before ratio is evaluated
+        """
+        self._max_failures = max_failures
+        self._max_failure_ratio = max_failure_ratio
+        self._min_results_for_ratio = max(1, min_results_for_ratio)
+        self._failed_count = 0
+        self._completed_count = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_input_str(cls, input_str, min_results_for_ratio=5):
+        """
+        "off" / "" --> None, "3" --> abort after 3 failures, "20%" --> abort when over 20% of launches fail
+        :param str input_str:
+        :param int min_results_for_ratio:
+        :return:
+        :rtype: FailFastPolicy
+        """
+        input_str = input_str.strip().lower() if input_str else ""
+        if input_str in ["", "0", "false", "f", "off", "no", "n", "none", "[any]", "any"]:
+            return None
+        if input_str.endswith("%"):
+            ratio = float(input_str[:-1]) / 100.0
+            return cls(max_failure_ratio=ratio, min_results_for_ratio=min_results_for_ratio)
+        if input_str.isdigit():
+            return cls(max_failures=int(input_str))
+        raise ValueError("Expected 'off', a failure count, or a failure percentage. Received: {}".format(input_str))
+
+    def record_result(self, is_error):
+        """
+        :param bool is_error:
+        :return: True if thresholds are exceeded and run should abort
+        :rtype: bool
+        """
+        with self._lock:
+            self._completed_count += 1
+            if is_error:
+                self._failed_count += 1
+            return self._is_exceeded()
+
+    def _is_exceeded(self):
+        if self._max_failures is not None and self._failed_count >= self._max_failures:
+            return True
+        if self._max_failure_ratio is not None and self._completed_count >= self._min_results_for_ratio:
+            return float(self._failed_count) / self._completed_count > self._max_failure_ratio
+        return False
+
+    def describe(self):
+        """
+        :return: human readable failure summary for abort message
+        :rtype: str
+        """
+        with self._lock:
+            return "{} of {} completed launches failed".format(self._failed_count, self._completed_count)
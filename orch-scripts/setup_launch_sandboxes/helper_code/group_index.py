@@ -0,0 +1,83 @@
+"""
+Index of CloudShell group name to member user names.
+Built from one GetGroupsDetails listing, cached on disk between launches, so resolving the launch groups is a dict
+lookup instead of downloading and scanning every group of the server on every launch.
+A group missing from a cached listing triggers one fresh listing, so newly created groups are still found.
+"""
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.ttl_cache import TtlFileCache, get_server_cache_key
+
+GROUP_INDEX_CACHE_NAME = "group_index"
+
+
+def dedupe_user_names(user_names):
+    """
+    drop repeated names regardless of case, first spelling wins
+    :param list[str] user_names:
+    :return: in input order
+    :rtype: list[str]
+    """
+    seen_names = set()
+    unique_names = []
+    for user_name in user_names:
+        if user_name.lower() in seen_names:
+            continue
+        seen_names.add(user_name.lower())
+        unique_names.append(user_name)
+    return unique_names
+
+
+class GroupIndex(object):
+    def __init__(self, api, cache=None):
+        """
+        :param CloudShellAPISession api:
+        :param TtlFileCache cache: None to list groups on every launch
+        """
+        self._api = api
+        self._cache = cache
+        self._cache_key = get_server_cache_key(api, GROUP_INDEX_CACHE_NAME)
+        self._users_by_group = None
+        self._is_from_cache = False
+
+    def _load_users_by_group(self, is_refresh=False):
+        """
+        :param bool is_refresh: skip cache and list groups again
+        :return:
+        :rtype: dict[str, list[str]]
+        """
+        if self._cache and not is_refresh:
+            cached_users_by_group = self._cache.get(self._cache_key)
+            if cached_users_by_group is not None:
+                self._is_from_cache = True
+                return cached_users_by_group
+        users_by_group = {group.Name: [user.Name for user in group.Users] for group in self._api.GetGroupsDetails().Groups}
+        self._is_from_cache = False
+        if self._cache:
+            self._cache.set(self._cache_key, users_by_group)
+        return users_by_group
+
+    def get_missing_groups(self, group_names):
+        """
+        :param list[str] group_names:
+        :return: names of groups that do not exist, in input order
+        :rtype: list[str]
+        """
+        if self._users_by_group is None:
+            self._users_by_group = self._load_users_by_group()
+        missing_groups = [group_name for group_name in group_names if group_name not in self._users_by_group]
+        if missing_groups and self._is_from_cache:
+            self._users_by_group = self._load_users_by_group(is_refresh=True)
+            missing_groups = [group_name for group_name in group_names if group_name not in self._users_by_group]
+        return missing_groups
+
+    def get_users(self, group_names):
+        """
+        members of all groups, users in several groups are listed once
+        :param list[str] group_names:
+        :return:
+        :rtype: list[str]
+        """
+        missing_groups = self.get_missing_groups(group_names)
+        if missing_groups:
+            raise Exception("Group '{}' does not exist in system".format("', '".join(missing_groups)))
+        return dedupe_user_names([user_name for group_name in group_names for user_name in self._users_by_group[group_name]])
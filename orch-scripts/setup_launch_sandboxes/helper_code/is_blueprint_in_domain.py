@@ -1,16 +1,16 @@
 from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.blueprint_catalog import BlueprintCatalog
 
 
-# find resources of target model
-def is_blueprint_in_domain(api, bp_name):
+def is_blueprint_in_domain(api, bp_name, blueprint_catalog=None):
     """
     :param CloudShellAPISession api:
-    :param str bp_name:
+    :param str bp_name: blueprint name or full path
+    :param BlueprintCatalog blueprint_catalog: defaults to uncached catalog of api domain
     :return:
     """
-    domain_bps = api.GetTopologiesByCategory().Topologies
-    matching = [bp for bp in domain_bps if bp.split("/")[-1] == bp_name]
-    return True if matching else False
+    blueprint_catalog = blueprint_catalog if blueprint_catalog else BlueprintCatalog(api)
+    return blueprint_catalog.is_blueprint_in_domain(bp_name)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+"""
+Cancellation of a running setup by teardown of the same launcher sandbox.
+Teardown raises a flag in launcher sandbox data. Setup polls it through LauncherCancellationToken, stops queued
+launches and ends children created by launches that were already in flight.
+Setup also records its launch state, so teardown only waits for a setup that is actually launching.
+"""
+import threading
+from time import time
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession, SandboxDataKeyValue
+from helper_code.execute_async_helper import CancellationToken
+from helper_code.wait_until import WaitTimeoutError, wait_until
+
+CANCEL_REQUEST_KEY = "launch_cancel_request"
+LAUNCH_STATE_KEY = "launch_state"
+
+# launch states
+LAUNCHING_STATE = "launching"
+CANCELLING_STATE = "cancelling"
+STOPPED_STATE = "stopped"
+
+# child sandbox statuses that no longer need an end request
+ENDED_SANDBOX_STATUSES = ["ending", "completed"]
+
+
+def _get_sandbox_data_value(api, res_id, key):
+    for key_value in api.GetSandboxData(res_id).SandboxDataKeyValues:
+        if key_value.Key == key:
+            return key_value.Value
+    return ""
+
+
+def _set_sandbox_data_value(api, res_id, key, value):
+    api.SetSandboxData(reservationId=res_id, sandboxDataKeyValues=[SandboxDataKeyValue(key, value)])
+
+
+def request_launch_cancellation(api, res_id, reason):
+    """
+    :param CloudShellAPISession api:
+    :param str res_id: launcher sandbox id
+    :param str reason: reported by setup when it stops
+    :return:
+    """
+    _set_sandbox_data_value(api, res_id, CANCEL_REQUEST_KEY, reason)
+
+
+def clear_launch_cancellation(api, res_id):
+    """
+    drop request left by an earlier teardown, so a setup re-run is not cancelled on start
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :return:
+    """
+    _set_sandbox_data_value(api, res_id, CANCEL_REQUEST_KEY, "")
+
+
+def set_launch_state(api, res_id, state):
+    """
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param str state: LAUNCHING_STATE / CANCELLING_STATE / STOPPED_STATE
+    :return:
+    """
+    _set_sandbox_data_value(api, res_id, LAUNCH_STATE_KEY, state)
+
+
+def wait_for_launch_stop(api, res_id, timeout_seconds, polling_seconds=5):
+    """
+    block until setup acknowledged cancellation or is no longer launching
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param float timeout_seconds:
+    :param float polling_seconds:
+    :return: False if setup was still launching at timeout
+    :rtype: bool
+    """
+    try:
+        wait_until(
+            lambda: _get_sandbox_data_value(api, res_id, LAUNCH_STATE_KEY) != LAUNCHING_STATE,
+            timeout_seconds=timeout_seconds,
+            polling_seconds=polling_seconds,
+            max_polling_seconds=polling_seconds,
+            description="setup to stop launching",
+        )
+    except WaitTimeoutError:
+        return False
+    return True
+
+
+def is_launch_running(api, res_id):
+    """
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :return:
+    :rtype: bool
+    """
+    return _get_sandbox_data_value(api, res_id, LAUNCH_STATE_KEY) == LAUNCHING_STATE
+
+
+def end_child_sandbox(api, child_sandbox_id):
+    """
+    end child sandbox unless teardown already ended it
+    :param CloudShellAPISession api:
+    :param str child_sandbox_id:
+    :return: True if end was requested by this call
+    :rtype: bool
+    """
+    sandbox_status = api.GetReservationStatus(child_sandbox_id).ReservationSlimStatus.Status
+    if sandbox_status.lower() in ENDED_SANDBOX_STATUSES:
+        return False
+    api.EndReservation(reservationId=child_sandbox_id)
+    return True
+
+
+class LauncherCancellationToken(CancellationToken):
+    def __init__(self, api, res_id, polling_seconds=10, logger=None):
+        """
+        cancellation token that is also cancelled by a teardown request on the launcher sandbox
+        the request is read from sandbox data at most once per polling_seconds
+        :param CloudShellAPISession api:
+        :param str res_id: launcher sandbox id
+        :param float polling_seconds:
+        :param logging.Logger logger: failed reads are logged and treated as not cancelled
+        """
+        super(LauncherCancellationToken, self).__init__()
+        self._api = api
+        self._res_id = res_id
+        self._polling_seconds = polling_seconds
+        self._logger = logger
+        self._last_check_time = 0.0
+        self._check_lock = threading.Lock()
+        self._is_launcher_ending = False
+
+    @property
+    def is_launcher_ending(self):
+        """
+        True when cancelled by teardown rather than a local cancel
+        """
+        return self._is_launcher_ending
+
+    def is_cancelled(self):
+        if super(LauncherCancellationToken, self).is_cancelled():
+            return True
+        with self._check_lock:
+            if time() - self._last_check_time < self._polling_seconds:
+                return False
+            self._last_check_time = time()
+        try:
+            cancel_reason = _get_sandbox_data_value(self._api, self._res_id, CANCEL_REQUEST_KEY)
+        except Exception as e:
+            if self._logger:
+                self._logger.warning("Launch cancellation check failed. {}".format(str(e)))
+            return False
+        if not cancel_reason:
+            return False
+        self._is_launcher_ending = True
+        self.cancel(cancel_reason)
+        try:
+            # acknowledge, teardown stops waiting once queued launches are dropped
+            set_launch_state(self._api, self._res_id, CANCELLING_STATE)
+        except Exception as e:
+            if self._logger:
+                self._logger.warning("Launch cancellation acknowledge failed. {}".format(str(e)))
+        return True
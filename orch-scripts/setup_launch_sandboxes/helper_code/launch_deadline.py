@@ -0,0 +1,78 @@
+"""
+Deadline model for launches.
+The launcher has one global deadline. Each child may poll its setup for the budget left until the deadline,
+capped by its blueprint estimated setup duration, and children that cannot finish setup in time are not started.
+"""
+from time import time
+
+from helper_code.execute_async_helper import CommandSkippedError
+
+
+def parse_duration_minutes(duration_str):
+    """
+    blueprint estimated durations, "20" / "20.5" minutes or "HH:MM:SS" --> float minutes, None if not parseable
+    same parsing as controller driver 'poll_sandbox.py'
+    :param str duration_str:
+    :return:
+    :rtype: float
+    """
+    if not duration_str:
+        return None
+    try:
+        if ":" in duration_str:
+            parts = [float(part) for part in duration_str.split(":")]
+            while len(parts) < 3:
+                parts.insert(0, 0.0)
+            hours, minutes, seconds = parts[-3:]
+            return hours * 60 + minutes + seconds / 60.0
+        return float(duration_str)
+    except ValueError:
+        return None
+
+
+class LaunchDeadline(object):
+    def __init__(self, budget_minutes, expected_setup_minutes=None, setup_timeout_factor=2.0, default_child_minutes=45):
+        """
+        :param float budget_minutes: minutes from now until the global deadline
+        :param float expected_setup_minutes: blueprint estimated setup duration, None if unknown
+        :param float setup_timeout_factor: child polling cap as multiple of expected setup duration
+        :param int default_child_minutes: child polling cap when setup duration is unknown
+        """
+        self.deadline_time = time() + budget_minutes * 60
+        self.expected_setup_minutes = expected_setup_minutes
+        if expected_setup_minutes:
+            self._child_cap_minutes = expected_setup_minutes * setup_timeout_factor
+        else:
+            self._child_cap_minutes = default_child_minutes
+
+    def get_remaining_minutes(self):
+        return max(0.0, (self.deadline_time - time()) / 60.0)
+
+    def can_finish(self):
+        """
+        child started now is expected to finish setup before the deadline
+        :return:
+        :rtype: bool
+        """
+        remaining_minutes = self.get_remaining_minutes()
+        return remaining_minutes >= 1 and remaining_minutes >= (self.expected_setup_minutes or 0)
+
+    def get_child_budget_minutes(self):
+        """
+        max minutes a child started now may poll its setup
+        :return:
+        :rtype: int
+        """
+        return max(1, int(min(self.get_remaining_minutes(), self._child_cap_minutes)))
+
+    def check_can_start(self, target_name):
+        """
+        :param str target_name:
+        :return:
+        """
+        if not self.can_finish():
+            raise CommandSkippedError(
+                "launch deadline reached for '{}', {:.1f} minutes left, blueprint setup takes {} minutes".format(
+                    target_name, self.get_remaining_minutes(), self.expected_setup_minutes
+                )
+            )
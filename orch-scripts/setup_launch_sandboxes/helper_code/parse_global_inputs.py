@@ -0,0 +1,40 @@
+from cloudshell.api.cloudshell_api import UpdateTopologyGlobalInputsRequest
+
+
+def _get_global_input_request(key_value_input_str):
+    """
+    parse, clean, and add to request object
+    :param str key_value_input_str: expected 'input1, val1'
+    :return:
+    """
+    split = key_value_input_str.split(",")
+    cleaned = [s.strip() for s in split]
+    if len(cleaned) > 2:
+        raise Exception("Parsed Key-pair is greater than 2")
+    return UpdateTopologyGlobalInputsRequest(ParamName=cleaned[0], Value=cleaned[1])
+
+
+def get_global_input_request_from_semicolon_sep_str(input_str):
+    """
+    "input1, val1; input2, val2; input 3, val3" --> [UpdateTopologyGlobalInputsRequest(input1, val1),..]
+    :param input_str: "input1, val1; input2, val2; input 3, val3"
+    :return:
+    :rtype: list[UpdateTopologyGlobalInputsRequest]
+    """
+    if not input_str:
+        return []
+    split = input_str.split(";")
+    requests = [_get_global_input_request(s) for s in split]
+    return requests
+
+
+def get_undeclared_global_inputs(input_str, declared_input_names):
+    """
+    input names of "input1, val1; input2, val2" string that target blueprint does not declare
+    :param str input_str:
+    :param declared_input_names: blueprint global input names
+    :return: in input order
+    :rtype: list[str]
+    """
+    requests = get_global_input_request_from_semicolon_sep_str(input_str)
+    return [request.ParamName for request in requests if request.ParamName not in declared_input_names]
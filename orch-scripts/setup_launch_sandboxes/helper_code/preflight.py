@@ -0,0 +1,55 @@
+"""
+Pre-flight stage of independent launch validations.
+Checks run concurrently on the shared executor and every failed check is collected, so one report lists all
+input problems instead of the launch stopping at the first one.
+"""
+import asyncio
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.async_engine import AsyncCloudShellApi, run_async
+from helper_code.bounded_executor import BoundedExecutor
+
+
+class PreflightError(Exception):
+    def __init__(self, errors):
+        """
+        :param list[tuple[str, Exception]] errors: check name and raised exception, in check order
+        """
+        self.errors = errors
+        error_lines = ["{}: {}".format(check_name, str(error)) for check_name, error in errors]
+        super(PreflightError, self).__init__(
+            "Pre-flight validation failed, {} errors:\n{}".format(len(errors), "\n".join(error_lines))
+        )
+
+
+async def _run_check_async(async_api, check_func):
+    try:
+        return await async_api.run(check_func), None
+    except Exception as e:
+        return None, e
+
+
+async def _run_checks_async(async_api, checks):
+    return await asyncio.gather(*[_run_check_async(async_api, check_func) for _, check_func in checks])
+
+
+def run_preflight_checks(api, checks, executor=None):
+    """
+    :param CloudShellAPISession api:
+    :param list[tuple[str, callable]] checks: check name and no argument function, raising fails the check
+    :param BoundedExecutor executor: defaults to executor shared across the script run
+    :return: check name to function return value
+    :rtype: dict
+    :raises PreflightError: with every failed check
+    """
+    outcomes = run_async(_run_checks_async(AsyncCloudShellApi(api, executor), checks))
+    results = {}
+    errors = []
+    for (check_name, _), (result, error) in zip(checks, outcomes):
+        if error is not None:
+            errors.append((check_name, error))
+        else:
+            results[check_name] = result
+    if errors:
+        raise PreflightError(errors)
+    return results
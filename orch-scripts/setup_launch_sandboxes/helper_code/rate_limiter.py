@@ -0,0 +1,57 @@
+"""
+Token bucket limiting how fast child sandbox launches are started, independent of how many run at once.
+Random jitter after each grant keeps starts from landing on exact interval boundaries.
+"""
+import random
+import threading
+from time import sleep, time
+
+
+class TokenBucketRateLimiter(object):
+    def __init__(self, rate_per_minute, burst=1, max_jitter_seconds=0.0):
+        """
+        :param float rate_per_minute: sustained starts per minute
+        :param int burst: starts that may be granted back to back when bucket is full
+        :param float max_jitter_seconds: upper bound of random delay added after each grant
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive. Received: {}".format(rate_per_minute))
+        self._seconds_per_token = 60.0 / rate_per_minute
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._max_jitter_seconds = max(0.0, max_jitter_seconds)
+        self._last_refill_time = time()
+        self._not_before_time = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill_time
+        self._tokens = min(self._capacity, self._tokens + elapsed / self._seconds_per_token)
+        self._last_refill_time = now
+
+    def try_acquire(self):
+        """
+        take a token if one is available
+        :return: 0 when granted, otherwise seconds to wait before trying again
+        :rtype: float
+        """
+        with self._lock:
+            now = time()
+            self._refill(now)
+            if now < self._not_before_time:
+                return self._not_before_time - now
+            if self._tokens < 1:
+                return (1 - self._tokens) * self._seconds_per_token
+            self._tokens -= 1
+            self._not_before_time = now + random.uniform(0, self._max_jitter_seconds)
+            return 0
+
+    def acquire(self):
+        """
+        block until a token is granted
+        :return:
+        """
+        wait_seconds = self.try_acquire()
+        while wait_seconds:
+            sleep(wait_seconds)
+            wait_seconds = self.try_acquire()
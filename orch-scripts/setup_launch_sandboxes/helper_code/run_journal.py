@@ -0,0 +1,112 @@
+"""
+Launch run journal persisted in parent sandbox data.
+One key per controller service holds the outcome of its last launch, so setup re-runs and the
+'retry_failed_sandboxes' command can launch only the delta (not started, failed, timed out).
+"""
+import json
+import threading
+from time import time
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession, SandboxDataKeyValue
+
+JOURNAL_KEY_PREFIX = "launch_journal:"
+
+# journal statuses
+DEPLOYED_STATUS = "deployed"
+FAILED_STATUS = "failed"
+TIMED_OUT_STATUS = "timed_out"
+SKIPPED_STATUS = "skipped"
+
+# error message patterns that mark a launch as timed out rather than failed
+TIMED_OUT_ERROR_PATTERNS = ["timed out", "timeout"]
+
+
+def get_launch_status(error):
+    """
+    :param Exception error: None for successful launch
+    :return:
+    :rtype: str
+    """
+    if error is None:
+        return DEPLOYED_STATUS
+    message = str(error).lower()
+    if any(pattern in message for pattern in TIMED_OUT_ERROR_PATTERNS):
+        return TIMED_OUT_STATUS
+    return FAILED_STATUS
+
+
+class RunJournal(object):
+    def __init__(self, api, res_id, logger=None):
+        """
+        :param CloudShellAPISession api:
+        :param str res_id: parent sandbox id, journal is stored in its sandbox data
+        :param logging.Logger logger: journal write failures are logged and never fail the launch
+        """
+        self._api = api
+        self._res_id = res_id
+        self._logger = logger
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        :return: map of service alias to last recorded entry
+        :rtype: dict[str, dict]
+        """
+        entries = {}
+        for key_value in self._api.GetSandboxData(self._res_id).SandboxDataKeyValues:
+            if not key_value.Key.startswith(JOURNAL_KEY_PREFIX):
+                continue
+            try:
+                entries[key_value.Key[len(JOURNAL_KEY_PREFIX) :]] = json.loads(key_value.Value)
+            except ValueError:
+                continue
+        return entries
+
+    def record(self, service_name, status, attempt_count=1, error=None):
+        """
+        upsert single service entry, safe to call from result callbacks of concurrent launches
+        :param str service_name:
+        :param str status:
+        :param int attempt_count:
+        :param Exception error:
+        :return:
+        """
+        entry = {"status": status, "attempts": attempt_count, "updated": int(time())}
+        if error is not None:
+            entry["error"] = str(error)[:200]
+        key_value = SandboxDataKeyValue(JOURNAL_KEY_PREFIX + service_name, json.dumps(entry, separators=(",", ":")))
+        try:
+            with self._lock:
+                self._api.SetSandboxData(reservationId=self._res_id, sandboxDataKeyValues=[key_value])
+        except Exception as e:
+            if self._logger:
+                self._logger.warning("Failed to record launch journal entry for '{}'. {}".format(service_name, str(e)))
+
+    def record_result(self, result):
+        """
+        :param CommandResult result:
+        :return:
+        """
+        self.record(result.component_name, get_launch_status(result.error), result.attempt_count, result.error)
+
+    @staticmethod
+    def get_relaunch_delta(service_names, entries):
+        """
+        services never launched, or whose last launch did not deploy
+        :param list[str] service_names:
+        :param dict[str, dict] entries:
+        :return:
+        :rtype: list[str]
+        """
+        return [name for name in service_names if entries.get(name, {}).get("status") != DEPLOYED_STATUS]
+
+    @staticmethod
+    def get_services_with_status(service_names, entries, statuses):
+        """
+        :param list[str] service_names:
+        :param dict[str, dict] entries:
+        :param list[str] statuses:
+        :return:
+        :rtype: list[str]
+        """
+        return [name for name in service_names if entries.get(name, {}).get("status") in statuses]
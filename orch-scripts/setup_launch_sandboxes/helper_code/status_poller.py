@@ -0,0 +1,194 @@
+"""
+Single background poller watching status of all child sandboxes.
+Launch threads register a child sandbox id and block on an event instead of polling it themselves.
+Polls use the slim 'GetReservationStatus' call and are capped by a global request rate.
+"""
+import threading
+from time import time
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.error_classification import POLLING_BUDGET_EXHAUSTED_MESSAGE, PermanentError
+from helper_code.rate_limiter import TokenBucketRateLimiter
+
+
+class PollSandboxTimeoutError(PermanentError):
+    pass
+
+
+class PollerStoppedError(PermanentError):
+    pass
+
+
+def is_setup_done(sandbox_status, provisioning_status):
+    return provisioning_status.lower() in ["ready", "error"]
+
+
+def is_teardown_done(sandbox_status, provisioning_status):
+    return sandbox_status.lower() == "completed"
+
+
+class StatusWatch(object):
+    def __init__(self, sandbox_id, is_done_func):
+        """
+        :param str sandbox_id:
+        :param is_done_func: takes (sandbox_status, provisioning_status), returns True when watch is complete
+        """
+        self.sandbox_id = sandbox_id
+        self.is_done_func = is_done_func
+        self.sandbox_status = None
+        self.provisioning_status = None
+        self.error = None
+        self.start_time = time()
+        self.next_poll_time = 0.0
+        self.consecutive_errors = 0
+        self.done_event = threading.Event()
+
+    @property
+    def elapsed_minutes(self):
+        return round((time() - self.start_time) / 60.0, 2)
+
+
+class SandboxStatusPoller(object):
+    def __init__(self, api, polling_seconds=10, max_requests_per_second=5.0, max_consecutive_errors=5, logger=None):
+        """
+        :param CloudShellAPISession api:
+        :param float polling_seconds: interval between polls of the same sandbox
+        :param float max_requests_per_second: cap across all watched sandboxes
+        :param int max_consecutive_errors: api errors in a row before a watch fails
+        :param logging.Logger logger:
+        """
+        self._api = api
+        self._polling_seconds = polling_seconds
+        self._rate_limiter = TokenBucketRateLimiter(
+            rate_per_minute=max_requests_per_second * 60, burst=max(1, int(max_requests_per_second))
+        )
+        self._max_consecutive_errors = max_consecutive_errors
+        self._logger = logger
+        self._watches = []
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="sandbox-status-poller")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def watch(self, sandbox_id, is_done_func):
+        """
+        :param str sandbox_id:
+        :param is_done_func: takes (sandbox_status, provisioning_status), returns True when watch is complete
+        :return:
+        :rtype: StatusWatch
+        """
+        status_watch = StatusWatch(sandbox_id, is_done_func)
+        with self._lock:
+            self._watches.append(status_watch)
+        self._ensure_started()
+        self._wake_event.set()
+        return status_watch
+
+    def _wait(self, sandbox_id, is_done_func, max_polling_minutes):
+        status_watch = self.watch(sandbox_id, is_done_func)
+        if not status_watch.done_event.wait(max_polling_minutes * 60):
+            self._remove(status_watch)
+            raise PollSandboxTimeoutError(
+                "Polling '{}' timed out after {} minutes, {}".format(
+                    sandbox_id, str(max_polling_minutes), POLLING_BUDGET_EXHAUSTED_MESSAGE
+                )
+            )
+        if status_watch.error is not None:
+            raise status_watch.error
+        return status_watch
+
+    def wait_for_setup(self, sandbox_id, max_polling_minutes=45):
+        """
+        block until setup of child sandbox is Ready or Error
+        :param str sandbox_id:
+        :param int max_polling_minutes:
+        :return: tuple of (provisioning status, elapsed minutes)
+        :rtype: tuple[str, float]
+        """
+        status_watch = self._wait(sandbox_id, is_setup_done, max_polling_minutes)
+        return status_watch.provisioning_status, status_watch.elapsed_minutes
+
+    def wait_for_teardown(self, sandbox_id, max_polling_minutes=45):
+        """
+        block until child sandbox is Completed
+        :param str sandbox_id:
+        :param int max_polling_minutes:
+        :return: tuple of (sandbox status, elapsed minutes)
+        :rtype: tuple[str, float]
+        """
+        status_watch = self._wait(sandbox_id, is_teardown_done, max_polling_minutes)
+        return status_watch.sandbox_status, status_watch.elapsed_minutes
+
+    def stop(self, timeout_seconds=5):
+        """
+        stop poll thread. watches still registered fail right away instead of blocking until their timeout
+        :param float timeout_seconds: max wait for poll thread to exit
+        :return:
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+        with self._lock:
+            remaining_watches = self._watches
+            self._watches = []
+            poll_thread = self._thread
+        for status_watch in remaining_watches:
+            status_watch.error = PollerStoppedError(
+                "Status poller stopped before '{}' was done".format(status_watch.sandbox_id)
+            )
+            status_watch.done_event.set()
+        if poll_thread and poll_thread is not threading.current_thread():
+            poll_thread.join(timeout_seconds)
+
+    def _remove(self, status_watch):
+        with self._lock:
+            if status_watch in self._watches:
+                self._watches.remove(status_watch)
+
+    def _poll_once(self, status_watch):
+        try:
+            slim_status = self._api.GetReservationStatus(status_watch.sandbox_id).ReservationSlimStatus
+        except Exception as e:
+            status_watch.consecutive_errors += 1
+            if self._logger:
+                self._logger.warning("Status poll of '{}' failed. {}".format(status_watch.sandbox_id, str(e)))
+            if status_watch.consecutive_errors >= self._max_consecutive_errors:
+                status_watch.error = e
+                return True
+            return False
+        status_watch.consecutive_errors = 0
+        status_watch.sandbox_status = slim_status.Status
+        status_watch.provisioning_status = slim_status.ProvisioningStatus
+        return status_watch.is_done_func(slim_status.Status, slim_status.ProvisioningStatus)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                due_watches = [w for w in self._watches if w.next_poll_time <= time()]
+            for status_watch in due_watches:
+                if self._stop_event.is_set():
+                    return
+                wait_seconds = self._rate_limiter.try_acquire()
+                if wait_seconds:
+                    self._stop_event.wait(wait_seconds)
+                    break
+                if self._poll_once(status_watch):
+                    self._remove(status_watch)
+                    status_watch.done_event.set()
+                else:
+                    status_watch.next_poll_time = time() + self._polling_seconds
+            with self._lock:
+                next_poll_times = [w.next_poll_time for w in self._watches]
+            if not next_poll_times:
+                self._wake_event.wait()
+            else:
+                self._wake_event.wait(max(0.0, min(next_poll_times) - time()))
+            self._wake_event.clear()
@@ -0,0 +1,79 @@
+"""
+JSON file cache with a time to live, for server listings that would otherwise be downloaded on every launch.
+One file per key in the cache directory. Missing, unreadable or expired entries are cache misses and write failures
+are ignored, so a broken cache only costs the listing call it was meant to save.
+"""
+import json
+import os
+import re
+import tempfile
+from time import time
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "course_launcher_cache")
+DEFAULT_TTL_SECONDS = 600
+
+
+class TtlFileCache(object):
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS):
+        """
+        :param str cache_dir: created on first write
+        :param float ttl_seconds: entries older than this are misses
+        """
+        self._cache_dir = cache_dir
+        self._ttl_seconds = ttl_seconds
+
+    def _get_path(self, key):
+        return os.path.join(self._cache_dir, re.sub(r"[^0-9a-zA-Z\-_.]", "_", key) + ".json")
+
+    def get(self, key):
+        """
+        :param str key:
+        :return: cached value, None on miss
+        """
+        try:
+            with open(self._get_path(key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time() - entry.get("saved_time", 0) > self._ttl_seconds:
+            return None
+        return entry.get("value")
+
+    def set(self, key, value):
+        """
+        :param str key:
+        :param value: json serializable
+        :return:
+        """
+        path = self._get_path(key)
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            if not os.path.isdir(self._cache_dir):
+                os.makedirs(self._cache_dir)
+            with open(temp_path, "w") as cache_file:
+                json.dump({"saved_time": time(), "value": value}, cache_file)
+            # concurrent launches never read a partially written file
+            os.replace(temp_path, path)
+        except (IOError, OSError):
+            pass
+
+    def invalidate(self, key):
+        """
+        :param str key:
+        :return:
+        """
+        try:
+            os.remove(self._get_path(key))
+        except (IOError, OSError):
+            pass
+
+
+def get_server_cache_key(api, name):
+    """
+    cache key scoped to server and domain of the api session, listings differ per domain
+    :param api: CloudShellAPISession
+    :param str name:
+    :return:
+    :rtype: str
+    """
+    return "{}_{}_{}".format(name, getattr(api, "host", ""), getattr(api, "domain", ""))
@@ -0,0 +1,107 @@
+"""
+Index of CloudShell user names for participant validation.
+Built from one bulk user listing, cached on disk between launches, so validating a list is set membership instead of
+a GetUserDetails round trip per participant. Names missing from the index are confirmed with concurrent
+GetUserDetails calls, which also covers users created after the cache was written and sessions not allowed to list
+all users. Near-miss suggestions are offered for names that do not exist.
+"""
+import asyncio
+import difflib
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.async_engine import AsyncCloudShellApi, run_async
+from helper_code.ttl_cache import TtlFileCache, get_server_cache_key
+
+USER_DIRECTORY_CACHE_NAME = "user_directory"
+
+
+async def _get_existing_users_async(async_api, user_names):
+    """
+    :param AsyncCloudShellApi async_api:
+    :param list[str] user_names:
+    :return:
+    :rtype: set[str]
+    """
+
+    async def _get_if_exists(user_name):
+        try:
+            await async_api.call("GetUserDetails", username=user_name)
+        except Exception:
+            return None
+        return user_name
+
+    results = await asyncio.gather(*[_get_if_exists(user_name) for user_name in user_names])
+    return {user_name for user_name in results if user_name}
+
+
+class UserDirectory(object):
+    def __init__(self, api, cache=None):
+        """
+        :param CloudShellAPISession api:
+        :param TtlFileCache cache: None to list users on every launch
+        """
+        self._api = api
+        self._cache = cache
+        self._cache_key = get_server_cache_key(api, USER_DIRECTORY_CACHE_NAME)
+        self._user_names_index = None
+        self._is_from_cache = False
+
+    def _load_user_names(self):
+        """
+        :return: None if session may not list all users
+        :rtype: list[str]
+        """
+        if self._cache:
+            cached_user_names = self._cache.get(self._cache_key)
+            if cached_user_names is not None:
+                self._is_from_cache = True
+                return cached_user_names
+        try:
+            user_names = [user.Name for user in self._api.GetAllUsersDetails().Users]
+        except Exception:
+            return None
+        if self._cache:
+            self._cache.set(self._cache_key, user_names)
+        return user_names
+
+    def _get_index(self):
+        """
+        lower cased name to name, user names are not case sensitive
+        :return:
+        :rtype: dict[str, str]
+        """
+        if self._user_names_index is None:
+            user_names = self._load_user_names() or []
+            self._user_names_index = {user_name.lower(): user_name for user_name in user_names}
+        return self._user_names_index
+
+    def get_invalid_users(self, user_names):
+        """
+        :param list[str] user_names:
+        :return: names that do not exist, in input order
+        :rtype: list[str]
+        """
+        user_names_index = self._get_index()
+        not_indexed = [user_name for user_name in user_names if user_name.lower() not in user_names_index]
+        if not not_indexed:
+            return []
+        existing_users = run_async(_get_existing_users_async(AsyncCloudShellApi(self._api), not_indexed))
+        if existing_users:
+            for user_name in existing_users:
+                user_names_index[user_name.lower()] = user_name
+            if self._cache and self._is_from_cache:
+                # cached listing is missing new users, next launch lists again
+                self._cache.invalidate(self._cache_key)
+        return [user_name for user_name in not_indexed if user_name not in existing_users]
+
+    def get_suggestions(self, user_name, max_count=3):
+        """
+        existing user names closest to a name that does not exist
+        :param str user_name:
+        :param int max_count:
+        :return:
+        :rtype: list[str]
+        """
+        user_names_index = self._get_index()
+        close_matches = difflib.get_close_matches(user_name.lower(), list(user_names_index), n=max_count)
+        return [user_names_index[match] for match in close_matches]
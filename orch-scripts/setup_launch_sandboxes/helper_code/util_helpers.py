@@ -1,4 +1,6 @@
 import re
+from math import ceil
+from time import time
 
 
 def sandbox_name_truncater(input_str):
@@ -21,3 +23,13 @@ def replace_illegal_sandbox_name_chars(student_user_name):
     :return:
     """
     return re.sub(r"[^\s0-9a-zA-Z\|\.\[\]-_]", "-", student_user_name)
+
+
+def get_minutes_until(end_time):
+    """
+    whole minutes from now until end time, rounded up so sandbox ends no earlier than end time
+    :param str end_time: epoch seconds
+    :return:
+    :rtype: int
+    """
+    return max(1, int(ceil((float(end_time) - time()) / 60.0)))
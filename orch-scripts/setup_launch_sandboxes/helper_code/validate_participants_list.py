@@ -1,21 +1,22 @@
 from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.user_directory import UserDirectory
 
 
-def validate_user_list(api, user_list):
+def validate_user_list(api, user_list, user_directory=None):
     """
     :param CloudShellAPISession api:
     :param list[str] user_list:
+    :param UserDirectory user_directory: defaults to uncached directory of api server
     :return:
     """
-    invalid_users = []
-    for user in user_list:
-        try:
-            api.GetUserDetails(user)
-        except Exception as e:
-            invalid_users.append(user)
+    user_directory = user_directory if user_directory else UserDirectory(api)
+    invalid_users = user_directory.get_invalid_users(user_list)
 
     if invalid_users:
-        raise Exception("The following users are invalid - '{}'".format(invalid_users))
+        suggestions = ["'{}' -> {}".format(user, user_directory.get_suggestions(user)) for user in invalid_users]
+        raise Exception(
+            "The following users are invalid - '{}'. Closest existing users: {}".format(invalid_users, ", ".join(suggestions))
+        )
 
 
 if __name__ == "__main__":
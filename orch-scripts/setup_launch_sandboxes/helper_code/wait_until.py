@@ -0,0 +1,37 @@
+"""
+Readiness wait replacing fixed sleeps.
+Polls a condition quickly at first, backing off towards a cap, and returns as soon as it holds.
+"""
+from time import sleep, time
+
+
+class WaitTimeoutError(Exception):
+    pass
+
+
+def wait_until(
+    condition_func, timeout_seconds, polling_seconds=0.5, max_polling_seconds=5.0, backoff_factor=1.5, description=""
+):
+    """
+    block until condition_func returns a truthy value, exceptions raised by condition_func are not caught
+    :param condition_func: no argument callable
+    :param float timeout_seconds:
+    :param float polling_seconds: first interval between checks
+    :param float max_polling_seconds: interval cap as it grows by backoff_factor
+    :param float backoff_factor:
+    :param str description: what is awaited, used in timeout message
+    :return: truthy value returned by condition_func
+    """
+    end_time = time() + timeout_seconds
+    wait_seconds = polling_seconds
+    while True:
+        result = condition_func()
+        if result:
+            return result
+        remaining_seconds = end_time - time()
+        if remaining_seconds <= 0:
+            raise WaitTimeoutError(
+                "Timed out after {} seconds waiting for {}".format(timeout_seconds, description or "condition")
+            )
+        sleep(min(wait_seconds, remaining_seconds))
+        wait_seconds = min(wait_seconds * backoff_factor, max_polling_seconds)
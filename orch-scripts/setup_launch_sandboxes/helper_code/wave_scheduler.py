@@ -0,0 +1,55 @@
+"""
+Canary / wave rollout helpers.
+A small canary wave is launched first, following waves grow geometrically,
+and the rollout only continues while the previous wave's failure ratio stays under threshold.
+"""
+import math
+
+
+def get_wave_sizes(total_count, canary_size=1, growth_factor=2.0):
+    """
+    10 items, canary 1, growth 2 --> [1, 2, 4, 3]
+    :param int total_count:
+    :param int canary_size:
+    :param float growth_factor:
+    :return:
+    :rtype: list[int]
+    """
+    wave_sizes = []
+    wave_size = max(1, canary_size)
+    remaining = total_count
+    while remaining > 0:
+        current_size = min(wave_size, remaining)
+        wave_sizes.append(current_size)
+        remaining -= current_size
+        wave_size = max(wave_size + 1, int(math.ceil(wave_size * growth_factor)))
+    return wave_sizes
+
+
+def split_into_waves(items, canary_size=1, growth_factor=2.0):
+    """
+    :param list items:
+    :param int canary_size:
+    :param float growth_factor:
+    :return:
+    :rtype: list[list]
+    """
+    waves = []
+    start_index = 0
+    for wave_size in get_wave_sizes(len(items), canary_size, growth_factor):
+        waves.append(items[start_index : start_index + wave_size])
+        start_index += wave_size
+    return waves
+
+
+def is_wave_healthy(failed_count, launched_count, max_failure_ratio):
+    """
+    :param int failed_count:
+    :param int launched_count:
+    :param float max_failure_ratio: 0 means any failure stops the rollout
+    :return:
+    :rtype: bool
+    """
+    if not launched_count:
+        return True
+    return float(failed_count) / launched_count <= max_failure_ratio
@@ -0,0 +1,175 @@
+"""
+Launch behaviour inputs of the setup script, parsed once into LaunchOptions.
+Optional inputs share one spelling of 'off' and of 'true', invalid values raise ValueError with the input name.
+"""
+import math
+
+import SB_GLOBALS as sb_globals
+from helper_code.adaptive_concurrency import AimdConcurrencyController
+from helper_code.fail_fast import FailFastPolicy
+from helper_code.rate_limiter import TokenBucketRateLimiter
+from helper_code.retry_policy import RetryPolicy
+
+# matched against lower cased input value
+OFF_INPUT_VALUES = ["", "false", "f", "off", "no", "n", "none", "[any]", "any"]
+TRUE_INPUT_VALUES = ["true", "t", "yes", "y"]
+
+
+def _is_off_input(input_val):
+    return input_val.strip().lower() in OFF_INPUT_VALUES
+
+
+def _is_true_input(input_val):
+    return input_val.strip().lower() in TRUE_INPUT_VALUES
+
+
+def _parse_async_deploy(input_val):
+    if isinstance(input_val, str):
+        return input_val.lower() in TRUE_INPUT_VALUES + ["[any]", "any"]
+    return bool(input_val)
+
+
+def _parse_concurrent_deploy_limit(input_val):
+    """
+    :param input_val: 'off', 'adaptive', or an integer
+    :return: tuple of (fixed limit, 0 if off or adaptive, AIMD controller if adaptive)
+    :rtype: tuple[int, AimdConcurrencyController]
+    """
+    if not isinstance(input_val, str):
+        return int(input_val), None
+    if input_val.lower() == sb_globals.ADAPTIVE_DEPLOY_LIMIT_VALUE:
+        concurrency_controller = AimdConcurrencyController(
+            initial_limit=sb_globals.ADAPTIVE_DEPLOY_INITIAL_LIMIT,
+            max_limit=sb_globals.ADAPTIVE_DEPLOY_MAX_LIMIT,
+        )
+        return 0, concurrency_controller
+    if _is_off_input(input_val):
+        return 0, None
+    if input_val.isdigit():
+        return int(input_val), None
+    raise ValueError(
+        "Concurrent Deploy Limit should be set to 'off', 'adaptive', or set to an integer. Received: {}".format(input_val)
+    )
+
+
+def _parse_launch_rate(input_val):
+    """
+    :param str input_val: 'off' or launches per minute
+    :return: 0.0 if off
+    :rtype: float
+    """
+    try:
+        launch_rate_per_minute = 0.0 if _is_off_input(input_val) else float(input_val)
+        if launch_rate_per_minute < 0 or not math.isfinite(launch_rate_per_minute):
+            raise ValueError(input_val)
+    except ValueError:
+        raise ValueError(
+            "Launch Rate Per Minute should be set to 'off', or set to a positive number. Received: {}".format(input_val)
+        )
+    return launch_rate_per_minute
+
+
+def _parse_off_or_int(input_name, input_val):
+    """
+    :param str input_name:
+    :param str input_val:
+    :return: None if off
+    :rtype: int
+    """
+    if _is_off_input(input_val):
+        return None
+    if not input_val.isdigit():
+        raise ValueError("{} should be set to 'off', or set to an integer. Received: {}".format(input_name, input_val))
+    return int(input_val)
+
+
+class LaunchOptions(object):
+    def __init__(self):
+        """
+        defaults launch concurrently up to executor ceiling, without health check, retries, or limits
+        policy attributes are None when their input is off
+        """
+        self.is_async_deploy = True
+        self.is_health_check = False
+        self.is_wave_rollout = False
+        self.is_speculative_launch = False
+        self.concurrent_deploy_limit = 0
+        self.concurrency_controller = None
+        self.launch_rate_per_minute = 0.0
+        self.rate_limiter = None
+        self.fail_fast_policy = None
+        self.is_end_on_abort = False
+        self.retry_policy = None
+        self.is_direct_launch = False
+        self.is_central_polling = False
+        self.launch_deadline_minutes = None
+
+    @classmethod
+    def from_global_inputs(cls, global_inputs_dict):
+        """
+        :param dict[str, str] global_inputs_dict: launcher sandbox global inputs
+        :return:
+        :rtype: LaunchOptions
+        """
+        launch_options = cls()
+        launch_options.is_async_deploy = _parse_async_deploy(
+            global_inputs_dict.get(sb_globals.DEPLOY_CONCURRENTLY_BOOL_INPUT, True)
+        )
+
+        health_check_input_val = global_inputs_dict.get(sb_globals.HEALTH_CHECK_SANDBOX_INPUT, "False").lower()
+        launch_options.is_speculative_launch = health_check_input_val == sb_globals.SPECULATIVE_LAUNCH_VALUE
+        launch_options.is_health_check = _is_true_input(health_check_input_val) or launch_options.is_speculative_launch
+        launch_options.is_wave_rollout = health_check_input_val == sb_globals.WAVE_ROLLOUT_VALUE
+
+        launch_options.concurrent_deploy_limit, launch_options.concurrency_controller = _parse_concurrent_deploy_limit(
+            global_inputs_dict.get(sb_globals.CONCURRENT_DEPLOY_LIMIT_INPUT, 0)
+        )
+
+        # launches per minute, applied on top of concurrent deploy limit
+        launch_options.launch_rate_per_minute = _parse_launch_rate(
+            global_inputs_dict.get(sb_globals.LAUNCH_RATE_PER_MINUTE_INPUT, "")
+        )
+        # zero in any spelling, e.g. '0.0', also turns rate limit off
+        if launch_options.launch_rate_per_minute:
+            launch_options.rate_limiter = TokenBucketRateLimiter(
+                rate_per_minute=launch_options.launch_rate_per_minute,
+                max_jitter_seconds=60.0 / launch_options.launch_rate_per_minute * sb_globals.LAUNCH_RATE_JITTER_RATIO,
+            )
+
+        # abort remaining launches after too many failures
+        try:
+            launch_options.fail_fast_policy = FailFastPolicy.from_input_str(
+                global_inputs_dict.get(sb_globals.ABORT_AFTER_FAILURES_INPUT, ""),
+                min_results_for_ratio=sb_globals.ABORT_MIN_RESULTS_FOR_RATIO,
+            )
+        except ValueError as e:
+            raise ValueError("Invalid '{}' input. {}".format(sb_globals.ABORT_AFTER_FAILURES_INPUT, str(e)))
+        launch_options.is_end_on_abort = _is_true_input(
+            global_inputs_dict.get(sb_globals.END_SANDBOXES_ON_ABORT_INPUT, "False")
+        )
+
+        # relaunch services that fail with transient errors
+        launch_retry_count = _parse_off_or_int(
+            "Launch Retry Count",
+            global_inputs_dict.get(sb_globals.LAUNCH_RETRY_COUNT_INPUT, sb_globals.LAUNCH_RETRY_DEFAULT_COUNT),
+        )
+        if launch_retry_count:
+            launch_options.retry_policy = RetryPolicy(
+                max_retries=launch_retry_count,
+                base_delay_seconds=sb_globals.LAUNCH_RETRY_BASE_DELAY_SECONDS,
+                max_delay_seconds=sb_globals.LAUNCH_RETRY_MAX_DELAY_SECONDS,
+            )
+
+        # create child reservations from this script instead of through controller driver
+        launch_mode_input_val = global_inputs_dict.get(sb_globals.LAUNCH_MODE_INPUT, "Driver")
+        launch_options.is_direct_launch = launch_mode_input_val.lower() == sb_globals.DIRECT_LAUNCH_MODE_VALUE
+        launch_options.is_central_polling = _is_true_input(
+            global_inputs_dict.get(sb_globals.CENTRAL_STATUS_POLLING_INPUT, "False")
+        )
+
+        # no sandbox is started after the deadline, default deadline is end of launcher sandbox
+        launch_deadline_input_val = global_inputs_dict.get(sb_globals.LAUNCH_DEADLINE_MINUTES_INPUT, "")
+        launch_options.launch_deadline_minutes = (
+            _parse_off_or_int("Launch Deadline Minutes", launch_deadline_input_val) or None
+        )
+        return launch_options
@@ -1,14 +1,66 @@
-import time
+import threading
+from collections import namedtuple
+from time import time
 
 import SB_GLOBALS as sb_globals
 from cloudshell.api.cloudshell_api import AttributeNameValue, CloudShellAPISession, InputNameValue
 from cloudshell.workflow.orchestration.sandbox import Sandbox
-from helper_code.execute_async_helper import execute_commands_async
+from direct_launch import CentrallyPolledLauncher, DirectLauncher
+from helper_code.api_session_pool import ApiSessionPool, PooledApi, get_sandbox_session_factory
+from helper_code.blueprint_catalog import BlueprintCatalog
+from helper_code.bounded_executor import get_shared_executor, size_shared_executor
+from helper_code.execute_async_helper import (
+    CancellationToken,
+    CommandSkippedError,
+    execute_command_with_retries,
+    execute_commands_as_completed,
+    submit_command,
+)
+from helper_code.fail_fast import FailFastPolicy  # noqa: F401
+from helper_code.group_index import GroupIndex, dedupe_user_names
 from helper_code.is_blueprint_in_domain import is_blueprint_in_domain
+from helper_code.launch_cancellation import (
+    LAUNCHING_STATE,
+    STOPPED_STATE,
+    LauncherCancellationToken,
+    clear_launch_cancellation,
+    end_child_sandbox,
+    set_launch_state,
+)
+from helper_code.launch_deadline import LaunchDeadline, parse_duration_minutes
+from helper_code.parse_global_inputs import get_undeclared_global_inputs
+from helper_code.preflight import PreflightError, run_preflight_checks
+from helper_code.run_journal import FAILED_STATUS, SKIPPED_STATUS, TIMED_OUT_STATUS, RunJournal
+from helper_code.sandbox_reset import reset_failed_sandboxes
 from helper_code.SandboxReporter import SandboxReporter
-from helper_code.util_helpers import sandbox_name_truncater
+from helper_code.service_registry import ServiceRegistry
+from helper_code.status_poller import SandboxStatusPoller
+from helper_code.time_sync import sync_sandboxes_remaining_time
+from helper_code.ttl_cache import TtlFileCache
+from helper_code.user_directory import UserDirectory
+from helper_code.util_helpers import get_minutes_until, sandbox_name_truncater
 from helper_code.validate_participants_list import validate_user_list
+from helper_code.wait_until import WaitTimeoutError, wait_until
+from helper_code.wave_scheduler import is_wave_healthy, split_into_waves
+from launch_options import LaunchOptions
 from set_services_on_canvas import set_services
+from speculative_launch import wait_for_health_check_milestones
+
+# collaborators of one launch run shared by deploy helpers
+# control_api serves calls made from the flow thread, start_sandbox_func is None to run 'start_sandbox' on the driver
+LaunchRun = namedtuple(
+    "LaunchRun",
+    [
+        "control_api",
+        "res_id",
+        "reporter",
+        "service_registry",
+        "run_journal",
+        "cancellation_token",
+        "start_sandbox_inputs",
+        "start_sandbox_func",
+    ],
+)
 
 
 def _validate_required_global_input(input_key, input_val):
@@ -16,29 +68,322 @@ def _validate_required_global_input(input_key, input_val):
         raise Exception("'{}' input is required by setup script automation".format(input_key))
 
 
-def _sync_sandboxes_wrapper(api, res_id, reporter, targeted_components_list):
+def _log_session_pool_metrics(reporter, pool_name, session_pool):
+    """
+    :param SandboxReporter reporter:
+    :param str pool_name:
+    :param ApiSessionPool session_pool:
+    :return:
+    """
+    pool_metrics = session_pool.get_metrics()
+    reporter.info_out(
+        "{} API session pool: {} sessions for {} calls, {} discarded, checkout wait avg {:.1f} ms, max {:.1f} ms".format(
+            pool_name,
+            pool_metrics["created"],
+            pool_metrics["checkouts"],
+            pool_metrics["discarded"],
+            pool_metrics["avg_wait_ms"],
+            pool_metrics["max_wait_ms"],
+        ),
+        log_only=True,
+    )
+
+
+def _get_time_sync_fallback_targets(api, res_id, launcher_end_time, service_names, aligned_service_names):
+    """
+    children created in this run were given launcher end time, only the rest need a time sync
+    all children need it if launcher sandbox was extended while launching
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param float launcher_end_time: epoch seconds passed to launches
+    :param list[str] service_names:
+    :param set[str] aligned_service_names: services whose child was created with launcher end time
+    :return:
+    :rtype: list[str]
+    """
+    current_end_time = time() + api.GetReservationRemainingTime(res_id).RemainingTimeInMinutes * 60
+    if current_end_time - launcher_end_time > sb_globals.TIME_SYNC_TOLERANCE_MINUTES * 60:
+        return service_names
+    return [name for name in service_names if name not in aligned_service_names]
+
+
+def _end_cancelled_launches(api, res_id, reporter, service_registry, service_names):
+    """
+    end child sandboxes created by launches that returned after launcher teardown started
+    children already ended by teardown are left alone
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param SandboxReporter reporter:
+    :param ServiceRegistry service_registry: refreshed only if a service has no known child yet
+    :param list[str] service_names:
+    :return:
+    """
+    sandbox_ids = service_registry.get_sandbox_ids(service_names)
+    if not all(sandbox_ids.values()):
+        # one refresh also picks up children recorded by launches still in flight
+        sandbox_ids = service_registry.refresh().get_sandbox_ids(service_names)
+    for service_name in service_names:
+        if not sandbox_ids[service_name]:
+            continue
+        try:
+            if end_child_sandbox(api, sandbox_ids[service_name]):
+                reporter.warn_out("'{}' launched after cancellation, child sandbox ended".format(service_name))
+        except Exception as e:
+            reporter.err_out("'{}' end after cancellation FAILED: {}".format(service_name, str(e)))
+
+
+def _cancel_launch(api, res_id, reporter, service_registry, cancellation_token, service_names):
+    """
+    launcher teardown started, end children it may have missed and raise
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param SandboxReporter reporter:
+    :param ServiceRegistry service_registry:
+    :param LauncherCancellationToken cancellation_token:
+    :param list[str] service_names: services launched by this run
+    :return:
+    """
+    _end_cancelled_launches(api, res_id, reporter, service_registry, service_names)
+    exc_msg = "Launch CANCELLED, {}".format(cancellation_token.reason)
+    reporter.err_out(exc_msg)
+    raise Exception(exc_msg)
+
+
+def _deploy_sandboxes_async(api, launch_run, service_names, launch_options, progress_offset=0, progress_total=None):
+    """
+    launch services concurrently and report each result as it completes
+    :param CloudShellAPISession api: runs launch commands on executor threads
+    :param LaunchRun launch_run: control calls made from this thread go through its control_api. when its token is
+                                 cancelled by launcher teardown, children of launches still in flight are ended as they
+                                 return
+    :param list[str] service_names:
+    :param LaunchOptions launch_options: concurrency, rate limit, fail fast and retry policies of the launch
+    :param int progress_offset: launches already completed in earlier waves
+    :param int progress_total: total launches across all waves
+    :return: tuple of (failed service names, skipped service names)
+    :rtype: tuple[list[str], list[str]]
+    """
+    reporter = launch_run.reporter
+    run_journal = launch_run.run_journal
+    concurrency_controller = launch_options.concurrency_controller
+    fail_fast_policy = launch_options.fail_fast_policy
+    progress_total = progress_total if progress_total else len(service_names)
+    cancellation_token = launch_run.cancellation_token
+    if fail_fast_policy and not cancellation_token:
+        cancellation_token = CancellationToken()
+    failed_sandboxes = []
+    skipped_sandboxes = []
+    completed_count = progress_offset
+    for result in execute_commands_as_completed(
+        api=api,
+        res_id=launch_run.res_id,
+        target_components_list=service_names,
+        target_type="Service",
+        command_name=sb_globals.START_SANDBOX_COMMAND,
+        command_inputs=launch_run.start_sandbox_inputs,
+        max_thread_count=launch_options.concurrent_deploy_limit,
+        concurrency_controller=concurrency_controller,
+        rate_limiter=launch_options.rate_limiter,
+        cancellation_token=cancellation_token,
+        retry_policy=launch_options.retry_policy,
+        command_func=launch_run.start_sandbox_func,
+    ):
+        completed_count += 1
+        elapsed_minutes = result.elapsed_seconds / 60.0
+        if isinstance(result.error, CommandSkippedError):
+            skipped_sandboxes.append(result.component_name)
+            if run_journal:
+                run_journal.record(result.component_name, SKIPPED_STATUS, 0, result.error)
+            reporter.warn_out(
+                "[{}/{}] '{}' launch SKIPPED: {}".format(completed_count, progress_total, result.component_name, result.error),
+                log_only=True,
+            )
+            continue
+        if isinstance(cancellation_token, LauncherCancellationToken) and cancellation_token.is_launcher_ending:
+            # returned after teardown snapshot of existing children, end it here
+            reporter.warn_out(
+                "[{}/{}] '{}' launch CANCELLED: {}".format(
+                    completed_count, progress_total, result.component_name, cancellation_token.reason
+                ),
+                log_only=True,
+            )
+            _end_cancelled_launches(
+                launch_run.control_api, launch_run.res_id, reporter, launch_run.service_registry, [result.component_name]
+            )
+            skipped_sandboxes.append(result.component_name)
+            if run_journal:
+                run_journal.record(result.component_name, FAILED_STATUS, result.attempt_count, cancellation_token.reason)
+            continue
+        if run_journal:
+            run_journal.record_result(result)
+        attempts_msg = " ({} attempts)".format(result.attempt_count) if result.attempt_count > 1 else ""
+        if result.error is not None:
+            failed_sandboxes.append(result.component_name)
+            reporter.err_out(
+                "[{}/{}] '{}' FAILED after {:.2f} minutes{}: {}".format(
+                    completed_count, progress_total, result.component_name, elapsed_minutes, attempts_msg, result.error
+                )
+            )
+        else:
+            reporter.info_out(
+                "[{}/{}] '{}' deployed after {:.2f} minutes{}".format(
+                    completed_count, progress_total, result.component_name, elapsed_minutes, attempts_msg
+                )
+            )
+        if concurrency_controller:
+            reporter.info_out("Adaptive deploy limit now {}".format(concurrency_controller.limit), log_only=True)
+        if fail_fast_policy and fail_fast_policy.record_result(result.error is not None):
+            if not cancellation_token.is_cancelled():
+                abort_msg = "Aborting launches, {}".format(fail_fast_policy.describe())
+                reporter.err_out(abort_msg)
+                cancellation_token.cancel(abort_msg)
+    return sorted(failed_sandboxes), sorted(skipped_sandboxes)
+
+
+def _end_launched_sandboxes(api, res_id, reporter, service_registry, service_names, already_ended=None):
     """
-    function to be passed to threading implementation
+    end child sandboxes of given services that already have a sandbox id
     :param CloudShellAPISession api:
     :param str res_id:
-    :param str service_name:
+    :param SandboxReporter reporter:
+    :param ServiceRegistry service_registry: refreshed by caller if children were launched since last refresh
+    :param list[str] service_names:
+    :param set[str] already_ended: updated in place with services that were sent end command
     :return:
     """
-    # SYNC REMAINING TIME
-    _, sync_sandbox_exceptions = execute_commands_async(
+    already_ended = already_ended if already_ended is not None else set()
+    sandbox_ids = service_registry.get_sandbox_ids(service_names)
+    to_end = sorted(name for name in service_names if sandbox_ids[name] and name not in already_ended)
+    if not to_end:
+        return
+    reporter.warn_out("Ending {} launched sandboxes...".format(len(to_end)))
+    already_ended.update(to_end)
+    for result in execute_commands_as_completed(
         api=api,
         res_id=res_id,
-        target_components_list=targeted_components_list,
+        target_components_list=to_end,
         target_type="Service",
-        command_name=sb_globals.SYNC_REMAINING_TIME_COMMAND,
+        command_name=sb_globals.END_SANDBOX_COMMAND,
+    ):
+        if result.error is not None:
+            reporter.err_out("'{}' end FAILED: {}".format(result.component_name, result.error))
+
+
+def _abort_launch(
+    api, res_id, reporter, service_registry, fail_fast_policy, launched_services, skipped_services, is_end_launched
+):
+    """
+    report skipped launches, optionally end launched sandboxes, and raise
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param SandboxReporter reporter:
+    :param ServiceRegistry service_registry:
+    :param FailFastPolicy fail_fast_policy:
+    :param list[str] launched_services:
+    :param list[str] skipped_services:
+    :param bool is_end_launched:
+    :return:
+    """
+    if is_end_launched:
+        _end_launched_sandboxes(api, res_id, reporter, service_registry.refresh(), launched_services)
+    exc_msg = "Launch ABORTED, {}. Skipped {} sandboxes: {}".format(
+        fail_fast_policy.describe(), len(skipped_services), sorted(skipped_services)
     )
-    if sync_sandbox_exceptions:
-        failed_sandboxes = [result[0] for result in sync_sandbox_exceptions]
-        err_msg = "Failed Sandbox Extensions: {}".format(failed_sandboxes)
-        reporter.err_out(err_msg)
-        return failed_sandboxes
-    reporter.sb_warn_print("Parent Sandbox time synced up with child sandboxes.")
-    return None
+    reporter.err_out(exc_msg)
+    raise Exception(exc_msg)
+
+
+def _deploy_with_speculative_health_check(api, launch_run, health_check_service, service_names, launch_options):
+    """
+    run health check in background and start remaining services once it passes early milestones
+    if health check then fails, launches not yet started are dropped and launched sandboxes are ended
+    :param CloudShellAPISession api: runs launch and end commands on executor threads
+    :param LaunchRun launch_run: milestone polling and other calls made from this thread go through its control_api,
+                                 its token is cancelled on health check failure
+    :param str health_check_service:
+    :param list[str] service_names: services other than health check
+    :param LaunchOptions launch_options: retry policy applies to remaining services, health check is not retried
+    :return: tuple of (failed service names, skipped service names)
+    :rtype: tuple[list[str], list[str]]
+    """
+    if not launch_run.cancellation_token:
+        launch_run = launch_run._replace(cancellation_token=CancellationToken())
+    res_id = launch_run.res_id
+    reporter = launch_run.reporter
+    service_registry = launch_run.service_registry
+    cancellation_token = launch_run.cancellation_token
+    health_check_done = threading.Event()
+    health_check_results = []
+
+    # runs on executor result thread, journal write is left to this thread once the event is set
+    def _on_health_check_done(result):
+        health_check_results.append(result)
+        if result.error is not None:
+            cancellation_token.cancel("HEALTH CHECK '{}' failed".format(health_check_service))
+        health_check_done.set()
+
+    reporter.warn_out("Starting HEALTH CHECK deploy with speculative launch...")
+    submit_command(
+        api=api,
+        res_id=res_id,
+        target_name=health_check_service,
+        target_type="Service",
+        command_name=sb_globals.START_SANDBOX_COMMAND,
+        command_inputs=launch_run.start_sandbox_inputs,
+        callback=_on_health_check_done,
+        command_func=launch_run.start_sandbox_func,
+    )
+    is_milestones_passed = wait_for_health_check_milestones(
+        api=launch_run.control_api,
+        res_id=res_id,
+        reporter=reporter,
+        service_registry=service_registry,
+        service_name=health_check_service,
+        health_check_done_event=health_check_done,
+        healthy_setup_minutes=sb_globals.SPECULATIVE_HEALTHY_SETUP_MINUTES,
+    )
+    deploy_args = (api, launch_run, service_names, launch_options)
+
+    # health check finished before milestones were seen, continue as regular health check
+    if not is_milestones_passed:
+        health_check_result = health_check_results[0]
+        if launch_run.run_journal:
+            launch_run.run_journal.record_result(health_check_result)
+        if health_check_result.error is not None:
+            exc_msg = "HEALTH CHECK launch for blueprint '{}' FAILED: {}".format(
+                health_check_service, health_check_result.error
+            )
+            reporter.err_out(exc_msg)
+            raise Exception(exc_msg)
+        return _deploy_sandboxes_async(*deploy_args)
+
+    reporter.warn_out("HEALTH CHECK milestones passed. Speculatively launching remaining sandboxes...")
+    deploy_results = []
+    deploy_thread = threading.Thread(target=lambda: deploy_results.append(_deploy_sandboxes_async(*deploy_args)))
+    deploy_thread.start()
+    health_check_done.wait()
+
+    health_check_result = health_check_results[0]
+    if launch_run.run_journal:
+        launch_run.run_journal.record_result(health_check_result)
+    if health_check_result.error is None:
+        reporter.success_out("HEALTH CHECK '{}' passed".format(health_check_service))
+        deploy_thread.join()
+        return deploy_results[0]
+
+    exc_msg = "HEALTH CHECK launch for blueprint '{}' FAILED: {}".format(health_check_service, health_check_result.error)
+    reporter.err_out(exc_msg)
+    reporter.warn_out("Cancelling speculative launches...")
+    ended_services = set()
+    _end_launched_sandboxes(api, res_id, reporter, service_registry.refresh(), service_names, ended_services)
+    deploy_thread.join()
+    # in flight launches may have created reservations after first pass
+    _end_launched_sandboxes(api, res_id, reporter, service_registry.refresh(), service_names, ended_services)
+    if deploy_results:
+        _, skipped_sandboxes = deploy_results[0]
+        if skipped_sandboxes:
+            reporter.warn_out("Speculative launches skipped: {}".format(skipped_sandboxes))
+    raise Exception(exc_msg)
 
 
 # ========== Primary Function ==========
@@ -86,75 +431,72 @@ def launch_sandboxes_flow(sandbox, components=None):
         reporter.err_out(exc_msg)
         raise ValueError(exc_msg)
 
-    health_check_first_input_val = global_inputs_dict.get(sb_globals.HEALTH_CHECK_SANDBOX_INPUT)
-    is_health_check = True if health_check_first_input_val.lower() in ["true", "t", "yes", "y"] else False
+    # LAUNCH BEHAVIOUR INPUTS
+    try:
+        launch_options = LaunchOptions.from_global_inputs(global_inputs_dict)
+    except ValueError as e:
+        reporter.err_out(str(e))
+        raise
+    # cleared on re-run when health check sandbox is already deployed
+    is_health_check = launch_options.is_health_check
+    is_speculative_launch = launch_options.is_speculative_launch
 
-    async_deploy_input_val = global_inputs_dict.get(sb_globals.DEPLOY_CONCURRENTLY_BOOL_INPUT, True)
-    if isinstance(async_deploy_input_val, str):
-        if async_deploy_input_val.lower() in ["true", "y", "yes", "[any]", "any"]:
-            async_deploy_input_val = True
-        else:
-            async_deploy_input_val = False
-
-    # type conversion for deploy batch count
-    concurrent_deploy_limit = global_inputs_dict.get(sb_globals.CONCURRENT_DEPLOY_LIMIT_INPUT, 0)
-    if isinstance(concurrent_deploy_limit, str):
-        if concurrent_deploy_limit.lower() in [
-            "false",
-            "f",
-            "off",
-            "no",
-            "n",
-            "[any]",
-            "any",
-        ]:
-            concurrent_deploy_limit = 0
-        elif concurrent_deploy_limit.isdigit():
-            concurrent_deploy_limit = int(concurrent_deploy_limit)
-        else:
-            exc_msg = "Concurrent Deploy Limit should be set to 'off', or set to an integer. Received: {}".format(
-                concurrent_deploy_limit
-            )
-            reporter.err_out(exc_msg)
-            raise Exception(exc_msg)
+    directory_cache = TtlFileCache(ttl_seconds=sb_globals.DIRECTORY_CACHE_TTL_SECONDS)
+    blueprint_catalog = BlueprintCatalog(api, directory_cache)
 
-    # VALIDATE THAT BLUEPRINT NAME IS VALID AND IN DOMAIN
-    if not is_blueprint_in_domain(api, target_blueprint_input_val):
-        exc_msg = "Validation Failed. Check spelling and Blueprint domain for '{}'".format(target_blueprint_input_val)
-        reporter.err_out(exc_msg)
-        raise Exception(exc_msg)
+    # PRE-FLIGHT, INDEPENDENT CHECKS RUN CONCURRENTLY AND ALL FAILURES ARE REPORTED TOGETHER
+    def _validate_blueprint():
+        # VALIDATE THAT BLUEPRINT NAME IS VALID AND IN DOMAIN
+        if not is_blueprint_in_domain(api, target_blueprint_input_val, blueprint_catalog):
+            raise Exception("Check spelling and Blueprint domain for '{}'".format(target_blueprint_input_val))
+        # VALIDATE CHILD INPUTS ONCE HERE, NOT IN EVERY CHILD RESERVATION REQUEST
+        blueprint_info = blueprint_catalog.get_blueprint_info(target_blueprint_input_val)
+        undeclared_inputs = get_undeclared_global_inputs(child_sb_globals, blueprint_info.global_inputs)
+        if undeclared_inputs:
+            raise Exception(
+                "'{}' has inputs not declared by blueprint '{}': {}. Blueprint inputs: {}".format(
+                    sb_globals.GLOBAL_INPUTS_INPUT,
+                    target_blueprint_input_val,
+                    undeclared_inputs,
+                    sorted(blueprint_info.global_inputs),
+                )
+            )
+        return blueprint_info
 
-    # VALIDATE THAT USERS ARE REAL
-    if not participants_list_input:
-        participants_list_set = set()
-    else:
+    def _validate_participants():
+        # VALIDATE THAT USERS ARE REAL
         participants_list = [x.strip() for x in participants_list_input.split(",")]
-        validate_user_list(api, participants_list)
-        participants_list_set = set(participants_list)
+        validate_user_list(api, participants_list, UserDirectory(api, directory_cache))
+        return participants_list
 
-    # VALIDATE THAT GROUP IS REAL
-    if not cloudshell_group_input or cloudshell_group_input.lower() == "none":
-        target_group_users_set = set()
-    else:
-        all_groups = api.GetGroupsDetails().Groups
-        target_group_search = [group for group in all_groups if group.Name == cloudshell_group_input]
-        if not target_group_search:
-            exc_msg = "Group '{}' does not exist in system".format(cloudshell_group_input)
-            reporter.err_out(exc_msg)
-            raise Exception(exc_msg)
+    def _validate_groups():
+        # VALIDATE THAT GROUPS ARE REAL, COMMA SEPARATED
+        group_names = [x.strip() for x in cloudshell_group_input.split(",") if x.strip()]
+        return GroupIndex(api, directory_cache).get_users(group_names)
 
-        target_group = target_group_search[0]
-        target_group_users = target_group.Users
-        target_group_users_set = {user.Name for user in target_group_users}
+    preflight_checks = [(sb_globals.TARGET_BLUEPRINT_INPUT, _validate_blueprint)]
+    if participants_list_input:
+        preflight_checks.append((sb_globals.PARTICIPANTS_LIST_INPUT, _validate_participants))
+    if cloudshell_group_input and cloudshell_group_input.lower() != "none":
+        preflight_checks.append((sb_globals.CLOUDSHELL_GROUP_INPUT, _validate_groups))
+    try:
+        preflight_results = run_preflight_checks(api, preflight_checks)
+    except PreflightError as e:
+        reporter.err_out(str(e))
+        raise
+    blueprint_info = preflight_results[sb_globals.TARGET_BLUEPRINT_INPUT]
+    participants_list_set = set(preflight_results.get(sb_globals.PARTICIPANTS_LIST_INPUT, []))
+    target_group_users = preflight_results.get(sb_globals.CLOUDSHELL_GROUP_INPUT, [])
 
-    # COMBINE GROUP AND AD-HOC USERS
-    all_users_set = participants_list_set.union(target_group_users_set)
+    # COMBINE GROUP AND AD-HOC USERS, A USER IN BOTH GETS ONE SANDBOX REGARDLESS OF CASE
+    all_users_set = set(dedupe_user_names(sorted(participants_list_set) + target_group_users))
 
     # GET CURRENT SERVICES ON CANVAS
-    all_services = api.GetReservationDetails(res_id).ReservationDescription.Services
-    curr_controller_services = [s.Alias for s in all_services if s.ServiceName == sb_globals.SANDBOX_CONTROLLER_MODEL]
+    service_registry = ServiceRegistry(api, res_id, sb_globals.SANDBOX_CONTROLLER_MODEL).refresh()
+    curr_controller_services = service_registry.get_aliases()
 
     # ADD SERVICES TO CANVAS IF EMPTY ELSE USE EXISTING
+    expected_service_count = len(curr_controller_services)
     if not curr_controller_services:
         sorted_students = sorted(all_users_set)
         service_attributes = [
@@ -162,7 +504,6 @@ def launch_sandboxes_flow(sandbox, components=None):
             AttributeNameValue(sb_globals.GLOBAL_INPUTS_ATTR, child_sb_globals),
         ]
         reporter.warn_out("Adding Sandbox Controllers To Launcher Sandbox...")
-        time.sleep(2)
         set_services(
             api=api,
             res_id=res_id,
@@ -171,86 +512,384 @@ def launch_sandboxes_flow(sandbox, components=None):
             target_blueprint_name=target_blueprint_input_val,
             attributes_list=service_attributes,
         )
+        expected_service_count = len(sorted_students)
     else:
         reporter.warn_out("Services already exist, skipping add step")
 
-    # GET CURRENT SERVICES ON CANVAS
-    time.sleep(5)
-    all_services = api.GetReservationDetails(res_id).ReservationDescription.Services
-    curr_service_names = [s.Alias for s in all_services if s.ServiceName == sb_globals.SANDBOX_CONTROLLER_MODEL]
+    # GET CURRENT SERVICES ON CANVAS, ONCE ADDED SERVICES ARE VISIBLE
+    curr_service_names = []
+
+    def _is_services_visible():
+        curr_service_names[:] = service_registry.refresh().get_aliases()
+        return len(curr_service_names) >= expected_service_count
+
+    try:
+        wait_until(
+            _is_services_visible,
+            timeout_seconds=sb_globals.SERVICES_VISIBLE_TIMEOUT_SECONDS,
+            description="{} services on canvas".format(expected_service_count),
+        )
+    except WaitTimeoutError as e:
+        reporter.warn_out("{}, launching the {} visible services".format(str(e), len(curr_service_names)))
     sorted_service_names = sorted(curr_service_names)
-    service_launch_list = sorted_service_names if not is_health_check else sorted_service_names[1:]
-
-    # START EXECUTION
-    remaining_minutes = api.GetReservationRemainingTime(res_id).RemainingTimeInMinutes
-    start_sandbox_inputs = [InputNameValue(sb_globals.START_SANDBOX_DURATION_PARAM, str(int(remaining_minutes)))]
-    if is_health_check:
-        first_service_name = sorted_service_names[0]
-        reporter.warn_out("Starting HEALTH CHECK deploy...".format(first_service_name))
-        try:
-            api.ExecuteCommand(
-                reservationId=res_id,
-                targetName=first_service_name,
-                targetType="Service",
-                commandName=sb_globals.START_SANDBOX_COMMAND,
-                commandInputs=start_sandbox_inputs,
-                printOutput=True,
-            )
-        except Exception as e:
-            exc_msg = "HEALTH CHECK launch for blueprint '{}' FAILED: {}".format(first_service_name, str(e))
-            reporter.err_out(exc_msg)
-            raise Exception(exc_msg)
 
-    # IF ASYNC SWITCH OFF RUN SEQUENTIALLY AND RETURN
-    if not async_deploy_input_val:
-        reporter.warn_out("Starting sequential deploy of sandboxes...")
-        failed_sequential = []
-        for service_name in service_launch_list:
-            try:
-                api.ExecuteCommand(
-                    reservationId=res_id,
-                    targetName=service_name,
-                    targetType="Service",
-                    commandName=sb_globals.START_SANDBOX_COMMAND,
-                    commandInputs=start_sandbox_inputs,
-                    printOutput=True,
-                )
-            except Exception as e:
-                failed_sequential.append(service_name)
-                exc_msg = "Sandbox failed for '{}'".format(service_name)
-                reporter.err_out(exc_msg)
-        failed_extensions = _sync_sandboxes_wrapper(api, res_id, reporter, sorted_service_names)
-        if failed_sequential:
-            exc_msg = "Deployments failed for: {}".format(failed_sequential)
+    # background pollers and control calls of the launch get their own sessions, never waiting behind launches
+    session_factory = get_sandbox_session_factory(sandbox)
+    control_session_pool = ApiSessionPool(session_factory, max_size=sb_globals.CONTROL_API_SESSION_POOL_SIZE)
+    control_api = PooledApi(control_session_pool, checkout_timeout_seconds=sb_globals.CONTROL_API_CHECKOUT_TIMEOUT_SECONDS)
+
+    # ON RE-RUN ONLY LAUNCH SERVICES NOT YET DEPLOYED
+    run_journal = RunJournal(control_api, res_id, logger)
+    journal_entries = run_journal.load()
+    if journal_entries:
+        pending_service_names = RunJournal.get_relaunch_delta(sorted_service_names, journal_entries)
+        reporter.warn_out(
+            "Re-run detected, {} of {} sandboxes still need launching: {}".format(
+                len(pending_service_names), len(sorted_service_names), pending_service_names
+            )
+        )
+        failed_service_names = RunJournal.get_services_with_status(
+            pending_service_names, journal_entries, [FAILED_STATUS, TIMED_OUT_STATUS]
+        )
+        not_reset_service_names = reset_failed_sandboxes(
+            api, res_id, reporter, service_registry, failed_service_names, sb_globals.SANDBOX_ID_ATTR
+        )
+        # child of these may still run, relaunching would create a second one next to it
+        pending_service_names = [name for name in pending_service_names if name not in not_reset_service_names]
+        if is_health_check and sorted_service_names[0] not in pending_service_names:
+            # health check sandbox already deployed in previous run, or kept with a child that could not be ended
+            is_health_check = False
+            is_speculative_launch = False
+    else:
+        pending_service_names = sorted_service_names
+        not_reset_service_names = []
+    if not pending_service_names:
+        if not_reset_service_names:
+            exc_msg = "Failed sandboxes could not be reset for relaunch: {}".format(not_reset_service_names)
             reporter.err_out(exc_msg)
             raise Exception(exc_msg)
+        failed_extensions = sync_sandboxes_remaining_time(
+            api, res_id, reporter, service_registry, sorted_service_names, sb_globals.SYNC_REMAINING_TIME_TIMEOUT_SECONDS
+        )
         if failed_extensions:
             exc_msg = "Extensions failed for: {}".format(failed_extensions)
             reporter.err_out(exc_msg)
             raise Exception(exc_msg)
+        reporter.success_out("ALL Sandboxes already Deployed")
         return
+    service_launch_list = pending_service_names if not is_health_check else pending_service_names[1:]
 
-    # ASYNC flow
-    reporter.warn_out("Starting ASYNC deploy of sandboxes...")
-    _, start_sandbox_exceptions = execute_commands_async(
-        api=api,
-        res_id=res_id,
-        target_components_list=service_launch_list,
-        target_type="Service",
-        command_name=sb_globals.START_SANDBOX_COMMAND,
-        command_inputs=start_sandbox_inputs,
-        max_thread_count=concurrent_deploy_limit,
+    # SIZE SHARED EXECUTOR TO REQUESTED CONCURRENCY, 'off' RUNS ALL PENDING LAUNCHES AT ONCE
+    if launch_options.concurrency_controller:
+        requested_concurrency = sb_globals.ADAPTIVE_DEPLOY_MAX_LIMIT
+    elif launch_options.concurrent_deploy_limit:
+        requested_concurrency = launch_options.concurrent_deploy_limit
+    else:
+        requested_concurrency = len(pending_service_names)
+    shared_executor = size_shared_executor(requested_concurrency)
+    if shared_executor.max_workers < requested_concurrency:
+        reporter.warn_out(
+            "{} concurrent launches requested, executor ceiling clamps it to {} sandboxes at once".format(
+                requested_concurrency, shared_executor.max_workers
+            )
+        )
+
+    # TEARDOWN OF LAUNCHER CANCELS LAUNCHES STILL RUNNING
+    clear_launch_cancellation(api, res_id)
+    launch_cancellation_token = LauncherCancellationToken(
+        control_api, res_id, polling_seconds=sb_globals.LAUNCH_CANCEL_POLLING_SECONDS, logger=logger
     )
-    if start_sandbox_exceptions:
-        failed_sandboxes = [result[0] for result in start_sandbox_exceptions]
-        err_msg = "Failed Sandboxes: {}".format(failed_sandboxes)
-        reporter.err_out(err_msg)
-        raise Exception(err_msg)
-
-    failed_extensions = _sync_sandboxes_wrapper(api, res_id, reporter, sorted_service_names)
-    if failed_extensions:
-        exc_msg = "Extensions failed for: {}".format(failed_extensions)
-        reporter.err_out(exc_msg)
-        raise Exception(exc_msg)
 
-    reporter.success_out("ALL Sandboxes Deployed SUCCESSFULLY")
+    # one poller watches provisioning of all children instead of each driver polling its own child
+    status_poller = SandboxStatusPoller(
+        control_api,
+        polling_seconds=sb_globals.CHILD_STATUS_POLLING_SECONDS,
+        max_requests_per_second=sb_globals.CHILD_STATUS_MAX_REQUESTS_PER_SECOND,
+        logger=logger,
+    )
+    # concurrent launches each run their api calls on a pooled session instead of sharing the script session
+    # one session per executor worker, a launch holds its session for the whole 'start_sandbox' command
+    api_session_pool = ApiSessionPool(session_factory, max_size=get_shared_executor().max_workers)
+    fan_out_api = PooledApi(api_session_pool)
+
+    # after failed sandbox reset, direct launcher reads current controller attributes
+    if launch_options.is_direct_launch:
+        reporter.warn_out("Direct launch mode, child reservations created by setup script")
+        start_sandbox_func = DirectLauncher(
+            fan_out_api, res_id, reporter, res_details.Owner, status_poller, launch_cancellation_token
+        ).start_sandbox
+    elif launch_options.is_central_polling:
+        reporter.warn_out("Child provisioning polled centrally by setup script")
+        start_sandbox_func = CentrallyPolledLauncher(reporter, status_poller, launch_cancellation_token).start_sandbox
+    else:
+        start_sandbox_func = None
+
+    set_launch_state(api, res_id, LAUNCHING_STATE)
+    try:
+        # START EXECUTION
+        remaining_minutes = api.GetReservationRemainingTime(res_id).RemainingTimeInMinutes
+        launcher_end_time = time() + remaining_minutes * 60
+        # children that already have a sandbox keep their end time and are synced afterwards
+        aligned_service_names = set(pending_service_names) - set(service_registry.get_launched_aliases())
+        expected_setup_minutes = parse_duration_minutes(blueprint_info.estimated_setup_duration)
+        launch_deadline = LaunchDeadline(
+            budget_minutes=min(remaining_minutes, launch_options.launch_deadline_minutes)
+            if launch_options.launch_deadline_minutes
+            else remaining_minutes,
+            expected_setup_minutes=expected_setup_minutes,
+            setup_timeout_factor=sb_globals.CHILD_SETUP_TIMEOUT_FACTOR,
+            default_child_minutes=sb_globals.CHILD_SETUP_MAX_POLLING_MINUTES,
+        )
+        reporter.info_out(
+            "Launch deadline in {:.0f} minutes, blueprint setup estimated at {} minutes".format(
+                launch_deadline.get_remaining_minutes(), expected_setup_minutes
+            ),
+            log_only=True,
+        )
+
+        def start_sandbox_inputs(service_name):
+            # each child polls setup for at most the budget left, children that cannot finish in time are skipped
+            # duration is recomputed at dispatch and end time passed, so child ends with launcher
+            launch_deadline.check_can_start(service_name)
+            return [
+                InputNameValue(sb_globals.START_SANDBOX_DURATION_PARAM, str(get_minutes_until(launcher_end_time))),
+                InputNameValue(sb_globals.START_SANDBOX_END_TIME_PARAM, str(int(launcher_end_time))),
+                InputNameValue(sb_globals.START_SANDBOX_MAX_POLLING_PARAM, str(launch_deadline.get_child_budget_minutes())),
+            ]
+
+        launch_run = LaunchRun(
+            control_api=control_api,
+            res_id=res_id,
+            reporter=reporter,
+            service_registry=service_registry,
+            run_journal=run_journal,
+            cancellation_token=launch_cancellation_token,
+            start_sandbox_inputs=start_sandbox_inputs,
+            start_sandbox_func=start_sandbox_func,
+        )
+
+        # speculative health check runs alongside async deploy below
+        if is_speculative_launch and launch_options.is_async_deploy:
+            is_health_check_blocking = False
+        else:
+            is_health_check_blocking = is_health_check
+        if is_health_check_blocking:
+            first_service_name = pending_service_names[0]
+            reporter.warn_out("Starting HEALTH CHECK deploy...".format(first_service_name))
+            health_check_result = execute_command_with_retries(
+                api=api,
+                res_id=res_id,
+                target_name=first_service_name,
+                target_type="Service",
+                command_name=sb_globals.START_SANDBOX_COMMAND,
+                command_inputs=start_sandbox_inputs,
+                command_func=start_sandbox_func,
+            )
+            run_journal.record_result(health_check_result)
+            if launch_cancellation_token.is_cancelled():
+                _cancel_launch(api, res_id, reporter, service_registry, launch_cancellation_token, [first_service_name])
+            if health_check_result.error is not None:
+                exc_msg = "HEALTH CHECK launch for blueprint '{}' FAILED: {}".format(
+                    first_service_name, health_check_result.error
+                )
+                reporter.err_out(exc_msg)
+                raise Exception(exc_msg)
+
+        # IF ASYNC SWITCH OFF RUN SEQUENTIALLY AND RETURN
+        if not launch_options.is_async_deploy:
+            reporter.warn_out("Starting sequential deploy of sandboxes...")
+            failed_sequential = []
+            deadline_skipped = []
+            for launch_index, service_name in enumerate(service_launch_list):
+                if launch_cancellation_token.is_cancelled():
+                    _cancel_launch(api, res_id, reporter, service_registry, launch_cancellation_token, pending_service_names)
+                if launch_options.rate_limiter:
+                    launch_options.rate_limiter.acquire()
+                launch_result = execute_command_with_retries(
+                    api=api,
+                    res_id=res_id,
+                    target_name=service_name,
+                    target_type="Service",
+                    command_name=sb_globals.START_SANDBOX_COMMAND,
+                    command_inputs=start_sandbox_inputs,
+                    retry_policy=launch_options.retry_policy,
+                    command_func=start_sandbox_func,
+                )
+                if isinstance(launch_result.error, CommandSkippedError):
+                    # later launches cannot finish in time either
+                    deadline_skipped = service_launch_list[launch_index:]
+                    for skipped_name in deadline_skipped:
+                        run_journal.record(skipped_name, SKIPPED_STATUS, 0, launch_result.error)
+                    break
+                run_journal.record_result(launch_result)
+                is_failed = launch_result.error is not None
+                if is_failed:
+                    failed_sequential.append(service_name)
+                    exc_msg = "Sandbox failed for '{}' after {} attempts: {}".format(
+                        service_name, launch_result.attempt_count, launch_result.error
+                    )
+                    reporter.err_out(exc_msg)
+                if launch_options.fail_fast_policy and launch_options.fail_fast_policy.record_result(is_failed):
+                    launched_services = service_launch_list[: launch_index + 1]
+                    skipped_services = service_launch_list[launch_index + 1 :]
+                    _abort_launch(
+                        api,
+                        res_id,
+                        reporter,
+                        service_registry,
+                        launch_options.fail_fast_policy,
+                        launched_services,
+                        skipped_services,
+                        launch_options.is_end_on_abort,
+                    )
+            if launch_cancellation_token.is_cancelled():
+                _cancel_launch(api, res_id, reporter, service_registry, launch_cancellation_token, pending_service_names)
+            time_sync_targets = _get_time_sync_fallback_targets(
+                api, res_id, launcher_end_time, sorted_service_names, aligned_service_names
+            )
+            failed_extensions = sync_sandboxes_remaining_time(
+                api,
+                res_id,
+                reporter,
+                service_registry.refresh(),
+                time_sync_targets,
+                sb_globals.SYNC_REMAINING_TIME_TIMEOUT_SECONDS,
+            )
+            failed_sequential.extend(not_reset_service_names)
+            if failed_sequential:
+                exc_msg = "Deployments failed for: {}".format(failed_sequential)
+                reporter.err_out(exc_msg)
+                raise Exception(exc_msg)
+            if deadline_skipped:
+                exc_msg = "Launch deadline reached, {} sandboxes not started: {}".format(
+                    len(deadline_skipped), deadline_skipped
+                )
+                reporter.err_out(exc_msg)
+                raise Exception(exc_msg)
+            if failed_extensions:
+                exc_msg = "Extensions failed for: {}".format(failed_extensions)
+                reporter.err_out(exc_msg)
+                raise Exception(exc_msg)
+            return
+
+        # ASYNC flow
+        reporter.warn_out("Starting ASYNC deploy of sandboxes...")
+        if launch_options.concurrency_controller:
+            reporter.warn_out("Adaptive deploy limit starting at {}".format(launch_options.concurrency_controller.limit))
+        if launch_options.rate_limiter:
+            reporter.warn_out("Launches rate limited to {:g} per minute".format(launch_options.launch_rate_per_minute))
+        if launch_options.retry_policy:
+            reporter.warn_out(
+                "Transient launch failures retried up to {} times".format(launch_options.retry_policy.max_retries)
+            )
+        if is_speculative_launch:
+            failed_sandboxes, skipped_sandboxes = _deploy_with_speculative_health_check(
+                api=fan_out_api,
+                launch_run=launch_run,
+                health_check_service=pending_service_names[0],
+                service_names=service_launch_list,
+                launch_options=launch_options,
+            )
+        elif not launch_options.is_wave_rollout:
+            failed_sandboxes, skipped_sandboxes = _deploy_sandboxes_async(
+                api=fan_out_api,
+                launch_run=launch_run,
+                service_names=service_launch_list,
+                launch_options=launch_options,
+            )
+        else:
+            waves = split_into_waves(service_launch_list, sb_globals.WAVE_CANARY_SIZE, sb_globals.WAVE_GROWTH_FACTOR)
+            reporter.warn_out("Rolling out in {} waves of sizes {}".format(len(waves), [len(wave) for wave in waves]))
+            failed_sandboxes = []
+            skipped_sandboxes = []
+            launched_count = 0
+            for wave_index, wave in enumerate(waves):
+                if launch_cancellation_token.is_cancelled():
+                    skipped_sandboxes.extend(wave)
+                    continue
+                wave_label = "CANARY wave" if wave_index == 0 else "Wave {}/{}".format(wave_index + 1, len(waves))
+                reporter.warn_out("Starting {} ({} sandboxes)...".format(wave_label, len(wave)))
+                failed_in_wave, skipped_in_wave = _deploy_sandboxes_async(
+                    api=fan_out_api,
+                    launch_run=launch_run,
+                    service_names=wave,
+                    launch_options=launch_options,
+                    progress_offset=launched_count,
+                    progress_total=len(service_launch_list),
+                )
+                launched_count += len(wave)
+                failed_sandboxes.extend(failed_in_wave)
+                skipped_sandboxes.extend(skipped_in_wave)
+                if launch_cancellation_token.is_cancelled():
+                    continue
+                if not is_wave_healthy(len(failed_in_wave), len(wave), sb_globals.WAVE_MAX_FAILURE_RATIO):
+                    skipped_sandboxes = service_launch_list[launched_count:]
+                    exc_msg = (
+                        "{} failure ratio {}/{} above threshold {}. Rollout stopped. Failed: {}. Not launched: {}".format(
+                            wave_label,
+                            len(failed_in_wave),
+                            len(wave),
+                            sb_globals.WAVE_MAX_FAILURE_RATIO,
+                            sorted(failed_sandboxes),
+                            skipped_sandboxes,
+                        )
+                    )
+                    reporter.err_out(exc_msg)
+                    raise Exception(exc_msg)
+        if launch_cancellation_token.is_launcher_ending:
+            _cancel_launch(api, res_id, reporter, service_registry, launch_cancellation_token, pending_service_names)
+        if launch_cancellation_token.is_cancelled() and launch_options.fail_fast_policy:
+            launched_services = [name for name in service_launch_list if name not in skipped_sandboxes]
+            _abort_launch(
+                api,
+                res_id,
+                reporter,
+                service_registry,
+                launch_options.fail_fast_policy,
+                launched_services,
+                skipped_sandboxes,
+                launch_options.is_end_on_abort,
+            )
+        if skipped_sandboxes:
+            # nothing cancelled the launch, so these could not finish before the launch deadline
+            failed_sandboxes.extend(skipped_sandboxes)
+            reporter.err_out(
+                "Launch deadline reached, {} sandboxes not started: {}".format(
+                    len(skipped_sandboxes), sorted(skipped_sandboxes)
+                )
+            )
+        failed_sandboxes.extend(not_reset_service_names)
+        if failed_sandboxes:
+            failed_sandboxes.sort()
+            err_msg = "Failed Sandboxes: {}".format(failed_sandboxes)
+            reporter.err_out(err_msg)
+            raise Exception(err_msg)
+
+        time_sync_targets = _get_time_sync_fallback_targets(
+            api, res_id, launcher_end_time, sorted_service_names, aligned_service_names
+        )
+        failed_extensions = sync_sandboxes_remaining_time(
+            api,
+            res_id,
+            reporter,
+            service_registry.refresh(),
+            time_sync_targets,
+            sb_globals.SYNC_REMAINING_TIME_TIMEOUT_SECONDS,
+        )
+        if failed_extensions:
+            exc_msg = "Extensions failed for: {}".format(failed_extensions)
+            reporter.err_out(exc_msg)
+            raise Exception(exc_msg)
+
+        reporter.success_out("ALL Sandboxes Deployed SUCCESSFULLY")
+    finally:
+        # log only, must not replace the exception being unwound. teardown then waits out its cancel timeout
+        try:
+            set_launch_state(api, res_id, STOPPED_STATE)
+        except Exception as e:
+            reporter.err_out("Setting launch state '{}' FAILED: {}".format(STOPPED_STATE, str(e)), log_only=True)
+        status_poller.stop()
+        _log_session_pool_metrics(reporter, "Launch", api_session_pool)
+        _log_session_pool_metrics(reporter, "Control", control_session_pool)
+        api_session_pool.close()
+        control_session_pool.close()
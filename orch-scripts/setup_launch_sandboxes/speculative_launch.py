@@ -0,0 +1,66 @@
+from time import time
+
+# names only used as docstring types are marked noqa: F401
+from cloudshell.api.cloudshell_api import CloudShellAPISession  # noqa: F401
+from helper_code.SandboxReporter import SandboxReporter  # noqa: F401
+from helper_code.service_registry import ServiceRegistry  # noqa: F401
+
+
+def wait_for_health_check_milestones(
+    api,
+    res_id,
+    reporter,
+    service_registry,
+    service_name,
+    health_check_done_event,
+    healthy_setup_minutes,
+    polling_seconds=15,
+):
+    """
+    block until health check sandbox passes early milestones or health check command finishes first
+    milestones: 1. child reservation created  2. permitted users added  3. setup running without error for N minutes
+    :param CloudShellAPISession api:
+    :param str res_id:
+    :param SandboxReporter reporter:
+    :param ServiceRegistry service_registry: refreshed on each poll until health check child is recorded
+    :param str service_name: alias of health check controller service
+    :param threading.Event health_check_done_event: set when health check command returns
+    :param float healthy_setup_minutes:
+    :param int polling_seconds:
+    :return: True when milestones passed while health check still running
+    :rtype: bool
+    """
+    child_sandbox_id = None
+    is_users_added = False
+    setup_running_since = None
+    while not health_check_done_event.wait(polling_seconds):
+        if not child_sandbox_id:
+            child_sandbox_id = service_registry.refresh().get_sandbox_ids([service_name])[service_name]
+            if not child_sandbox_id:
+                continue
+            reporter.info_out("HEALTH CHECK milestone: '{}' reservation created".format(service_name))
+
+        child_details = api.GetReservationDetails(child_sandbox_id).ReservationDescription
+        if not is_users_added:
+            if not child_details.PermittedUsers:
+                continue
+            is_users_added = True
+            reporter.info_out("HEALTH CHECK milestone: '{}' permitted users added".format(service_name))
+
+        provisioning_status = child_details.ProvisioningStatus.lower()
+        if provisioning_status == "error":
+            # health check command will fail on its own, keep waiting for it
+            setup_running_since = None
+            continue
+        if provisioning_status == "ready":
+            return True
+        if setup_running_since is None:
+            setup_running_since = time()
+        if time() - setup_running_since >= healthy_setup_minutes * 60:
+            reporter.info_out(
+                "HEALTH CHECK milestone: '{}' setup running {} minutes without errors".format(
+                    service_name, healthy_setup_minutes
+                )
+            )
+            return True
+    return False
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `adaptive_concurrency`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import unittest
+
+from helper_code.adaptive_concurrency import AimdConcurrencyController
+
+
+class TestAimdConcurrencyController(unittest.TestCase):
+    def test_limit_grows_after_window_of_healthy_results(self):
+        controller = AimdConcurrencyController(initial_limit=2, max_limit=3)
+        self.assertEqual(controller.record_result(1.0, False), 2)
+        self.assertEqual(controller.record_result(1.0, False), 3)
+        for _ in range(6):
+            controller.record_result(1.0, False)
+        self.assertEqual(controller.limit, 3)
+
+    def test_error_halves_limit_once_per_in_flight_window(self):
+        controller = AimdConcurrencyController(initial_limit=8)
+        self.assertEqual(controller.record_result(1.0, True), 4)
+        # launches started under the old limit fail too, limit is not cut again for them
+        for _ in range(3):
+            self.assertEqual(controller.record_result(1.0, True), 4)
+        self.assertEqual(controller.record_result(1.0, True), 2)
+
+    def test_latency_spike_cuts_limit(self):
+        controller = AimdConcurrencyController(initial_limit=4, latency_spike_factor=2.0)
+        controller.record_result(10.0, False)
+        self.assertEqual(controller.record_result(25.0, False), 2)
+
+    def test_limit_never_below_min(self):
+        controller = AimdConcurrencyController(initial_limit=1, min_limit=1)
+        self.assertEqual(controller.record_result(1.0, True), 1)
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
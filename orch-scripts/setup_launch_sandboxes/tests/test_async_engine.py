@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `async_engine`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import threading
+import unittest
+from time import time
+
+from helper_code.async_engine import CommandTimeoutError, run_commands
+from helper_code.bounded_executor import BoundedExecutor
+
+
+class _CommandOutput(object):
+    def __init__(self, output):
+        self.Output = output
+
+
+class _FakeApi(object):
+    def __init__(self, blocked_targets=()):
+        self.blocked_targets = set(blocked_targets)
+        self.release_blocked = threading.Event()
+        self.blocked_done = threading.Event()
+
+    def ExecuteCommand(self, reservationId, targetName, targetType, commandName, commandInputs, printOutput):
+        if targetName in self.blocked_targets:
+            self.release_blocked.wait(5)
+            self.blocked_done.set()
+        return _CommandOutput("{} done".format(targetName))
+
+
+class TestAsyncEngine(unittest.TestCase):
+    def setUp(self):
+        self.executor = BoundedExecutor(max_workers=2, max_queue_size=2)
+
+    def test_results_in_completion_order(self):
+        results = run_commands(_FakeApi(), "res", ["a", "b", "c"], "Service", "cmd", executor=self.executor)
+        self.assertEqual(sorted(r.component_name for r in results), ["a", "b", "c"])
+        self.assertTrue(all(r.error is None for r in results))
+
+    def test_timeout_returns_timeout_error(self):
+        api = _FakeApi(blocked_targets=["slow"])
+        results = run_commands(api, "res", ["slow", "fast"], "Service", "cmd", timeout_seconds=0.1, executor=self.executor)
+        api.release_blocked.set()
+        errors = {r.component_name: r.error for r in results}
+        self.assertIsNone(errors["fast"])
+        self.assertIsInstance(errors["slow"], CommandTimeoutError)
+
+    def test_fan_out_after_timeout_on_same_executor(self):
+        # timed out worker finishes after its event loop is closed, executor must keep delivering results
+        api = _FakeApi(blocked_targets=["slow"])
+        run_commands(api, "res", ["slow"], "Service", "cmd", timeout_seconds=0.1, executor=self.executor)
+        api.release_blocked.set()
+        self.assertTrue(api.blocked_done.wait(5))
+
+        results = run_commands(_FakeApi(), "res", ["a", "b"], "Service", "cmd", timeout_seconds=5, executor=self.executor)
+        self.assertEqual(sorted(r.output for r in results), ["a done", "b done"])
+
+    def test_repeated_timeouts_do_not_block_event_loop(self):
+        # timed out calls keep their submission slot while the worker is busy, so the loop never blocks in submit
+        target_names = ["slow{}".format(i) for i in range(6)]
+        api = _FakeApi(blocked_targets=target_names)
+        start_time = time()
+        results = run_commands(api, "res", target_names, "Service", "cmd", timeout_seconds=0.1, executor=self.executor)
+        elapsed_seconds = time() - start_time
+        api.release_blocked.set()
+        self.assertLess(elapsed_seconds, 2)
+        self.assertTrue(all(isinstance(r.error, CommandTimeoutError) for r in results))
+        self.assertEqual(len(results), 6)
+
+    def test_on_result_error_cancels_and_executor_survives(self):
+        api = _FakeApi(blocked_targets=["slow"])
+
+        def _raise_on_fast(result):
+            if result.component_name == "fast":
+                raise ValueError("callback failed")
+
+        with self.assertRaises(ValueError):
+            run_commands(api, "res", ["fast", "slow"], "Service", "cmd", on_result=_raise_on_fast, executor=self.executor)
+        api.release_blocked.set()
+        self.assertTrue(api.blocked_done.wait(5))
+
+        results = run_commands(_FakeApi(), "res", ["a"], "Service", "cmd", timeout_seconds=5, executor=self.executor)
+        self.assertEqual([r.output for r in results], ["a done"])
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
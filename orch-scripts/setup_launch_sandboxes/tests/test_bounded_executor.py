@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `bounded_executor`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import unittest
+
+import SB_GLOBALS as sb_globals
+from helper_code import bounded_executor
+
+
+class TestSizeSharedExecutor(unittest.TestCase):
+    def test_requested_limit_above_default_grows_executor(self):
+        requested = sb_globals.EXECUTOR_MAX_WORKERS + 5
+        self.assertEqual(bounded_executor.size_shared_executor(requested).max_workers, requested)
+        self.assertEqual(bounded_executor.get_shared_executor().max_workers, requested)
+
+    def test_requested_limit_above_ceiling_is_clamped(self):
+        executor = bounded_executor.size_shared_executor(sb_globals.EXECUTOR_MAX_WORKERS_CEILING + 1)
+        self.assertEqual(executor.max_workers, sb_globals.EXECUTOR_MAX_WORKERS_CEILING)
+
+    def test_small_limit_keeps_default_size(self):
+        executor = bounded_executor.size_shared_executor(2)
+        self.assertEqual(executor.max_workers, sb_globals.EXECUTOR_MAX_WORKERS)
+        self.assertIs(bounded_executor.size_shared_executor(1), executor)
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `error_classification` and `retry_policy`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import importlib.util
+import os
+import socket
+import unittest
+
+from cloudshell.api.common_cloudshell_api import CloudShellAPIError
+from helper_code.error_classification import PermanentError, is_transient_error
+from helper_code.retry_policy import RetryPolicy
+from helper_code.status_poller import PollSandboxTimeoutError
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CLASSIFIER_COPIES = [
+    os.path.join(TESTS_DIR, "..", "helper_code", "error_classification.py"),
+    os.path.join(TESTS_DIR, "..", "..", "retry_failed_sandboxes", "helper_code", "error_classification.py"),
+    os.path.join(TESTS_DIR, "..", "..", "..", "shells", "sandbox-controller", "src", "helper_code", "error_classification.py"),
+]
+DRIVER_POLL_SANDBOX_PATH = os.path.join(TESTS_DIR, "..", "..", "..", "shells", "sandbox-controller", "src", "poll_sandbox.py")
+
+
+class _SlimStatus(object):
+    Status = "Started"
+    ProvisioningStatus = "Setup"
+
+
+class _FakeApi(object):
+    class _Details(object):
+        class ReservationDescription(object):
+            Name = "child"
+
+    class _Status(object):
+        ReservationSlimStatus = _SlimStatus()
+
+    def GetReservationDetails(self, reservationId):
+        return self._Details()
+
+    def GetReservationStatus(self, reservationId):
+        return self._Status()
+
+
+def _get_driver_poll_timeout_error():
+    """
+    driver poll timeout as orchestrator receives it, wrapped in 'ExecuteCommand' api error text
+    driver helper_code imports resolve to the identical setup copies
+    """
+    spec = importlib.util.spec_from_file_location("driver_poll_sandbox", DRIVER_POLL_SANDBOX_PATH)
+    poll_sandbox = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(poll_sandbox)
+    try:
+        poll_sandbox.poll_setup_for_provisioning_status(_FakeApi(), "child-id", max_polling_minutes=0)
+    except poll_sandbox.PollSandboxTimeoutError as e:
+        return CloudShellAPIError(100, "Error: {}".format(str(e)), "")
+    raise AssertionError("driver polling did not time out")
+
+
+class TestIsTransientError(unittest.TestCase):
+    def test_transient_errors(self):
+        self.assertTrue(is_transient_error(socket.timeout()))
+        self.assertTrue(is_transient_error(ConnectionResetError()))
+        self.assertTrue(is_transient_error(Exception("Server is busy, try again later")))
+        self.assertTrue(is_transient_error(Exception("The operation timed out")))
+
+    def test_permanent_errors(self):
+        self.assertFalse(is_transient_error(Exception("Blueprint 'x' not found")))
+        self.assertFalse(is_transient_error(Exception("'svc' provisioning status 'Error' after 3 minutes")))
+        self.assertFalse(is_transient_error(Exception("unexpected driver error")))
+
+    def test_permanent_type_wins_over_timeout_message(self):
+        self.assertFalse(is_transient_error(PollSandboxTimeoutError("Polling 'x' timed out after 45 minutes")))
+        self.assertFalse(is_transient_error(PermanentError("'svc' connection reset while ending child")))
+
+    def test_driver_poll_timeout_wrapped_as_api_error_is_permanent(self):
+        driver_error = _get_driver_poll_timeout_error()
+        self.assertIn("timed out", str(driver_error))
+        self.assertFalse(is_transient_error(driver_error))
+
+    def test_orchestration_and_driver_copies_identical(self):
+        contents = set()
+        for copy_path in CLASSIFIER_COPIES:
+            with open(copy_path, "rb") as f:
+                contents.add(f.read())
+        self.assertEqual(len(contents), 1)
+
+
+class TestRetryPolicyCall(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=2, base_delay_seconds=0, jitter_ratio=0)
+
+    def test_transient_error_retried_until_success(self):
+        errors = [Exception("server busy"), Exception("connection reset")]
+
+        def _flaky(value):
+            if errors:
+                raise errors.pop(0)
+            return value
+
+        self.assertEqual(self.policy.call(_flaky, value="ok"), "ok")
+
+    def test_permanent_error_raised_on_first_attempt(self):
+        attempts = []
+
+        def _missing():
+            attempts.append(1)
+            raise Exception("reservation does not exist")
+
+        with self.assertRaises(Exception):
+            self.policy.call(_missing)
+        self.assertEqual(len(attempts), 1)
+
+    def test_retry_budget_exhausted(self):
+        attempts = []
+
+        def _busy():
+            attempts.append(1)
+            raise Exception("server busy")
+
+        with self.assertRaises(Exception):
+            self.policy.call(_busy)
+        self.assertEqual(len(attempts), 3)
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
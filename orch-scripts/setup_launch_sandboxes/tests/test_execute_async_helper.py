@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `execute_async_helper`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import threading
+import unittest
+
+from helper_code.bounded_executor import BoundedExecutor
+from helper_code.execute_async_helper import (
+    CANCELLATION_POLLING_SECONDS,
+    CancellationToken,
+    CommandSkippedError,
+    _get_wait_timeout,
+    execute_commands_as_completed,
+)
+from helper_code.retry_policy import RetryPolicy
+
+
+def _echo_command(api, res_id, target_name, target_type, command_name, command_inputs=None):
+    return "{} done".format(target_name)
+
+
+class TestExecuteCommandsAsCompleted(unittest.TestCase):
+    def setUp(self):
+        self.executor = BoundedExecutor(max_workers=2, max_queue_size=2)
+
+    def _run(self, target_names, **kwargs):
+        kwargs.setdefault("command_func", _echo_command)
+        results = execute_commands_as_completed(None, "res", target_names, "Service", "cmd", executor=self.executor, **kwargs)
+        return {result.component_name: result for result in results}
+
+    def test_all_components_yielded(self):
+        results = self._run(["a", "b", "c"])
+        self.assertEqual(sorted(results), ["a", "b", "c"])
+        self.assertEqual(results["b"].output, "b done")
+
+    def test_skipped_last_target_with_one_thread(self):
+        def _skip_last(target_name):
+            if target_name == "c":
+                raise CommandSkippedError("deadline passed")
+            return []
+
+        results = self._run(["a", "b", "c"], command_inputs=_skip_last, max_thread_count=1)
+        self.assertIsInstance(results["c"].error, CommandSkippedError)
+        self.assertEqual(results["c"].attempt_count, 0)
+        self.assertIsNone(results["a"].error)
+
+    def test_input_error_fails_only_its_component(self):
+        def _bad_inputs(target_name):
+            if target_name == "b":
+                raise ValueError("bad duration")
+            return []
+
+        results = self._run(["a", "b", "c"], command_inputs=_bad_inputs, max_thread_count=1)
+        self.assertIsInstance(results["b"].error, ValueError)
+        self.assertEqual(results["b"].attempt_count, 1)
+        self.assertEqual(results["c"].output, "c done")
+
+    def test_transient_failure_retried_until_success(self):
+        failures = {"b": [Exception("server busy"), Exception("connection reset")]}
+        lock = threading.Lock()
+
+        def _flaky_command(api, res_id, target_name, target_type, command_name, command_inputs=None):
+            with lock:
+                if failures.get(target_name):
+                    raise failures[target_name].pop(0)
+            return "{} done".format(target_name)
+
+        results = self._run(
+            ["a", "b"],
+            command_func=_flaky_command,
+            retry_policy=RetryPolicy(max_retries=2, base_delay_seconds=0, jitter_ratio=0),
+        )
+        self.assertIsNone(results["b"].error)
+        self.assertEqual(results["b"].attempt_count, 3)
+        self.assertEqual(results["a"].attempt_count, 1)
+
+    def test_permanent_failure_not_retried(self):
+        def _failing_command(api, res_id, target_name, target_type, command_name, command_inputs=None):
+            raise Exception("'{}' provisioning status 'Error' after 3 minutes".format(target_name))
+
+        results = self._run(
+            ["a"], command_func=_failing_command, retry_policy=RetryPolicy(max_retries=2, base_delay_seconds=0)
+        )
+        self.assertIsNotNone(results["a"].error)
+        self.assertEqual(results["a"].attempt_count, 1)
+
+    def test_retry_budget_exhausted_yields_last_failure(self):
+        def _busy_command(api, res_id, target_name, target_type, command_name, command_inputs=None):
+            raise Exception("server busy")
+
+        results = self._run(
+            ["a"], command_func=_busy_command, retry_policy=RetryPolicy(max_retries=1, base_delay_seconds=0, jitter_ratio=0)
+        )
+        self.assertEqual(str(results["a"].error), "server busy")
+        self.assertEqual(results["a"].attempt_count, 2)
+
+    def test_cancelled_before_start_skips_all(self):
+        token = CancellationToken()
+        token.cancel("launcher teardown")
+        results = self._run(["a", "b"], cancellation_token=token)
+        self.assertEqual(sorted(results), ["a", "b"])
+        for result in results.values():
+            self.assertIsInstance(result.error, CommandSkippedError)
+            self.assertEqual(str(result.error), "launcher teardown")
+
+    def test_cancel_mid_run_collects_in_flight_and_skips_rest(self):
+        token = CancellationToken()
+
+        def _cancelling_command(api, res_id, target_name, target_type, command_name, command_inputs=None):
+            if target_name == "a":
+                token.cancel("abort threshold reached")
+            return "{} done".format(target_name)
+
+        results = self._run(["a", "b", "c"], command_func=_cancelling_command, cancellation_token=token, max_thread_count=1)
+        self.assertEqual(results["a"].output, "a done")
+        self.assertIsInstance(results["b"].error, CommandSkippedError)
+        self.assertIsInstance(results["c"].error, CommandSkippedError)
+
+    def test_cancel_drops_scheduled_retry(self):
+        token = CancellationToken()
+
+        def _failing_then_cancel(api, res_id, target_name, target_type, command_name, command_inputs=None):
+            token.cancel("launcher teardown")
+            raise Exception("server busy")
+
+        results = self._run(
+            ["a"],
+            command_func=_failing_then_cancel,
+            cancellation_token=token,
+            retry_policy=RetryPolicy(max_retries=2, base_delay_seconds=60),
+        )
+        self.assertEqual(str(results["a"].error), "server busy")
+        self.assertEqual(results["a"].attempt_count, 1)
+
+
+class TestGetWaitTimeout(unittest.TestCase):
+    def test_ready_retry_not_delayed_by_cancellation_polling(self):
+        self.assertEqual(_get_wait_timeout(None, 0.0, True), 0.0)
+
+    def test_unbounded_wait_capped_when_polling_cancellation(self):
+        self.assertIsNone(_get_wait_timeout(None, None, False))
+        self.assertEqual(_get_wait_timeout(None, None, True), CANCELLATION_POLLING_SECONDS)
+
+    def test_shortest_wait_wins(self):
+        self.assertEqual(_get_wait_timeout(0.5, 2.0, False), 0.5)
+        self.assertEqual(_get_wait_timeout(30.0, 20.0, True), CANCELLATION_POLLING_SECONDS)
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
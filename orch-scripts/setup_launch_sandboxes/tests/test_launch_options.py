@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `launch_options`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import unittest
+
+import SB_GLOBALS as sb_globals
+from launch_options import LaunchOptions
+
+
+class TestLaunchOptions(unittest.TestCase):
+    def test_defaults_when_inputs_missing(self):
+        launch_options = LaunchOptions.from_global_inputs({})
+        self.assertTrue(launch_options.is_async_deploy)
+        self.assertFalse(launch_options.is_health_check)
+        self.assertEqual(launch_options.concurrent_deploy_limit, 0)
+        self.assertIsNone(launch_options.concurrency_controller)
+        self.assertIsNone(launch_options.rate_limiter)
+        self.assertIsNone(launch_options.fail_fast_policy)
+        self.assertIsNone(launch_options.launch_deadline_minutes)
+        self.assertFalse(launch_options.is_direct_launch)
+
+    def test_off_spellings_shared_by_inputs(self):
+        for off_val in ["", "Off", "None", "false"]:
+            launch_options = LaunchOptions.from_global_inputs(
+                {
+                    sb_globals.CONCURRENT_DEPLOY_LIMIT_INPUT: off_val,
+                    sb_globals.LAUNCH_RATE_PER_MINUTE_INPUT: off_val,
+                    sb_globals.LAUNCH_RETRY_COUNT_INPUT: off_val,
+                    sb_globals.LAUNCH_DEADLINE_MINUTES_INPUT: off_val,
+                }
+            )
+            self.assertEqual(launch_options.concurrent_deploy_limit, 0)
+            self.assertIsNone(launch_options.rate_limiter)
+            self.assertIsNone(launch_options.retry_policy)
+            self.assertIsNone(launch_options.launch_deadline_minutes)
+
+    def test_values_parsed_into_policies(self):
+        launch_options = LaunchOptions.from_global_inputs(
+            {
+                sb_globals.HEALTH_CHECK_SANDBOX_INPUT: "Speculative",
+                sb_globals.CONCURRENT_DEPLOY_LIMIT_INPUT: "Adaptive",
+                sb_globals.LAUNCH_RATE_PER_MINUTE_INPUT: "10",
+                sb_globals.LAUNCH_RETRY_COUNT_INPUT: "2",
+                sb_globals.LAUNCH_MODE_INPUT: "Direct",
+                sb_globals.LAUNCH_DEADLINE_MINUTES_INPUT: "30",
+            }
+        )
+        self.assertTrue(launch_options.is_health_check)
+        self.assertTrue(launch_options.is_speculative_launch)
+        self.assertIsNotNone(launch_options.concurrency_controller)
+        self.assertEqual(launch_options.launch_rate_per_minute, 10.0)
+        self.assertIsNotNone(launch_options.rate_limiter)
+        self.assertEqual(launch_options.retry_policy.max_retries, 2)
+        self.assertTrue(launch_options.is_direct_launch)
+        self.assertEqual(launch_options.launch_deadline_minutes, 30)
+
+    def test_invalid_input_names_input(self):
+        invalid_inputs = [
+            (sb_globals.CONCURRENT_DEPLOY_LIMIT_INPUT, "lots", "Concurrent Deploy Limit"),
+            (sb_globals.LAUNCH_RATE_PER_MINUTE_INPUT, "-1", "Launch Rate Per Minute"),
+            (sb_globals.LAUNCH_RETRY_COUNT_INPUT, "x", "Launch Retry Count"),
+            (sb_globals.LAUNCH_DEADLINE_MINUTES_INPUT, "soon", "Launch Deadline Minutes"),
+        ]
+        for input_key, input_val, input_name in invalid_inputs:
+            with self.assertRaises(ValueError) as ctx:
+                LaunchOptions.from_global_inputs({input_key: input_val})
+            self.assertIn(input_name, str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
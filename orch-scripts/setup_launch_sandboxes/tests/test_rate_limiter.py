@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `rate_limiter`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import unittest
+from unittest import mock
+
+from helper_code.rate_limiter import TokenBucketRateLimiter
+
+
+class TestTokenBucketRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        time_patcher = mock.patch("helper_code.rate_limiter.time", side_effect=lambda: self.now)
+        time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+    def test_burst_then_wait_for_refill(self):
+        limiter = TokenBucketRateLimiter(rate_per_minute=60, burst=2)
+        self.assertEqual(limiter.try_acquire(), 0)
+        self.assertEqual(limiter.try_acquire(), 0)
+        self.assertAlmostEqual(limiter.try_acquire(), 1.0)
+        self.now += 0.5
+        self.assertAlmostEqual(limiter.try_acquire(), 0.5)
+        self.now += 0.5
+        self.assertEqual(limiter.try_acquire(), 0)
+
+    def test_jitter_delays_next_grant(self):
+        limiter = TokenBucketRateLimiter(rate_per_minute=600, burst=5, max_jitter_seconds=2.0)
+        with mock.patch("helper_code.rate_limiter.random.uniform", return_value=1.5):
+            self.assertEqual(limiter.try_acquire(), 0)
+        self.assertAlmostEqual(limiter.try_acquire(), 1.5)
+
+    def test_non_positive_rate_rejected(self):
+        with self.assertRaises(ValueError):
+            TokenBucketRateLimiter(rate_per_minute=0)
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `run_journal`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import unittest
+
+from helper_code.execute_async_helper import CommandResult, CommandSkippedError
+from helper_code.run_journal import (
+    DEPLOYED_STATUS,
+    FAILED_STATUS,
+    SKIPPED_STATUS,
+    TIMED_OUT_STATUS,
+    RunJournal,
+    get_launch_status,
+)
+
+
+class _SandboxData(object):
+    def __init__(self, key_values):
+        self.SandboxDataKeyValues = key_values
+
+
+class _FakeApi(object):
+    def __init__(self):
+        self.sandbox_data = {}
+        self.fail_writes = False
+
+    def GetSandboxData(self, reservationId):
+        return _SandboxData(list(self.sandbox_data.values()))
+
+    def SetSandboxData(self, reservationId, sandboxDataKeyValues):
+        if self.fail_writes:
+            raise Exception("server busy")
+        for key_value in sandboxDataKeyValues:
+            self.sandbox_data[key_value.Key] = key_value
+
+
+class TestRunJournal(unittest.TestCase):
+    def setUp(self):
+        self.api = _FakeApi()
+        self.journal = RunJournal(self.api, "res")
+
+    def test_launch_status_from_error(self):
+        self.assertEqual(get_launch_status(None), DEPLOYED_STATUS)
+        self.assertEqual(get_launch_status(Exception("Polling 'x' timed out after 45 minutes")), TIMED_OUT_STATUS)
+        self.assertEqual(get_launch_status(Exception("provisioning status 'Error'")), FAILED_STATUS)
+
+    def test_failed_then_deployed_leaves_relaunch_delta(self):
+        self.journal.record_result(CommandResult("a", None, Exception("provisioning status 'Error'"), 1.0, 1))
+        self.journal.record_result(CommandResult("b", "ok", None, 1.0, 1))
+        entries = self.journal.load()
+        self.assertEqual(entries["a"]["status"], FAILED_STATUS)
+        self.assertEqual(RunJournal.get_relaunch_delta(["a", "b", "c"], entries), ["a", "c"])
+
+        self.journal.record_result(CommandResult("a", "ok", None, 1.0, 2))
+        entries = self.journal.load()
+        self.assertEqual(entries["a"], {"status": DEPLOYED_STATUS, "attempts": 2, "updated": entries["a"]["updated"]})
+        self.assertEqual(RunJournal.get_relaunch_delta(["a", "b", "c"], entries), ["c"])
+
+    def test_services_with_status(self):
+        self.journal.record("a", SKIPPED_STATUS, 0, CommandSkippedError("aborted"))
+        self.journal.record("b", TIMED_OUT_STATUS, 1, Exception("timed out"))
+        self.journal.record("c", DEPLOYED_STATUS)
+        entries = self.journal.load()
+        self.assertEqual(
+            RunJournal.get_services_with_status(["a", "b", "c", "d"], entries, [FAILED_STATUS, TIMED_OUT_STATUS]), ["b"]
+        )
+        self.assertEqual(entries["a"]["error"], "aborted")
+
+    def test_failed_write_does_not_raise(self):
+        self.api.fail_writes = True
+        self.journal.record("a", DEPLOYED_STATUS)
+        self.assertEqual(self.journal.load(), {})
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
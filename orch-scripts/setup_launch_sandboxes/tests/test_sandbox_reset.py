@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `sandbox_reset`
+run from setup_launch_sandboxes dir: python -m pytest tests
+"""
+
+import unittest
+
+from helper_code.sandbox_reset import reset_failed_sandboxes
+
+SANDBOX_ID_ATTR = "Sandbox Controller.Sandbox Id"
+
+
+class _Reporter(object):
+    def __init__(self):
+        self.errors = []
+
+    def warn_out(self, message, log_only=False):
+        pass
+
+    def err_out(self, message, log_only=False):
+        self.errors.append(message)
+
+
+class _Registry(object):
+    def __init__(self, sandbox_ids):
+        self.sandbox_ids = dict(sandbox_ids)
+
+    def get_sandbox_ids(self, service_names):
+        return {name: self.sandbox_ids.get(name, "") for name in service_names}
+
+    def set_sandbox_id(self, service_name, sandbox_id):
+        self.sandbox_ids[service_name] = sandbox_id
+
+
+class _SlimStatus(object):
+    def __init__(self, status):
+        self.Status = status
+
+
+class _StatusResponse(object):
+    def __init__(self, status):
+        self.ReservationSlimStatus = _SlimStatus(status)
+
+
+class _FakeApi(object):
+    def __init__(self, statuses, unendable_ids=()):
+        self.statuses = statuses
+        self.unendable_ids = set(unendable_ids)
+        self.ended_ids = []
+        self.cleared_services = []
+
+    def GetReservationStatus(self, reservationId):
+        return _StatusResponse(self.statuses[reservationId])
+
+    def EndReservation(self, reservationId):
+        if reservationId in self.unendable_ids:
+            raise Exception("end refused")
+        self.ended_ids.append(reservationId)
+
+    def SetServiceAttributesValues(self, reservationId, serviceAlias, attributeRequests):
+        self.cleared_services.append(serviceAlias)
+
+
+class TestResetFailedSandboxes(unittest.TestCase):
+    def test_child_that_could_not_be_ended_keeps_sandbox_id(self):
+        api = _FakeApi({"id-a": "Started", "id-b": "Started"}, unendable_ids=["id-b"])
+        registry = _Registry({"a": "id-a", "b": "id-b"})
+        reporter = _Reporter()
+
+        not_reset = reset_failed_sandboxes(api, "res", reporter, registry, ["a", "b"], SANDBOX_ID_ATTR)
+
+        self.assertEqual(not_reset, ["b"])
+        self.assertEqual(api.cleared_services, ["a"])
+        self.assertEqual(registry.sandbox_ids, {"a": "", "b": "id-b"})
+        self.assertEqual(len(reporter.errors), 1)
+
+    def test_ended_child_not_ended_again_and_service_without_child_skipped(self):
+        api = _FakeApi({"id-a": "Completed"})
+        registry = _Registry({"a": "id-a", "c": ""})
+
+        not_reset = reset_failed_sandboxes(api, "res", _Reporter(), registry, ["a", "c"], SANDBOX_ID_ATTR)
+
+        self.assertEqual(not_reset, [])
+        self.assertEqual(api.ended_ids, [])
+        self.assertEqual(api.cleared_services, ["a"])
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(unittest.main())
@@ -0,0 +1,105 @@
+"""
+Thread pool shared by every command fan-out of an orchestration run.
+Worker count is capped and submissions block once the pending queue is full,
+so thread count and memory stay flat regardless of participant count.
+Default size and ceiling come from SB_GLOBALS, flows grow it to their requested concurrency.
+"""
+import threading
+from multiprocessing.pool import ThreadPool
+
+import SB_GLOBALS as sb_globals
+
+
+class BoundedExecutor(object):
+    def __init__(self, max_workers, max_queue_size=None):
+        """
+        :param int max_workers: thread ceiling of the pool
+        :param int max_queue_size: how many submissions may wait for a free worker before submit blocks, max_workers if None
+        """
+        self._max_workers = max(1, max_workers)
+        max_queue_size = self._max_workers if max_queue_size is None else max(0, max_queue_size)
+        self._pool = ThreadPool(processes=self._max_workers)
+        self._submission_slots = threading.BoundedSemaphore(self._max_workers + max_queue_size)
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    def submit(self, func, args=(), callback=None, error_callback=None):
+        """
+        queue function on pool. blocks while all workers are busy and the submission queue is full
+        callbacks are run on the pool's result handler thread and should not block
+        :param func:
+        :param tuple args:
+        :param callback: called with function return value
+        :param error_callback: called with raised exception
+        :return:
+        :rtype: multiprocessing.pool.AsyncResult
+        """
+        self._submission_slots.acquire()
+
+        def _on_success(result):
+            self._submission_slots.release()
+            if callback:
+                callback(result)
+
+        def _on_error(exc):
+            self._submission_slots.release()
+            if error_callback:
+                error_callback(exc)
+
+        return self._pool.apply_async(func, args, callback=_on_success, error_callback=_on_error)
+
+    def shutdown(self):
+        """
+        wait for submitted work to finish and release worker threads
+        :return:
+        """
+        self._pool.close()
+        self._pool.join()
+
+    def close(self):
+        """
+        stop accepting work without waiting, already submitted work still runs to completion
+        :return:
+        """
+        self._pool.close()
+
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_shared_executor():
+    """
+    lazily created executor reused by all fan-outs for the lifetime of the script process
+    :return:
+    :rtype: BoundedExecutor
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = BoundedExecutor(max_workers=sb_globals.EXECUTOR_MAX_WORKERS)
+        return _shared_executor
+
+
+def size_shared_executor(requested_workers):
+    """
+    grow shared executor so a fan-out of requested_workers is not capped by the default size
+    size stays between SB_GLOBALS.EXECUTOR_MAX_WORKERS and SB_GLOBALS.EXECUTOR_MAX_WORKERS_CEILING,
+    caller compares returned max_workers to requested_workers to report clamping
+    call between fan-outs, executor being replaced finishes its submitted work in the background
+    :param int requested_workers: concurrency the run asked for
+    :return:
+    :rtype: BoundedExecutor
+    """
+    global _shared_executor
+    max_workers = min(max(requested_workers, sb_globals.EXECUTOR_MAX_WORKERS), sb_globals.EXECUTOR_MAX_WORKERS_CEILING)
+    with _shared_executor_lock:
+        replaced_executor = _shared_executor
+        if replaced_executor is not None and replaced_executor.max_workers == max_workers:
+            return replaced_executor
+        _shared_executor = BoundedExecutor(max_workers=max_workers)
+    if replaced_executor is not None:
+        replaced_executor.close()
+    return _shared_executor
@@ -1,33 +1,37 @@
 import SB_GLOBALS as sb_globals
 from cloudshell.api.cloudshell_api import AttributeNameValue, CloudShellAPISession, InputNameValue
 from cloudshell.workflow.orchestration.sandbox import Sandbox
-from helper_code.execute_async_helper import execute_commands_async
+from helper_code.async_engine import run_commands
+from helper_code.bounded_executor import size_shared_executor
+from helper_code.launch_cancellation import is_launch_running, request_launch_cancellation, wait_for_launch_stop
 from helper_code.SandboxReporter import SandboxReporter
+from helper_code.service_registry import ServiceRegistry
 
 
-def _sync_sandboxes_wrapper(api, res_id, reporter, targeted_components_list):
+def _cancel_running_launch(api, res_id, reporter):
     """
-    function to be passed to threading implementation
+    ask a setup still launching on this sandbox to drop queued launches, and wait for it to acknowledge
+    launches already in flight are ended by setup when they return
     :param CloudShellAPISession api:
     :param str res_id:
-    :param str service_name:
+    :param SandboxReporter reporter:
     :return:
     """
-    # SYNC REMAINING TIME
-    _, sync_sandbox_exceptions = execute_commands_async(
-        api=api,
-        res_id=res_id,
-        target_components_list=targeted_components_list,
-        target_type="Service",
-        command_name=sb_globals.SYNC_REMAINING_TIME_COMMAND,
-    )
-    if sync_sandbox_exceptions:
-        failed_sandboxes = [result[0] for result in sync_sandbox_exceptions]
-        err_msg = "Failed Sandbox Extensions: {}".format(failed_sandboxes)
-        reporter.err_out(err_msg)
-        return failed_sandboxes
-    reporter.sb_warn_print("Parent Sandbox time synced up with child sandboxes.")
-    return None
+    try:
+        request_launch_cancellation(api, res_id, "launcher sandbox teardown started")
+        if not is_launch_running(api, res_id):
+            return
+        reporter.warn_out("Setup still launching sandboxes, cancelling queued launches...")
+        is_stopped = wait_for_launch_stop(
+            api,
+            res_id,
+            timeout_seconds=sb_globals.LAUNCH_CANCEL_ACK_TIMEOUT_SECONDS,
+            polling_seconds=sb_globals.LAUNCH_CANCEL_ACK_POLLING_SECONDS,
+        )
+        if not is_stopped:
+            reporter.warn_out("Setup did not acknowledge cancellation, tearing down sandboxes launched so far")
+    except Exception as e:
+        reporter.warn_out("Could not cancel running launch. {}".format(str(e)), log_only=True)
 
 
 # ========== Primary Function ==========
@@ -64,7 +68,9 @@ def tear_down_sandboxes_flow(sandbox, components=None):
             "n",
             "[any]",
             "any",
+            sb_globals.ADAPTIVE_DEPLOY_LIMIT_VALUE,
         ]:
+            # adaptive limit only applies to launches, teardown runs up to executor ceiling
             concurrent_deploy_limit = 0
         elif concurrent_deploy_limit.isdigit():
             concurrent_deploy_limit = int(concurrent_deploy_limit)
@@ -75,20 +81,12 @@ def tear_down_sandboxes_flow(sandbox, components=None):
             reporter.err_out(exc_msg)
             raise Exception(exc_msg)
 
-    # GET CURRENT SERVICES ON CANVAS
-    all_services = api.GetReservationDetails(res_id).ReservationDescription.Services
-    curr_services = [s for s in all_services if s.ServiceName == sb_globals.SANDBOX_CONTROLLER_MODEL]
-
-    def _is_sb_id(s):
-        attrs = s.Attributes
-        sb_id_val = [attr for attr in attrs if attr.Name == sb_globals.SANDBOX_ID_ATTR][0].Value
-        if sb_id_val:
-            return True
-        else:
-            return False
+    # STOP RUNNING SETUP, THEN TEAR DOWN ONLY CHILD SANDBOXES THAT EXIST
+    _cancel_running_launch(api, res_id, reporter)
 
-    services_with_populated_sb_id = [s.Alias for s in curr_services if _is_sb_id(s)]
-    sorted_service_names = sorted(services_with_populated_sb_id)
+    # GET CURRENT SERVICES ON CANVAS
+    service_registry = ServiceRegistry(api, res_id, sb_globals.SANDBOX_CONTROLLER_MODEL).refresh()
+    sorted_service_names = service_registry.get_launched_aliases()
 
     # IF ASYNC SWITCH OFF RUN SEQUENTIALLY AND RETURN
     if not is_async_deploy:
@@ -113,18 +111,50 @@ def tear_down_sandboxes_flow(sandbox, components=None):
             raise Exception(exc_msg)
         return
 
-    # ASYNC flow
+    # ASYNC flow, one lightweight task per child on the async engine, threads capped by the shared executor
     reporter.warn_out("Starting ASYNC teardown of sandboxes...")
-    _, teardown_sandbox_exceptions = execute_commands_async(
+    requested_concurrency = concurrent_deploy_limit if concurrent_deploy_limit else len(sorted_service_names)
+    shared_executor = size_shared_executor(requested_concurrency)
+    if shared_executor.max_workers < requested_concurrency:
+        reporter.warn_out(
+            "{} concurrent teardowns requested, executor ceiling clamps it to {} sandboxes at once".format(
+                requested_concurrency, shared_executor.max_workers
+            )
+        )
+    failed_sandboxes = []
+    completed_count = 0
+
+    def _on_teardown_result(result):
+        nonlocal completed_count
+        completed_count += 1
+        elapsed_minutes = result.elapsed_seconds / 60.0
+        if result.error is not None:
+            failed_sandboxes.append(result.component_name)
+            reporter.err_out(
+                "[{}/{}] '{}' teardown FAILED after {:.2f} minutes: {}".format(
+                    completed_count, len(sorted_service_names), result.component_name, elapsed_minutes, result.error
+                )
+            )
+        else:
+            reporter.info_out(
+                "[{}/{}] '{}' torn down after {:.2f} minutes".format(
+                    completed_count, len(sorted_service_names), result.component_name, elapsed_minutes
+                ),
+                log_only=True,
+            )
+
+    run_commands(
         api=api,
         res_id=res_id,
         target_components_list=sorted_service_names,
         target_type="Service",
         command_name=sb_globals.END_SANDBOX_COMMAND,
-        max_thread_count=concurrent_deploy_limit,
+        max_concurrency=concurrent_deploy_limit,
+        timeout_seconds=sb_globals.END_SANDBOX_TIMEOUT_SECONDS,
+        on_result=_on_teardown_result,
     )
-    if teardown_sandbox_exceptions:
-        failed_sandboxes = [result[0] for result in teardown_sandbox_exceptions]
+    if failed_sandboxes:
+        failed_sandboxes.sort()
         err_msg = "Failed Sandbox Teardowns: {}".format(failed_sandboxes)
         reporter.err_out(err_msg)
         raise Exception(err_msg)
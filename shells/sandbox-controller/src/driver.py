@@ -1,15 +1,31 @@
-from time import sleep
-
 from cloudshell.api.cloudshell_api import AttributeNameValue, CloudShellAPISession
 from cloudshell.logging.qs_logger import get_qs_logger
 from cloudshell.shell.core.driver_context import InitCommandContext, ResourceCommandContext
 from cloudshell.shell.core.resource_driver_interface import ResourceDriverInterface
-from cloudshell.shell.core.session.cloudshell_session import CloudShellSessionContext
 from data_model import *  # run 'shellfoundry generate' to generate data model classes
+from helper_code.api_session_cache import ApiSessionCache
+from helper_code.error_classification import API_CALL_MAX_ATTEMPTS, API_CALL_RETRY_WAIT_MS, is_transient_error
 from helper_code.SandboxReporter import SandboxReporter
-from helper_code.util_helpers import sandbox_name_truncater
+from helper_code.util_helpers import get_minutes_until, sandbox_name_truncater
 from parse_global_inputs import get_global_input_request_from_semicolon_sep_str
-from poll_sandbox import poll_setup_for_provisioning_status, poll_teardown_for_completion_status
+from poll_sandbox import (
+    DEFAULT_MAX_POLLING_MINUTES,
+    AdaptivePollingStrategy,
+    parse_duration_minutes,
+    poll_setup_for_provisioning_status,
+    poll_teardown_for_completion_status,
+)
+from retrying import retry
+
+# single api calls that are safe to repeat are retried on transient errors
+_retry_transient = retry(
+    stop_max_attempt_number=API_CALL_MAX_ATTEMPTS,
+    wait_exponential_multiplier=API_CALL_RETRY_WAIT_MS,
+    retry_on_exception=is_transient_error,
+)
+
+# child sandbox statuses that can no longer become ready
+ENDED_SANDBOX_STATUSES = ["completed", "ending"]
 
 
 class SandboxControllerDriver(ResourceDriverInterface):
@@ -17,7 +33,7 @@ class SandboxControllerDriver(ResourceDriverInterface):
         """
         ctor must be without arguments, it is created with reflection at run time
         """
-        pass
+        self._api_session_cache = ApiSessionCache()
 
     def initialize(self, context):
         """
@@ -32,7 +48,16 @@ class SandboxControllerDriver(ResourceDriverInterface):
         Destroy the driver session, this function is called everytime a driver instance is destroyed
         This is a good place to close any open sessions, finish writing to log files
         """
-        pass
+        self._api_session_cache.clear()
+
+    def _get_api(self, context):
+        """
+        logged in session cached across commands of this driver instance
+        :param ResourceCommandContext context:
+        :return:
+        :rtype: CloudShellAPISession
+        """
+        return self._api_session_cache.get_api(context)
 
     @staticmethod
     def _get_sandbox_reporter(context, api):
@@ -49,6 +74,26 @@ class SandboxControllerDriver(ResourceDriverInterface):
         reporter = SandboxReporter(api, res_id, logger)
         return reporter
 
+    @staticmethod
+    def _get_polling_strategy(api, blueprint_name, is_teardown=False):
+        """
+        adaptive polling spaced from blueprint estimated setup / teardown duration
+        :param CloudShellAPISession api:
+        :param str blueprint_name:
+        :param bool is_teardown:
+        :return:
+        :rtype: AdaptivePollingStrategy
+        """
+        try:
+            blueprint_details = api.GetTopologyDetails(blueprint_name)
+            if is_teardown:
+                estimated_duration = blueprint_details.EstimatedTearDownDuration
+            else:
+                estimated_duration = blueprint_details.EstimatedSetupDuration
+        except Exception:
+            estimated_duration = None
+        return AdaptivePollingStrategy(expected_duration_minutes=parse_duration_minutes(estimated_duration))
+
     def _raise_exception_flow(self, context, exc_msg):
         """
         1. Log error message
@@ -59,7 +104,7 @@ class SandboxControllerDriver(ResourceDriverInterface):
         :param str exc_msg:
         :return:
         """
-        api = CloudShellSessionContext(context).get_api()
+        api = self._get_api(context)
         res_id = context.reservation.reservation_id
         service_name = context.resource.name
         reporter = self._get_sandbox_reporter(context, api)
@@ -72,13 +117,54 @@ class SandboxControllerDriver(ResourceDriverInterface):
         )
         raise Exception(exc_msg)
 
-    def start_sandbox(self, context, duration_minutes):
+    def _poll_child_setup(self, context, api, reporter, child_sandbox_id, blueprint_name, max_polling_minutes):
+        """
+        poll child setup within launcher budget and mirror result to controller live status
+        :param ResourceCommandContext context:
+        :param CloudShellAPISession api:
+        :param SandboxReporter reporter:
+        :param str child_sandbox_id:
+        :param str blueprint_name:
+        :param str max_polling_minutes: setup budget given by launcher deadline, empty for default
+        :return:
+        :rtype: str
+        """
+        master_sandbox_id = context.reservation.reservation_id
+        service_name = sandbox_name_truncater(context.resource.name)
+        # poll setup status within launcher budget
+        polling_strategy = self._get_polling_strategy(api, blueprint_name)
+        provisioning_status, elapsed_time = poll_setup_for_provisioning_status(
+            api,
+            child_sandbox_id,
+            max_polling_minutes=int(max_polling_minutes) if max_polling_minutes else DEFAULT_MAX_POLLING_MINUTES,
+            polling_strategy=polling_strategy,
+        )
+        if provisioning_status.lower() == "error":
+            exc_msg = "'{}' provisioning status '{}' after {} minutes".format(service_name, provisioning_status, elapsed_time)
+            self._raise_exception_flow(context, exc_msg)
+
+        success_msg = "'{}' status '{}' after {} minutes".format(service_name, provisioning_status, elapsed_time)
+        api.SetServiceLiveStatus(
+            reservationId=master_sandbox_id,
+            serviceAlias=service_name,
+            liveStatusName="Online",
+            additionalInfo=success_msg,
+        )
+        reporter.info_out(success_msg, log_only=True)
+        return success_msg
+
+    def start_sandbox(self, context, duration_minutes, poll_provisioning="True", max_polling_minutes="", end_time=""):
         """
         :param ResourceCommandContext context:
         :param str duration_minutes: will be converted to int
+        :param str poll_provisioning: 'False' when launcher polls child status centrally.
+                                      command then returns child sandbox id right after users are added
+        :param str max_polling_minutes: setup budget given by launcher deadline, empty for default
+        :param str end_time: launcher sandbox end as epoch seconds, duration is then computed at creation
+                             so child ends with launcher no matter how long the command was queued
         :return:
         """
-        api = CloudShellSessionContext(context).get_api()
+        api = self._get_api(context)
         master_sandbox_id = context.reservation.reservation_id
         model = context.resource.model
         service_name = context.resource.name
@@ -102,6 +188,7 @@ class SandboxControllerDriver(ResourceDriverInterface):
             self._raise_exception_flow(context, exc_msg)
 
         duration_minutes = int(duration_minutes)
+        is_poll_provisioning = str(poll_provisioning).lower() not in ["false", "f", "no", "n"]
 
         if not blueprint_name:
             exc_msg = "Please populate Blueprint Name attribute"
@@ -109,12 +196,35 @@ class SandboxControllerDriver(ResourceDriverInterface):
 
         service_sandbox_id_val = resource.sandbox_id
         if service_sandbox_id_val:
+            # orchestrator may be retrying after a transient failure that came after the child was created,
+            # child provisioning state is then unknown and is checked before reporting success
+            try:
+                child_status = _retry_transient(api.GetReservationStatus)(service_sandbox_id_val).ReservationSlimStatus
+            except Exception as e:
+                exc_msg = "'{}' could not read status of existing sandbox. {}".format(service_name, str(e))
+                self._raise_exception_flow(context, exc_msg)
+                return
+            if child_status.Status.lower() in ENDED_SANDBOX_STATUSES or child_status.ProvisioningStatus.lower() == "error":
+                exc_msg = "'{}' existing sandbox status '{}', provisioning status '{}'".format(
+                    service_name, child_status.Status, child_status.ProvisioningStatus
+                )
+                self._raise_exception_flow(context, exc_msg)
+            try:
+                _retry_transient(api.AddPermittedUsersToReservation)(
+                    reservationId=service_sandbox_id_val, usernames=permitted_users_list
+                )
+            except Exception as e:
+                reporter.warn_out("'{}' could not re-add permitted users. {}".format(service_name, str(e)), log_only=True)
             warn_msg = "'{}' sandbox already exists".format(service_name)
             reporter.warn_out(warn_msg)
-            return
+            if not is_poll_provisioning:
+                return service_sandbox_id_val
+            return self._poll_child_setup(context, api, reporter, service_sandbox_id_val, blueprint_name, max_polling_minutes)
 
         reporter.info_out("starting {}. polling provisioning status...".format(service_name))
 
+        if end_time:
+            duration_minutes = get_minutes_until(end_time)
         try:
             response = api.CreateImmediateTopologyReservation(
                 reservationName=service_name,
@@ -136,15 +246,34 @@ class SandboxControllerDriver(ResourceDriverInterface):
         response_sandbox_id = response.Id
         sb_id_attr_key = "{}.Sandbox Id".format(model)
         attr_requests = [AttributeNameValue(sb_id_attr_key, response_sandbox_id)]
-        api.SetServiceAttributesValues(
-            reservationId=master_sandbox_id,
-            serviceAlias=service_name,
-            attributeRequests=attr_requests,
-        )
-        sleep(10)
+        try:
+            _retry_transient(api.SetServiceAttributesValues)(
+                reservationId=master_sandbox_id,
+                serviceAlias=service_name,
+                attributeRequests=attr_requests,
+            )
+        except Exception as e:
+            # untracked child would be orphaned by a relaunch, end it before failing
+            exc_msg = "'{}' failed to record Sandbox Id, child sandbox ended. {}".format(service_name, str(e))
+            try:
+                api.EndReservation(reservationId=response_sandbox_id)
+            except Exception as end_error:
+                # report orphan but fail with the attribute write error that caused it
+                reporter.err_out(
+                    "'{}' child sandbox '{}' NOT ended, end it manually. {}".format(
+                        service_name, response_sandbox_id, str(end_error)
+                    )
+                )
+                exc_msg = "'{}' failed to record Sandbox Id, child sandbox '{}' NOT ended. {}".format(
+                    service_name, response_sandbox_id, str(e)
+                )
+            self._raise_exception_flow(context, exc_msg)
+        # attribute write above is synchronous and the id is already known here, nothing to wait for
         # add permitted users to sandbox
         try:
-            api.AddPermittedUsersToReservation(reservationId=response_sandbox_id, usernames=permitted_users_list)
+            _retry_transient(api.AddPermittedUsersToReservation)(
+                reservationId=response_sandbox_id, usernames=permitted_users_list
+            )
         except Exception as e:
             exc_msg = "Issue adding permitted users. Sandbox: '{}', Users: {}. {}".format(
                 service_name, permitted_users_list, str(e)
@@ -152,28 +281,18 @@ class SandboxControllerDriver(ResourceDriverInterface):
             reporter.err_out(exc_msg)
             raise Exception(exc_msg)
 
-        # poll setup status for 15 minutes max
-        provisioning_status, elapsed_time = poll_setup_for_provisioning_status(api, response_sandbox_id)
-        if provisioning_status.lower() == "error":
-            exc_msg = "'{}' provisioning status '{}' after {} minutes".format(service_name, provisioning_status, elapsed_time)
-            self._raise_exception_flow(context, exc_msg)
+        if not is_poll_provisioning:
+            reporter.info_out("'{}' created, provisioning polled by launcher".format(service_name), log_only=True)
+            return response_sandbox_id
 
-        success_msg = "'{}' status '{}' after {} minutes".format(service_name, provisioning_status, elapsed_time)
-        api.SetServiceLiveStatus(
-            reservationId=master_sandbox_id,
-            serviceAlias=service_name,
-            liveStatusName="Online",
-            additionalInfo=success_msg,
-        )
-        reporter.info_out(success_msg, log_only=True)
-        return success_msg
+        return self._poll_child_setup(context, api, reporter, response_sandbox_id, blueprint_name, max_polling_minutes)
 
     def end_sandbox(self, context):
         """
         :param ResourceCommandContext context:
         :return:
         """
-        api = CloudShellSessionContext(context).get_api()
+        api = self._get_api(context)
         service_name = context.resource.name
         resource = SandboxController.create_from_context(context)
         master_reservation_id = context.reservation.reservation_id
@@ -189,15 +308,17 @@ class SandboxControllerDriver(ResourceDriverInterface):
             exc_msg = "No sandbox Id attribute populated"
             self._raise_exception_flow(context, exc_msg)
 
-        api = CloudShellSessionContext(context).get_api()
-
         try:
             api.EndReservation(reservationId=service_sandbox_id_val)
         except Exception as e:
             exc_msg = "'{}' Sandbox ending command FAILED. {}".format(service_name, str(e))
             self._raise_exception_flow(context, exc_msg)
 
-        polling_results = poll_teardown_for_completion_status(api=api, res_id=service_sandbox_id_val)
+        polling_results = poll_teardown_for_completion_status(
+            api=api,
+            res_id=service_sandbox_id_val,
+            polling_strategy=self._get_polling_strategy(api, blueprint_name, is_teardown=True),
+        )
         elapsed_time = polling_results.elapsed_polling_minutes
         status_msg = "Sandbox teardown completed SUCCESSFULLY after '{}' minutes".format(elapsed_time)
         api.SetServiceLiveStatus(
@@ -215,7 +336,7 @@ class SandboxControllerDriver(ResourceDriverInterface):
         :param int duration_minutes:
         :return:
         """
-        api = CloudShellSessionContext(context).get_api()
+        api = self._get_api(context)
         res_id = context.reservation.reservation_id
         resource = SandboxController.create_from_context(context)
         service_name = context.resource.name
@@ -252,7 +373,7 @@ class SandboxControllerDriver(ResourceDriverInterface):
         :param ResourceCommandContext context:
         :return:
         """
-        api = CloudShellSessionContext(context).get_api()
+        api = self._get_api(context)
         resource = SandboxController.create_from_context(context)
         service_name = context.resource.name
         master_reservation_id = context.reservation.reservation_id
@@ -274,7 +395,7 @@ class SandboxControllerDriver(ResourceDriverInterface):
         :param str duration_minutes: will be converted to int
         :return:
         """
-        api = CloudShellSessionContext(context).get_api()
+        api = self._get_api(context)
         service_name = context.resource.name
         reporter = self._get_sandbox_reporter(context, api)
 
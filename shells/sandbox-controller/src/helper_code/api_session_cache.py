@@ -0,0 +1,100 @@
+"""
+Per driver instance cache of logged in CloudShell API sessions.
+Commands of the same driver instance reuse one session per server, domain and auth token instead of logging in
+on every 'get_api' call. Sessions expire after a TTL, and a call rejected for authentication logs in again once.
+"""
+import threading
+from time import time
+
+from cloudshell.api.cloudshell_api import CloudShellAPISession
+from cloudshell.shell.core.driver_context import ResourceCommandContext
+from cloudshell.shell.core.session.cloudshell_session import CloudShellSessionContext
+from helper_code.error_classification import is_auth_error
+
+# cached session is replaced by a new login after this age
+SESSION_TTL_SECONDS = 600
+
+
+class ReloginApiSession(object):
+    def __init__(self, session_factory):
+        """
+        proxies CloudShellAPISession methods, a call rejected for authentication logs in again and is repeated once
+        :param session_factory: no argument callable returning logged in CloudShellAPISession
+        """
+        self._session_factory = session_factory
+        self._login_lock = threading.Lock()
+        self._api = session_factory()
+        self.login_time = time()
+
+    def relogin(self, rejected_api=None):
+        """
+        :param CloudShellAPISession rejected_api: skip login if another thread already replaced this session
+        :return:
+        """
+        with self._login_lock:
+            if rejected_api is not None and rejected_api is not self._api:
+                return
+            self._api = self._session_factory()
+            self.login_time = time()
+
+    def __getattr__(self, name):
+        api_attr = getattr(self._api, name)
+        if not callable(api_attr):
+            return api_attr
+
+        def _call_with_relogin(*args, **kwargs):
+            api = self._api
+            try:
+                return getattr(api, name)(*args, **kwargs)
+            except Exception as e:
+                if not is_auth_error(e):
+                    raise
+            self.relogin(rejected_api=api)
+            return getattr(self._api, name)(*args, **kwargs)
+
+        return _call_with_relogin
+
+
+class ApiSessionCache(object):
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS):
+        """
+        :param float ttl_seconds:
+        """
+        self._ttl_seconds = ttl_seconds
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_session_key(context):
+        """
+        :param ResourceCommandContext context:
+        :return:
+        :rtype: tuple
+        """
+        return (
+            context.connectivity.server_address,
+            context.reservation.domain,
+            context.connectivity.admin_auth_token,
+        )
+
+    def get_api(self, context):
+        """
+        cached session for the context connectivity, logged in on first use or after TTL
+        :param ResourceCommandContext context:
+        :return: session exposing CloudShellAPISession methods
+        :rtype: ReloginApiSession
+        """
+        session_key = self._get_session_key(context)
+        with self._lock:
+            session = self._sessions.get(session_key)
+            if session is not None and time() - session.login_time < self._ttl_seconds:
+                return session
+            # token of an older command context is not reused once a new one arrives
+            self._sessions = {key: s for key, s in self._sessions.items() if key[:2] != session_key[:2]}
+            session = ReloginApiSession(lambda: CloudShellSessionContext(context).get_api())
+            self._sessions[session_key] = session
+            return session
+
+    def clear(self):
+        with self._lock:
+            self._sessions = {}
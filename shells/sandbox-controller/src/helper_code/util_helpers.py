@@ -1,3 +1,7 @@
+from math import ceil
+from time import time
+
+
 def sandbox_name_truncater(input_str):
     """
     :param int max_characters:
@@ -9,3 +13,13 @@ def sandbox_name_truncater(input_str):
         return input_str[:max_minus_ellipses] + ".."
     else:
         return input_str
+
+
+def get_minutes_until(end_time):
+    """
+    whole minutes from now until end time, rounded up so sandbox ends no earlier than end time
+    :param str end_time: epoch seconds
+    :return:
+    :rtype: int
+    """
+    return max(1, int(ceil((float(end_time) - time()) / 60.0)))
@@ -1,9 +1,14 @@
+import random
 from collections import namedtuple
 from time import time
 
 from cloudshell.api.cloudshell_api import CloudShellAPISession
+from helper_code.error_classification import POLLING_BUDGET_EXHAUSTED_MESSAGE
 from retrying import RetryError, retry
 
+# used when caller passes no setup budget
+DEFAULT_MAX_POLLING_MINUTES = 45
+
 PollingResults = namedtuple("PollingResults", ["sandbox_provisioning_status", "elapsed_polling_minutes"])
 
 
@@ -11,6 +16,106 @@ class PollSandboxTimeoutError(Exception):
     pass
 
 
+def parse_duration_minutes(duration_str):
+    """
+    blueprint estimated durations, "20" / "20.5" minutes or "HH:MM:SS" --> float minutes, None if not parseable
+    :param str duration_str:
+    :return:
+    :rtype: float
+    """
+    if not duration_str:
+        return None
+    try:
+        if ":" in duration_str:
+            parts = [float(part) for part in duration_str.split(":")]
+            while len(parts) < 3:
+                parts.insert(0, 0.0)
+            hours, minutes, seconds = parts[-3:]
+            return hours * 60 + minutes + seconds / 60.0
+        return float(duration_str)
+    except ValueError:
+        return None
+
+
+class FixedPollingStrategy(object):
+    def __init__(self, polling_frequency_seconds=10):
+        """
+        poll at constant interval, previous default behavior
+        :param float polling_frequency_seconds:
+        """
+        self._polling_frequency_seconds = polling_frequency_seconds
+        self.consecutive_errors = 0
+
+    def record_success(self):
+        self.consecutive_errors = 0
+
+    def record_error(self):
+        self.consecutive_errors += 1
+
+    def get_interval_seconds(self, elapsed_seconds):
+        """
+        :param float elapsed_seconds: time since polling started
+        :return:
+        :rtype: float
+        """
+        return self._polling_frequency_seconds
+
+    def get_wait_ms(self, attempt_number, delay_since_first_attempt_ms):
+        """
+        signature of 'wait_func' for retrying decorator
+        :param int attempt_number:
+        :param int delay_since_first_attempt_ms:
+        :return:
+        :rtype: int
+        """
+        return int(self.get_interval_seconds(delay_since_first_attempt_ms / 1000.0) * 1000)
+
+
+class AdaptivePollingStrategy(FixedPollingStrategy):
+    def __init__(
+        self,
+        expected_duration_minutes=None,
+        min_interval_seconds=10,
+        max_interval_seconds=120,
+        remaining_time_fraction=0.25,
+        jitter_ratio=0.2,
+        error_base_delay_seconds=5,
+        error_max_delay_seconds=120,
+    ):
+        """
+        sparse polls early, denser as expected finish approaches, per sandbox jitter, exponential backoff on api errors
+        :param float expected_duration_minutes: blueprint estimated duration, None to grow interval gradually instead
+        :param float min_interval_seconds: interval near and after expected finish
+        :param float max_interval_seconds:
+        :param float remaining_time_fraction: interval as fraction of expected time remaining
+        :param float jitter_ratio: interval randomized within +/- this fraction so children don't poll in lockstep
+        :param float error_base_delay_seconds: wait after first failed poll, doubled for each following failure
+        :param float error_max_delay_seconds:
+        """
+        super(AdaptivePollingStrategy, self).__init__(min_interval_seconds)
+        self._expected_duration_seconds = expected_duration_minutes * 60 if expected_duration_minutes else None
+        self._min_interval_seconds = min_interval_seconds
+        self._max_interval_seconds = max_interval_seconds
+        self._remaining_time_fraction = remaining_time_fraction
+        self._jitter_ratio = jitter_ratio
+        self._error_base_delay_seconds = error_base_delay_seconds
+        self._error_max_delay_seconds = error_max_delay_seconds
+
+    def get_interval_seconds(self, elapsed_seconds):
+        if self.consecutive_errors:
+            backoff = self._error_base_delay_seconds * (2 ** (self.consecutive_errors - 1))
+            interval = min(self._error_max_delay_seconds, backoff)
+        elif self._expected_duration_seconds:
+            remaining_seconds = self._expected_duration_seconds - elapsed_seconds
+            interval = remaining_seconds * self._remaining_time_fraction
+        else:
+            # no estimate, back off gradually the longer the sandbox takes
+            interval = self._min_interval_seconds + elapsed_seconds * 0.1
+        interval = max(self._min_interval_seconds, min(self._max_interval_seconds, interval))
+        jitter = interval * self._jitter_ratio
+        return max(1.0, interval + random.uniform(-jitter, jitter))
+
+
 def _validate_setup_status(status_data):
     """
     :param str provisioning_status:
@@ -35,37 +140,50 @@ def _validate_teardown_status(status_data):
     return True
 
 
-def _poll_sandbox_for_status(api, res_id, validation_func, max_polling_minutes=45, polling_frequency_seconds=10):
+def _poll_sandbox_for_status(
+    api,
+    res_id,
+    validation_func,
+    max_polling_minutes=DEFAULT_MAX_POLLING_MINUTES,
+    polling_frequency_seconds=10,
+    polling_strategy=None,
+):
     """
     poll setup and teardown for status
     :param CloudShellAPISession api:
     :param str res_id:
     :param func validation_func: function that will validate status
     :param int max_polling_minutes:
-    :param int polling_frequency_seconds:
+    :param int polling_frequency_seconds: used when no polling strategy passed
+    :param FixedPollingStrategy polling_strategy: decides wait between polls
     :return:
     :rtype: PollingResults
     """
     total_polling_ms = max_polling_minutes * 60 * 1000
-    polling_frequency_ms = polling_frequency_seconds * 1000
+    polling_strategy = polling_strategy if polling_strategy else FixedPollingStrategy(polling_frequency_seconds)
     sandbox_name = api.GetReservationDetails(res_id).ReservationDescription.Name
 
     @retry(
-        wait_fixed=polling_frequency_ms,
+        wait_func=polling_strategy.get_wait_ms,
         stop_max_delay=total_polling_ms,
         retry_on_result=validation_func,
     )
     def _poll_sandbox():
-        res_details = api.GetReservationDetails(res_id).ReservationDescription
-        sandbox_status = res_details.Status
-        provisioning_status = res_details.ProvisioningStatus
-        return sandbox_status, provisioning_status
+        try:
+            res_status = api.GetReservationStatus(res_id).ReservationSlimStatus
+        except Exception:
+            polling_strategy.record_error()
+            raise
+        polling_strategy.record_success()
+        return res_status.Status, res_status.ProvisioningStatus
 
     start_time = time()
     try:
         sandbox_status, provisioning_status = _poll_sandbox()
     except RetryError:
-        exc_msg = "Polling '{}' timed out after {} minutes".format(sandbox_name, str(max_polling_minutes))
+        exc_msg = "Polling '{}' timed out after {} minutes, {}".format(
+            sandbox_name, str(max_polling_minutes), POLLING_BUDGET_EXHAUSTED_MESSAGE
+        )
         raise PollSandboxTimeoutError(exc_msg)
 
     elapsed_seconds = time() - start_time
@@ -78,13 +196,16 @@ def _poll_sandbox_for_status(api, res_id, validation_func, max_polling_minutes=4
     )
 
 
-def poll_setup_for_provisioning_status(api, res_id, max_polling_minutes=45, polling_frequency_seconds=10):
+def poll_setup_for_provisioning_status(
+    api, res_id, max_polling_minutes=DEFAULT_MAX_POLLING_MINUTES, polling_frequency_seconds=10, polling_strategy=None
+):
     """
     wrapper for polling setup
     :param CloudShellAPISession api:
     :param str res_id:
     :param int max_polling_minutes:
     :param int polling_frequency_seconds:
+    :param FixedPollingStrategy polling_strategy:
     :return:
     :rtype: PollingResults
     """
@@ -94,16 +215,20 @@ def poll_setup_for_provisioning_status(api, res_id, max_polling_minutes=45, poll
         _validate_setup_status,
         max_polling_minutes,
         polling_frequency_seconds,
+        polling_strategy,
     )
 
 
-def poll_teardown_for_completion_status(api, res_id, max_polling_minutes=45, polling_frequency_seconds=10):
+def poll_teardown_for_completion_status(
+    api, res_id, max_polling_minutes=DEFAULT_MAX_POLLING_MINUTES, polling_frequency_seconds=10, polling_strategy=None
+):
     """
     wrapper for polling teardown
     :param CloudShellAPISession api:
     :param str res_id:
     :param int max_polling_minutes:
     :param int polling_frequency_seconds:
+    :param FixedPollingStrategy polling_strategy:
     :return:
     :rtype: PollingResults
     """
@@ -113,6 +238,7 @@ def poll_teardown_for_completion_status(api, res_id, max_polling_minutes=45, pol
         _validate_teardown_status,
         max_polling_minutes,
         polling_frequency_seconds,
+        polling_strategy,
     )
 
 